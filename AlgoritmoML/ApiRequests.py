@@ -3,6 +3,7 @@ import csv
 import pandas as pd
 from tmdbv3api import TMDb, Movie
 from tmdbv3api.exceptions import TMDbException
+from RatingsReader import read_transactions
 
 
 def read_data(filename, is_implicit):
@@ -15,27 +16,7 @@ def read_data(filename, is_implicit):
     :type is_implicit: boolean
     :return: list of transactions with all users' items
     """
-    with open(filename, encoding='utf-8') as fp:
-        USERID, MOVIETITLE, RATING = 0, 1, 2
-        reader = csv.reader(fp)
-        next(reader, None)  # skip the headers
-        ratings_dict = {}
-        if is_implicit:
-            for line in reader:
-                if line[USERID] in ratings_dict.keys():
-                    ratings_dict[line[USERID]].append((line[MOVIETITLE]))
-                else:
-                    ratings_dict[line[USERID]] = [(line[MOVIETITLE])]
-        else:
-            for line in reader:
-                if float(line[RATING]) >= 3.0:
-                    if line[USERID] in ratings_dict.keys():
-                        ratings_dict[line[USERID]].append((line[MOVIETITLE]))
-                    else:
-                        ratings_dict[line[USERID]] = [(line[MOVIETITLE])]
-    fp.close()
-
-    return list(ratings_dict.values())
+    return read_transactions(filename, is_implicit)[0]
 
 
 # print(json.dumps(read_data('datasets/userRatings5k.csv',isImplicit=False), ensure_ascii=False, indent=2))
@@ -0,0 +1,196 @@
+import math
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from FPGrowthMiner import mine_frequent_itemsets
+
+
+def get_sample_size(epsilon, delta):
+    """
+    Method that returns the number of transactions of a random sample needed so that the support of an itemset in the
+    sample differs from its real support by more than epsilon with probability lower than delta (Hoeffding bound, as in
+    the sampling algorithm of Toivonen): n >= ln(2 / delta) / (2 * epsilon ^ 2)
+    :param epsilon: maximum support error
+    :type epsilon: float (values between 0.0 and 1.0)
+    :param delta: probability of the support error being greater than epsilon
+    :type delta: float (values between 0.0 and 1.0)
+    :return: number of transactions of the sample
+    """
+    return math.ceil(math.log(2 / delta) / (2 * epsilon ** 2))
+
+
+def get_support_error(sample_size, delta):
+    """
+    Method that returns the support error of the itemsets mined from a random sample, which is only exceeded with
+    probability delta (inverse of get_sample_size)
+    :param sample_size: number of transactions of the sample
+    :type sample_size: integer
+    :param delta: probability of the support error being greater than the value returned
+    :type delta: float (values between 0.0 and 1.0)
+    :return: support error (epsilon)
+    """
+    return math.sqrt(math.log(2 / delta) / (2 * sample_size))
+
+
+def get_items_tidsets(one_hot_trans, items):
+    """
+    Method that returns the transactions of each item as a bool array (one position for each transaction)
+    :param one_hot_trans: one hot encoding of the transactions (one row for each transaction and one column for each
+    item)
+    :type one_hot_trans: scipy.sparse matrix
+    :param items: items ids
+    :type items: list of integers
+    :return: dictionary with the following format: { item id: numpy bool array }
+    """
+    columns = one_hot_trans.tocsc()
+    tidsets = {}
+    for item in items:
+        tidsets[item] = np.zeros(one_hot_trans.shape[0], dtype=bool)
+        tidsets[item][columns.indices[columns.indptr[item]:columns.indptr[item + 1]]] = True
+
+    return tidsets
+
+
+def count_itemsets(one_hot_trans, itemsets):
+    """
+    Method that counts, in a single pass over the transactions, the support count of many itemsets by intersecting the
+    tidsets of their items. The itemsets are visited in lexicographic order, keeping the intersections of the prefixes
+    of the current itemset, so each itemset whose prefix was already visited costs a single intersection
+    :param one_hot_trans: one hot encoding of the transactions (one row for each transaction and one column for each
+    item)
+    :type one_hot_trans: scipy.sparse matrix
+    :param itemsets: itemsets of items ids
+    :type itemsets: list of frozensets
+    :return: numpy integer array with the support count of each itemset
+    """
+    # The single items are counted by the columns of the matrix and the other itemsets by their tidsets
+    items_counts = np.asarray((one_hot_trans != 0).sum(axis=0), dtype=np.int64).reshape(-1)
+    tidsets = get_items_tidsets(one_hot_trans, sorted({item for itemset in itemsets if len(itemset) > 1 for item in
+                                                       itemset}))
+    sorted_itemsets = [tuple(sorted(itemset)) for itemset in itemsets]
+    counts = np.zeros(len(itemsets), dtype=np.int64)
+    # prefixes = [(prefix, transactions of the prefix), ...] (each prefix is the previous one with one more item)
+    prefixes = []
+    for position in sorted(range(len(itemsets)), key=lambda i: sorted_itemsets[i]):
+        itemset = sorted_itemsets[position]
+        if len(itemset) == 1:
+            counts[position] = items_counts[itemset[0]]
+            continue
+
+        while len(prefixes) > 0 and prefixes[-1][0] != itemset[:len(prefixes[-1][0])]:
+            prefixes.pop()
+        if len(prefixes) == 0:
+            prefixes.append((itemset[:1], tidsets[itemset[0]]))
+        for length in range(len(prefixes[-1][0]), len(itemset)):
+            prefixes.append((itemset[:length + 1], prefixes[-1][1] & tidsets[itemset[length]]))
+        counts[position] = np.count_nonzero(prefixes[-1][1])
+
+    return counts
+
+
+def get_negative_border(itemsets, items):
+    """
+    Method that returns the negative border of a downward closed collection of itemsets: the itemsets that aren't in
+    the collection but whose subsets (with one item less) are all in the collection
+    :param itemsets: downward closed collection of itemsets
+    :type itemsets: set of frozensets
+    :param items: all items ids
+    :type items: list of integers
+    :return: list of frozensets
+    """
+    border = [frozenset([item]) for item in items if frozenset([item]) not in itemsets]
+    itemsets_lengths = {}
+    for itemset in itemsets:
+        itemsets_lengths.setdefault(len(itemset), []).append(tuple(sorted(itemset)))
+
+    for length, length_itemsets in itemsets_lengths.items():
+        # Itemsets with one more item, joining the itemsets with the same first length - 1 items (as in Apriori)
+        prefixes = {}
+        for itemset in length_itemsets:
+            prefixes.setdefault(itemset[:-1], []).append(itemset[-1])
+        for prefix, last_items in prefixes.items():
+            for first, second in combinations(sorted(last_items), 2):
+                candidate = frozenset(prefix + (first, second))
+                if candidate not in itemsets and all(candidate - {item} in itemsets for item in candidate):
+                    border.append(candidate)
+
+    return border
+
+
+def mine_sample_itemsets(one_hot_trans, min_support, epsilon=0.01, delta=0.05, verify=True, random_state=None,
+                         n_jobs=1):
+    """
+    Method that generates approximate frequent itemsets by mining a random sample of the transactions, whose size is
+    given by the Hoeffding bound for a maximum support error epsilon (with probability 1 - delta for each itemset). If
+    verify is True (Toivonen's algorithm) the sample is mined with the lowered minimum support min_support - epsilon and
+    the supports of the candidates and of their negative border are counted in a single pass over all transactions: the
+    itemsets returned have exact supports and if no itemset of the negative border is frequent no frequent itemset was
+    missed (the frequent itemsets of the border are returned too, but their supersets may be missing). Otherwise the
+    supports of the sample are returned, with an expected error of epsilon. If the sample would have all transactions,
+    they are mined exactly instead
+    :param one_hot_trans: one hot encoding of the transactions (one row for each transaction and one column for each
+    item)
+    :type one_hot_trans: scipy.sparse matrix
+    :param min_support: minimum support for the frequent itemsets
+    :type min_support: float (values between 0.0 and 1.0)
+    :param epsilon: maximum support error of the sample
+    :type epsilon: float (values between 0.0 and 1.0)
+    :param delta: probability of the support error of an itemset being greater than epsilon
+    :type delta: float (values between 0.0 and 1.0)
+    :param verify: if the candidates are verified over all transactions or not
+    :type verify: boolean
+    :param random_state: seed of the random sample (None = different sample each time)
+    :type random_state: integer
+    :param n_jobs: number of worker processes used to mine the sample (1 = serial mining, None or -1 = all CPU cores)
+    :type n_jobs: integer
+    :return: tuple (frequent itemsets (of items ids) in DataFrame type, with the columns support and itemsets, stats),
+    where stats has the following format: { "transactions": ..., "sample_size": ..., "support_error": ...,
+    "delta": ..., "verified": boolean, "candidates": ..., "false_positives": ..., "missed_border": ... }
+    """
+    if min_support <= 0.:
+        raise ValueError('`min_support` must be a positive number within the interval `(0, 1]`. Got %s.' % min_support)
+
+    no_transactions = one_hot_trans.shape[0]
+    sample_size = min(get_sample_size(epsilon, delta), no_transactions)
+    stats = {'transactions': no_transactions, 'sample_size': sample_size, 'support_error': 0.0, 'delta': delta,
+             'verified': False, 'candidates': 0, 'false_positives': 0, 'missed_border': 0}
+    if sample_size == no_transactions:
+        # The sample would be all transactions, so they are mined exactly (without lowering the minimum support nor
+        # verifying the itemsets)
+        freq_prod = mine_frequent_itemsets(one_hot_trans, min_support, n_jobs=n_jobs)
+        stats['candidates'] = freq_prod.shape[0]
+        return freq_prod, stats
+
+    rng = np.random.default_rng(random_state)
+    sample = np.sort(rng.choice(no_transactions, size=sample_size, replace=False))
+    stats['support_error'] = get_support_error(sample_size, delta)
+    stats['verified'] = verify
+
+    # With the verification the sample is mined with a lowered minimum support, so that less frequent itemsets are
+    # missed (the false positives are removed by the verification)
+    sample_min_support = max(min_support - epsilon, 1 / max(sample_size, 1)) if verify else min_support
+    candidates = mine_frequent_itemsets(one_hot_trans[sample], sample_min_support, n_jobs=n_jobs)
+    stats['candidates'] = candidates.shape[0]
+    if not verify:
+        return candidates, stats
+
+    itemsets = candidates['itemsets'].tolist()
+    border = get_negative_border(set(itemsets), list(range(one_hot_trans.shape[1])))
+    counts = count_itemsets(one_hot_trans, itemsets + border)
+
+    # Single items are compared by relative support and the other itemsets by support count (as in mlxtend)
+    min_count = math.ceil(min_support * no_transactions)
+    lengths = np.array([len(itemset) for itemset in itemsets + border], dtype=np.int64)
+    frequent = np.where(lengths == 1, counts / float(no_transactions) >= min_support, counts >= min_count)
+    stats['false_positives'] = int((~frequent[:len(itemsets)]).sum())
+    stats['missed_border'] = int(frequent[len(itemsets):].sum())
+
+    # The frequent itemsets of the negative border are also returned (if there is any, some of their supersets can
+    # still be missing)
+    freq_prod = pd.DataFrame({'support': counts[frequent] / float(no_transactions),
+                              'itemsets': [itemset for itemset, is_frequent in zip(itemsets + border, frequent) if
+                                           is_frequent]}, columns=['support', 'itemsets'])
+
+    return freq_prod, stats
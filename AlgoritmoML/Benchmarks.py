@@ -0,0 +1,322 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from mlxtend.frequent_patterns import association_rules
+
+from DatasetCache import clear_cache, load_movies_arrays
+from FPGrowthAlgo import calculate_rules_kulc_imbalance, generate_frequent_movies_itemsets, mine_association_rules
+from RatingsReader import load_ratings_arrays
+from RuleIndex import RuleIndex
+from TransactionEncoding import encode_transactions_sparse
+
+ALGORITMO_ML_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ENCODING_CODE = {
+    "dense": """
+import pandas as pd
+from mlxtend.preprocessing import TransactionEncoder
+from FPGrowthAlgo import read_data
+trans_full = read_data(FILENAME, IS_IMPLICIT)
+one_hot_encoding = TransactionEncoder()
+one_hot_trans = one_hot_encoding.fit(trans_full).transform(trans_full)
+one_hot_trans_df = pd.DataFrame(one_hot_trans, columns=one_hot_encoding.columns_)
+RESULT = {"rows": one_hot_trans_df.shape[0], "columns": one_hot_trans_df.shape[1]}
+""",
+    "sparse": """
+from TransactionEncoding import encode_transactions_sparse, sparse_transactions_dataframe
+one_hot_trans, movies_titles = encode_transactions_sparse(FILENAME, IS_IMPLICIT)
+one_hot_trans_df = sparse_transactions_dataframe(one_hot_trans)
+RESULT = {"rows": one_hot_trans_df.shape[0], "columns": one_hot_trans_df.shape[1]}
+""",
+    "sparse_pruned": """
+from TransactionEncoding import encode_transactions_sparse, sparse_transactions_dataframe
+one_hot_trans, movies_titles = encode_transactions_sparse(FILENAME, IS_IMPLICIT, MIN_SUPPORT)
+one_hot_trans_df = sparse_transactions_dataframe(one_hot_trans)
+RESULT = {"rows": one_hot_trans_df.shape[0], "columns": one_hot_trans_df.shape[1]}
+"""
+}
+
+
+def run_measured(code, variables):
+    """
+    Method that runs python code in a new process and returns its result and its peak resident set size (RSS)
+    :param code: python code to be executed (the result must be assigned to the variable RESULT)
+    :type code: string
+    :param variables: variables available to the code, with the following format: { "NAME": value }
+    :type variables: dictionary
+    :return: dictionary with the following format: { "result": ..., "peak_rss_mb": ..., "baseline_rss_mb": ... } or
+    None if the process failed (e.g. out of memory)
+    """
+    script = "import json, resource, sys\n"
+    script += "BASELINE = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    for name, value in variables.items():
+        script += "%s = %r\n" % (name, value)
+    script += code
+    # ru_maxrss is in kilobytes in Linux
+    script += "\nprint(json.dumps({'result': RESULT, " \
+              "'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, " \
+              "'baseline_rss_mb': BASELINE / 1024}))\n"
+    process = subprocess.run([sys.executable, "-c", script], cwd=ALGORITMO_ML_DIR, capture_output=True, text=True)
+    if process.returncode != 0:
+        return None
+
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def benchmark_encoding_peak_rss(filenames, is_implicit, min_support=0.1):
+    """
+    Method that reports the peak RSS of the one hot encoding of the transactions, with the dense (TransactionEncoder)
+    and the sparse (CSR) formats, and with the sparse format after pruning the infrequent movies, for each csv file
+    :param filenames: paths where the csv files are located (these files must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filenames: list of strings
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support used to prune the infrequent movies (sparse_pruned format)
+    :type min_support: float
+    :return: dictionary with the following format: { "filename": { "dense": {...}, "sparse": {...},
+    "sparse_pruned": {...} } }
+    """
+    results = {}
+    for filename in filenames:
+        results[filename] = {}
+        for encoding, code in ENCODING_CODE.items():
+            measure = run_measured(code, {"FILENAME": os.path.abspath(filename), "IS_IMPLICIT": is_implicit,
+                                          "MIN_SUPPORT": min_support})
+            results[filename][encoding] = measure
+            if measure is None:
+                print(filename + " (" + encoding + "): falhou (memória insuficiente?)")
+            else:
+                print(filename + " (" + encoding + "): " + str(round(measure['peak_rss_mb'], 1)) + " MB, " + str(
+                    measure['result']['rows']) + " x " + str(measure['result']['columns']))
+
+    return results
+
+# benchmark_encoding_peak_rss(['datasets/userRatings5k.csv', 'datasets/userRatings50k.csv',
+#                              'datasets/userRatings200k.csv'], is_implicit=True)
+
+
+def same_rules(rules, other_rules):
+    """
+    Method that verifies if two dataframes of association rules are equal row for row, including the order in which the
+    items of the antecedents and consequents are iterated (which defines the order of the recommended items)
+    :param rules: association rules
+    :type rules: dataframe
+    :param other_rules: association rules
+    :type other_rules: dataframe
+    :return: boolean
+    """
+    if not rules.equals(other_rules):
+        return False
+
+    return all(list(rules[column].iloc[i]) == list(other_rules[column].iloc[i]) for column in
+               ['antecedents', 'consequents'] for i in range(len(rules)))
+
+
+def benchmark_mining(filename, is_implicit, min_support, rule_metric, rule_metric_threshold, repeat=3):
+    """
+    Method that compares the fp-growth implementations (mlxtend and FPGrowthMiner), verifying if both generate the same
+    association rules (row for row) and reporting the best mining time of each one
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the association rules
+    :type min_support: float
+    :param rule_metric: metric rule for the association rules
+    :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+    :param rule_metric_threshold: minimum value of metric rule
+    :type rule_metric_threshold: float
+    :param repeat: number of times that each implementation is executed
+    :type repeat: integer
+    :return: dictionary with the following format: { "mlxtend": seconds, "native": seconds, "speedup": ...,
+    "same_rules": boolean }
+    """
+    one_hot_trans, movies_titles = encode_transactions_sparse(filename, is_implicit)
+    results = {}
+    rules = {}
+    for engine in ["mlxtend", "native"]:
+        times = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            freq_prod = generate_frequent_movies_itemsets(one_hot_trans, movies_titles, min_support, engine)
+            times.append(time.perf_counter() - start)
+        results[engine] = min(times)
+        rules[engine] = association_rules(freq_prod, metric=rule_metric, min_threshold=rule_metric_threshold)
+
+    results["speedup"] = results["mlxtend"] / results["native"]
+    results["same_rules"] = same_rules(rules["mlxtend"], rules["native"])
+    print("mlxtend: " + str(round(results["mlxtend"], 4)) + "s, native: " + str(
+        round(results["native"], 4)) + "s (x" + str(round(results["speedup"], 1)) + "), mesmas regras: " + str(
+        results["same_rules"]))
+
+    return results
+
+# benchmark_mining('datasets/userRatings5k.csv', is_implicit=True, min_support=0.1, rule_metric="confidence",
+#                  rule_metric_threshold=0.6)
+
+
+def benchmark_dataset_cache(filename, movies_filename, repeat=3):
+    """
+    Method that reports the load times of the ratings and movies csv files without the binary cache (cold, the csv file
+    is parsed and the cache is written) and with the binary cache (warm, the .npy files are memory mapped)
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: movieId, title, genres, ...)
+    :type movies_filename: string
+    :param repeat: number of times that each load is executed
+    :type repeat: integer
+    :return: dictionary with the following format: { "ratings": { "cold": seconds, "warm": seconds }, "movies": {...} }
+    """
+    loaders = {"ratings": (filename, load_ratings_arrays), "movies": (movies_filename, load_movies_arrays)}
+    results = {}
+    for kind, (csv_filename, load_arrays) in loaders.items():
+        cold_times = []
+        warm_times = []
+        for i in range(repeat):
+            clear_cache(csv_filename, kind)
+            start = time.perf_counter()
+            load_arrays(csv_filename)
+            cold_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            arrays = load_arrays(csv_filename)
+            # The memory mapped arrays are read, so that the time includes reading the data from disk
+            for array in arrays.values():
+                array.sum() if array.dtype.kind in 'iuf' else array[-1:]
+            warm_times.append(time.perf_counter() - start)
+        results[kind] = {"cold": min(cold_times), "warm": min(warm_times)}
+        print(kind + ": cold " + str(round(results[kind]["cold"], 4)) + "s, warm " + str(
+            round(results[kind]["warm"], 4)) + "s")
+
+    return results
+
+# benchmark_dataset_cache('datasets/userRatings5k.csv', 'datasets/movies.csv')
+
+
+def match_rules_loop(association_rules, list_user_movies):
+    """
+    Method that returns the rules that contain at least one of the user items in its antecedents, by looping over the
+    rules and over the user items (the way the rules were matched before the bitsets of the RuleIndex)
+    :param association_rules: association rules
+    :type association_rules: dataframe
+    :param list_user_movies: list of items that user liked/interacted with
+    :type list_user_movies: string list
+    :return: list of positions of the rules in the dataframe
+    """
+    user_rules = []
+    for position, ruleInfo in enumerate(association_rules.itertuples()):
+        antecedents = list(frozenset(ruleInfo.antecedents))
+        count_ante = 0
+        for rule_consequent in list_user_movies:
+            if rule_consequent in antecedents:
+                count_ante += 1
+        if 1 <= count_ante <= len(antecedents):
+            user_rules.append(position)
+
+    return user_rules
+
+
+def benchmark_rule_matching(filename, is_implicit, min_support, rule_metric, rule_metric_threshold, users_list_movies,
+                            repeat=3):
+    """
+    Method that compares the matching of the rules that can be applied to the users items with nested loops and with
+    the bitsets of the RuleIndex, verifying if both find the same rules and reporting the best time of each one
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the association rules
+    :type min_support: float
+    :param rule_metric: metric rule for the association rules
+    :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+    :param rule_metric_threshold: minimum value of metric rule
+    :type rule_metric_threshold: float
+    :param users_list_movies: list of items of each user
+    :type users_list_movies: list of string lists
+    :param repeat: number of times that each matching is executed
+    :type repeat: integer
+    :return: dictionary with the following format: { "loop": seconds, "bitset": seconds, "speedup": ...,
+    "same_rules": boolean }
+    """
+    association_rules, list_transactions_size = mine_association_rules(filename, is_implicit, min_support, rule_metric,
+                                                                       rule_metric_threshold)
+    rule_index = RuleIndex(calculate_rules_kulc_imbalance(association_rules, list_transactions_size))
+    matchers = {
+        "loop": (lambda list_user_movies: match_rules_loop(association_rules, list_user_movies), association_rules),
+        "bitset": (rule_index.get_user_rules, rule_index.rules)
+    }
+    results = {}
+    users_rules = {}
+    for matcher, (match_rules, rules) in matchers.items():
+        times = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            users_rules_ids = [match_rules(list_user_movies) for list_user_movies in users_list_movies]
+            times.append(time.perf_counter() - start)
+        results[matcher] = min(times)
+        # The rules are compared by their antecedents and consequents (the order of the rules is different)
+        users_rules[matcher] = [set(zip(rules['antecedents'].iloc[rules_ids], rules['consequents'].iloc[rules_ids]))
+                                for rules_ids in users_rules_ids]
+
+    results["speedup"] = results["loop"] / results["bitset"]
+    results["same_rules"] = users_rules["loop"] == users_rules["bitset"]
+    print(str(len(rule_index)) + " regras, " + str(len(users_list_movies)) + " utilizadores - loop: " + str(
+        round(results["loop"], 4)) + "s, bitset: " + str(round(results["bitset"], 4)) + "s (x" + str(
+        round(results["speedup"], 1)) + "), mesmas regras: " + str(results["same_rules"]))
+
+    return results
+
+# benchmark_rule_matching('datasets/userRatings5k.csv', is_implicit=True, min_support=0.1, rule_metric="confidence",
+#                         rule_metric_threshold=0.6,
+#                         users_list_movies=[["No More School (2000)"],
+#                                            ['Lord of the Rings: The Fellowship of the Ring, The (2001)']])
+
+
+def benchmark_parallel_mining(filename, is_implicit, min_support, n_jobs_list=(1, 2, 4, 8), repeat=3):
+    """
+    Method that reports the wall-clock time of the native fp-growth with different numbers of worker processes,
+    verifying if all of them generate the same frequent itemsets (row for row) as the serial mining
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the frequent itemsets
+    :type min_support: float
+    :param n_jobs_list: numbers of worker processes to be measured (the first one is the reference of the speedups)
+    :type n_jobs_list: list of integers
+    :param repeat: number of times that the mining is executed with each number of processes
+    :type repeat: integer
+    :return: dictionary with the following format: { n_jobs: { "seconds": ..., "speedup": ..., "same_itemsets":
+    boolean } }
+    """
+    one_hot_trans, movies_titles = encode_transactions_sparse(filename, is_implicit)
+    results = {}
+    reference = None
+    for n_jobs in n_jobs_list:
+        times = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            freq_prod = generate_frequent_movies_itemsets(one_hot_trans, movies_titles, min_support, "native", n_jobs)
+            times.append(time.perf_counter() - start)
+        if reference is None:
+            reference = (min(times), freq_prod)
+        results[n_jobs] = {"seconds": min(times), "speedup": reference[0] / min(times),
+                           "same_itemsets": freq_prod.equals(reference[1])}
+        print(str(n_jobs) + " processo(s): " + str(round(results[n_jobs]["seconds"], 4)) + "s (x" + str(
+            round(results[n_jobs]["speedup"], 2)) + "), mesmos itemsets: " + str(results[n_jobs]["same_itemsets"]))
+
+    return results
+
+# Measured on a machine with 1 CPU core (userRatings50k.csv, implicit data), before the number of processes was limited
+# to the number of cores: 1, 2, 4 and 8 processes took 0.54s, 0.70s, 0.76s and 0.93s with min_support=0.1 and 1.21s,
+# 1.50s, 1.57s and 1.78s with min_support=0.05 (no speedup without more cores, so all of them now mine serially there)
+# benchmark_parallel_mining('datasets/userRatings50k.csv', is_implicit=True, min_support=0.1)
@@ -3,6 +3,8 @@ import json
 import pandas as pd
 import ast
 
+from RatingsReader import read_ratings_rows
+
 
 def read_data(filename, qty_users):
     """
@@ -14,19 +16,7 @@ def read_data(filename, qty_users):
     :type qty_users: integer (between 1 and 200000)
     :return: list of transactions with all users' movies
     """
-    with open(filename, encoding='utf-8') as fp:
-        reader = csv.reader(fp)
-        next(reader, None)  # skip the headers
-        USERID, MOVIETITLE, RATING = 0, 1, 2
-        ratings_list = []
-        tot_users = str(qty_users + 1)
-        for line in reader:
-            if line[USERID] == tot_users:
-                break
-            new_line = [line[USERID], line[MOVIETITLE], line[RATING]]
-            ratings_list.append(new_line)
-
-    return ratings_list
+    return read_ratings_rows(filename, qty_users)
 
 
 # print(read_data('datasets/movies.csv', qtyUsers))
@@ -1,9 +1,9 @@
 import json
-import csv
 import pandas as pd
-from mlxtend.preprocessing import TransactionEncoder
-from mlxtend.frequent_patterns import association_rules, fpgrowth
 from matplotlib import pyplot as plt
+from FPGrowthMiner import mine_frequent_itemsets
+from RatingsReader import read_transactions
+from TransactionEncoding import decode_itemsets, encode_transactions_sparse
 
 
 def get_csv_headers(filename):
@@ -36,27 +36,7 @@ def read_data(filename, is_implicit):
     :type is_implicit: boolean
     :return: list of transactions with all users' items
     """
-    with open(filename, encoding='utf-8') as fp:
-        USERID, MOVIETITLE, RATING = 0, 1, 2
-        reader = csv.reader(fp)
-        next(reader, None)  # skip the headers
-        ratings_dict = {}
-        if is_implicit:
-            for line in reader:
-                if line[USERID] in ratings_dict.keys():
-                    ratings_dict[line[USERID]].append((line[MOVIETITLE]))
-                else:
-                    ratings_dict[line[USERID]] = [(line[MOVIETITLE])]
-        else:
-            for line in reader:
-                if float(line[RATING]) >= 3.0:
-                    if line[USERID] in ratings_dict.keys():
-                        ratings_dict[line[USERID]].append((line[MOVIETITLE]))
-                    else:
-                        ratings_dict[line[USERID]] = [(line[MOVIETITLE])]
-    fp.close()
-
-    return list(ratings_dict.values())
+    return read_transactions(filename, is_implicit)[0]
 
 
 # print(json.dumps(read_data('datasets/userRatings5k.csv',isImplicit=False), ensure_ascii=False, indent=2))
@@ -107,24 +87,14 @@ def generate_frequent_itemsets(filename, min_support, is_implicit):
     :type is_implicit: boolean
     :return: frequent itemsets in DataFrame type
     """
-    trans_full = read_data(filename, is_implicit)
-    # print(transFull)  # Output of transfull (list of lists of items)
-    # Encoding transactions (Representation of the items in the list in 0's and 1's)
-
-    # Initialize one hot encoding transactions
-    one_hot_encoding = TransactionEncoder()
-
-    # Data is transformed into one hot encoding format
-    one_hot_trans = one_hot_encoding.fit(trans_full).transform(trans_full)
+    # Encoding transactions in sparse one hot encoding format (users x movies), where the movies are integer ids
+    one_hot_trans, movies_titles = encode_transactions_sparse(filename, is_implicit)
 
-    # Converted into dataframe
-    one_hot_trans_df = pd.DataFrame(one_hot_trans, columns=one_hot_encoding.columns_)
-    # Output of items dataframe transformed into a binary data (one hot encoding)
-    # print(one_hot_trans_df.head(5))
-    # print('Number of columns :', one_hot_trans_df.shape[1])
+    # print('Number of columns :', one_hot_trans.shape[1])
 
-    # Generating association rules
-    freq_prod = fpgrowth(one_hot_trans_df, min_support=min_support, use_colnames=True)
+    # Generating frequent itemsets (of movies ids) and converting them into itemsets of movies titles
+    freq_prod = mine_frequent_itemsets(one_hot_trans, min_support)
+    freq_prod['itemsets'] = decode_itemsets(freq_prod['itemsets'], movies_titles)
     # print(freq_prod.to_string())  # Output of frequent products rules
 
     return freq_prod
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Folder (created next to each csv file) where the binary versions of the csv files are stored
+CACHE_FOLDER = '.cache'
+METADATA_FILENAME = 'metadata.json'
+# Version of the format of the binary versions (the binary versions of older formats are built again)
+CACHE_VERSION = 2
+
+# files_hashes = { (path, size, mtime_ns): SHA-1 hash } (files already hashed by this process)
+files_hashes = {}
+
+
+def get_cache_folder(filename, kind):
+    """
+    Method that returns the path of the folder where the binary version of a csv file is stored
+    :param filename: path where the csv file is located
+    :type filename: string
+    :param kind: kind of data stored (e.g. "ratings", "movies")
+    :type kind: string
+    :return: path of the cache folder
+    """
+    folder, name = os.path.split(os.path.abspath(filename))
+
+    return os.path.join(folder, CACHE_FOLDER, name + '.' + kind)
+
+
+def get_file_hash(filename):
+    """
+    Method that returns the SHA-1 hash of the content of a file
+    :param filename: path where the file is located
+    :type filename: string
+    :return: SHA-1 hash (hexadecimal string)
+    """
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as fp:
+        for block in iter(lambda: fp.read(1 << 20), b''):
+            sha1.update(block)
+    fp.close()
+
+    return sha1.hexdigest()
+
+
+def get_file_fingerprint(filename):
+    """
+    Method that returns the SHA-1 hash of the content of a file, which is only computed once for each path, size and
+    modification time of the file (the following calls reuse it)
+    :param filename: path where the file is located
+    :type filename: string
+    :return: SHA-1 hash (hexadecimal string)
+    """
+    file_stat = os.stat(filename)
+    key = (os.path.abspath(filename), file_stat.st_size, file_stat.st_mtime_ns)
+    if key not in files_hashes:
+        files_hashes[key] = get_file_hash(filename)
+
+    return files_hashes[key]
+
+
+def read_metadata(cache_folder):
+    """
+    Method that reads the metadata of a cache folder
+    :param cache_folder: path of the cache folder
+    :type cache_folder: string
+    :return: dictionary with the following format: { "version": ..., "size": ..., "mtime_ns": ..., "sha1": ...,
+    "arrays": [...] } or
+    None if the cache doesn't exist
+    """
+    try:
+        with open(os.path.join(cache_folder, METADATA_FILENAME), encoding='utf-8') as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+
+def write_metadata(cache_folder, metadata):
+    """
+    Method that writes the metadata of a cache folder (the file is replaced at once, so that a partially written
+    metadata file is never read)
+    :param cache_folder: path of the cache folder
+    :type cache_folder: string
+    :param metadata: metadata with the following format: { "version": ..., "size": ..., "mtime_ns": ..., "sha1": ...,
+    "arrays": [...] }
+    :type metadata: dictionary
+    """
+    temp_filename = os.path.join(cache_folder, METADATA_FILENAME + '.tmp')
+    with open(temp_filename, 'w', encoding='utf-8') as fp:
+        json.dump(metadata, fp)
+    fp.close()
+    os.replace(temp_filename, os.path.join(cache_folder, METADATA_FILENAME))
+
+
+def is_cache_valid(filename, cache_folder, metadata):
+    """
+    Method that verifies if the binary version of a csv file corresponds to the current content of the csv file. The
+    file is only hashed when its size is the same but its modification time has changed
+    :param filename: path where the csv file is located
+    :type filename: string
+    :param cache_folder: path of the cache folder
+    :type cache_folder: string
+    :param metadata: metadata of the cache folder
+    :type metadata: dictionary
+    :return: True if the cache is valid, otherwise it will return False
+    """
+    if metadata is None or metadata.get('version') != CACHE_VERSION:
+        return False
+    file_stat = os.stat(filename)
+    if metadata['size'] != file_stat.st_size:
+        return False
+    if metadata['mtime_ns'] != file_stat.st_mtime_ns:
+        if metadata['sha1'] != get_file_fingerprint(filename):
+            return False
+        # Same content (e.g. copied file), only the modification time is updated
+        metadata['mtime_ns'] = file_stat.st_mtime_ns
+        write_metadata(cache_folder, metadata)
+
+    return True
+
+
+def load_cached_arrays(filename, kind, build_arrays):
+    """
+    Method that returns the arrays parsed from a csv file. The first time (or when the csv file changes) the arrays are
+    built and stored in .npy files, the following times the .npy files are memory mapped (without parsing the csv file)
+    :param filename: path where the csv file is located
+    :type filename: string
+    :param kind: kind of data stored (e.g. "ratings", "movies")
+    :type kind: string
+    :param build_arrays: method without parameters that parses the csv file and returns the arrays with the following
+    format: { "name": numpy array } (the arrays can't have the object dtype)
+    :type build_arrays: function
+    :return: dictionary with the following format: { "name": numpy array }
+    """
+    cache_folder = get_cache_folder(filename, kind)
+    metadata = read_metadata(cache_folder)
+    if is_cache_valid(filename, cache_folder, metadata):
+        return {name: np.load(os.path.join(cache_folder, name + '.npy'), mmap_mode='r') for name in
+                metadata['arrays']}
+
+    file_stat = os.stat(filename)
+    arrays = build_arrays()
+    try:
+        shutil.rmtree(cache_folder, ignore_errors=True)
+        os.makedirs(cache_folder)
+        for name, array in arrays.items():
+            np.save(os.path.join(cache_folder, name + '.npy'), array, allow_pickle=False)
+        write_metadata(cache_folder, {'version': CACHE_VERSION, 'size': file_stat.st_size,
+                                      'mtime_ns': file_stat.st_mtime_ns, 'sha1': get_file_fingerprint(filename),
+                                      'arrays': list(arrays.keys())})
+    except OSError:
+        # If the cache can't be written the arrays are returned anyway
+        pass
+
+    return arrays
+
+
+def get_dataset_hash(filename, kind='ratings'):
+    """
+    Method that returns the SHA-1 hash of the content of a csv file, reusing the hash stored with its binary version
+    (if the binary version is valid) or the hash already computed by this process instead of reading the whole file
+    :param filename: path where the csv file is located
+    :type filename: string
+    :param kind: kind of data stored (e.g. "ratings", "movies")
+    :type kind: string
+    :return: SHA-1 hash (hexadecimal string)
+    """
+    cache_folder = get_cache_folder(filename, kind)
+    metadata = read_metadata(cache_folder)
+    if is_cache_valid(filename, cache_folder, metadata):
+        return metadata['sha1']
+
+    return get_file_fingerprint(filename)
+
+
+def clear_cache(filename, kind):
+    """
+    Method that deletes the binary version of a csv file
+    :param filename: path where the csv file is located
+    :type filename: string
+    :param kind: kind of data stored (e.g. "ratings", "movies")
+    :type kind: string
+    """
+    shutil.rmtree(get_cache_folder(filename, kind), ignore_errors=True)
+
+
+def read_movies_arrays(movies_filename):
+    """
+    Method that parses a csv file with the movies information
+    :param movies_filename: path where the csv file is located (this file must be in csv format and its first 3
+    columns must be: movieId, title, genres)
+    :type movies_filename: string
+    :return: dictionary with the following format: { "movies_ids": ..., "titles": ..., "genres": ... }
+    """
+    movies = pd.read_csv(movies_filename, usecols=[0, 1, 2], header=0, names=['movieId', 'title', 'genres'],
+                         dtype={'movieId': 'int64', 'title': str, 'genres': str}, keep_default_na=False,
+                         na_values=[], encoding='utf-8')
+
+    return {'movies_ids': movies['movieId'].to_numpy(),
+            'titles': movies['title'].to_numpy(dtype=str),
+            'genres': movies['genres'].to_numpy(dtype=str)}
+
+
+def load_movies_arrays(movies_filename, use_cache=True):
+    """
+    Method that returns the movies information of a csv file, using its binary version when it's available
+    :param movies_filename: path where the csv file is located (this file must be in csv format and its first 3
+    columns must be: movieId, title, genres)
+    :type movies_filename: string
+    :param use_cache: if the binary version of the csv file is used/created or not
+    :type use_cache: boolean
+    :return: dictionary with the following format: { "movies_ids": ..., "titles": ..., "genres": ... }
+    """
+    if not use_cache:
+        return read_movies_arrays(movies_filename)
+
+    return load_cached_arrays(movies_filename, 'movies', lambda: read_movies_arrays(movies_filename))
@@ -1,8 +1,23 @@
 import csv
+import os
+import time
 
+import numpy as np
 import pandas as pd
 from mlxtend.frequent_patterns import association_rules, fpgrowth
-from mlxtend.preprocessing import TransactionEncoder
+
+from ApproximateMiner import mine_sample_itemsets
+from FPGrowthMiner import filter_itemsets_type, mine_frequent_itemsets, mine_top_k_itemsets
+from MovieCatalog import get_movie_catalog
+from OutOfCoreMiner import mine_frequent_itemsets_out_of_core
+from RatingsReader import read_transactions
+from RulesStore import encode_itemsets_arrays, load_itemsets, load_rules, save_itemsets, save_rules
+from RuleIndex import RuleIndex, iter_descending_order, select_top_n_items
+from TransactionEncoding import decode_itemsets, encode_transactions_sparse, sparse_transactions_dataframe
+
+# Number of rules of the same consequents compared at a time by get_dominated_rules (bounds the size of the block x rules
+# comparison)
+DOMINANCE_BLOCK_SIZE = 256
 
 
 def read_data(filename, is_implicit):
@@ -15,27 +30,7 @@ def read_data(filename, is_implicit):
     :type is_implicit: boolean
     :return: list of transactions with all users' items
     """
-    with open(filename, encoding='utf-8') as fp:
-        USERID, MOVIETITLE, RATING = 0, 1, 2
-        reader = csv.reader(fp)
-        next(reader, None)  # skip the headers
-        ratings_dict = {}
-        if is_implicit:
-            for line in reader:
-                if line[USERID] in ratings_dict.keys():
-                    ratings_dict[line[USERID]].append((line[MOVIETITLE]))
-                else:
-                    ratings_dict[line[USERID]] = [(line[MOVIETITLE])]
-        else:
-            for line in reader:
-                if float(line[RATING]) >= 3.0:
-                    if line[USERID] in ratings_dict.keys():
-                        ratings_dict[line[USERID]].append((line[MOVIETITLE]))
-                    else:
-                        ratings_dict[line[USERID]] = [(line[MOVIETITLE])]
-    fp.close()
-
-    return list(ratings_dict.values())
+    return read_transactions(filename, is_implicit)[0]
 
 
 # print(len(read_data(filename='datasets/userRatings5k.csv', is_implicit=False)))
@@ -106,9 +101,94 @@ def calculate_imbalance_ratio(sup_a, sup_b, sup_ab, total_transactions):
 # print(calculate_imbalance_ratio(sup_a=0.052466, sup_b=0.255516, sup_ab=0.021251, total_transactions=9835))
 
 
-def generate_association_rules(filename, is_implicit, min_support, rule_metric, rule_metric_threshold):
+def generate_frequent_movies_itemsets(one_hot_trans, movies_titles, min_support, engine="native", n_jobs=1):
     """
-    Method that generates association rules
+    Method that generates frequent itemsets of movies using fp-growth algorithm
+    :param one_hot_trans: one hot encoding of the transactions (one row for each user and one column for each movie)
+    :type one_hot_trans: scipy.sparse matrix
+    :param movies_titles: list of titles indexed by the columns of the one hot encoding matrix
+    :type movies_titles: list of strings
+    :param min_support: minimum support for the frequent itemsets
+    :type min_support: float
+    :param engine: fp-growth implementation ("native" = FPGrowthMiner over integer movies ids, "mlxtend" = mlxtend)
+    :type engine: string
+    :param n_jobs: number of worker processes used by the native engine (1 = serial mining, None or -1 = all CPU
+    cores), the frequent itemsets are the same whatever the number of processes
+    :type n_jobs: integer
+    :return: frequent itemsets (of movies titles) in DataFrame type
+    """
+    if engine == "native":
+        freq_prod = mine_frequent_itemsets(one_hot_trans, min_support, n_jobs=n_jobs)
+    elif engine == "mlxtend":
+        freq_prod = fpgrowth(sparse_transactions_dataframe(one_hot_trans), min_support=min_support)
+    else:
+        raise ValueError("Engine must be 'native' or 'mlxtend', got '{}'".format(engine))
+
+    # Converting itemsets of movies ids into itemsets of movies titles
+    freq_prod['itemsets'] = decode_itemsets(freq_prod['itemsets'], movies_titles)
+
+    return freq_prod
+
+
+def mine_frequent_movies_itemsets(filename, is_implicit, min_support, engine="native", use_store=True, n_jobs=1):
+    """
+    Method that generates the frequent itemsets of movies of a csv file and returns them with the number of
+    transactions. The frequent itemsets are stored on disk apart from the association rules, so they are only mined once
+    for each csv file content and minimum support, whatever the rule metric and its threshold
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the frequent itemsets
+    :type min_support: float
+    :param engine: fp-growth implementation ("native" = FPGrowthMiner over integer movies ids, "mlxtend" = mlxtend,
+    "out_of_core" = OutOfCoreMiner, which streams the csv file twice instead of loading it into memory)
+    :type engine: string
+    :param use_store: if the frequent itemsets are read from/written to the artifact store or not
+    :type use_store: boolean
+    :param n_jobs: number of worker processes used by the native engine (1 = serial mining, None or -1 = all CPU
+    cores), the frequent itemsets are the same whatever the number of processes
+    :type n_jobs: integer
+    :return: tuple (frequent itemsets in DataFrame type, number of transactions, seconds spent mining the frequent
+    itemsets)
+    """
+    # The number of processes isn't part of the key, since the frequent itemsets are the same whatever its value
+    params = [is_implicit, min_support, engine]
+    if use_store:
+        stored = load_itemsets(filename, params)
+        if stored is not None:
+            return stored
+
+    start = time.perf_counter()
+    if engine == "out_of_core":
+        # Streaming the csv file twice, without loading all the ratings into memory
+        freq_prod, no_transactions = mine_frequent_itemsets_out_of_core(filename, is_implicit, min_support,
+                                                                        n_jobs=n_jobs)
+    else:
+        # Encoding transactions in sparse one hot encoding format (users x movies), where the movies are integer ids
+        # (the movies with lower support than the minimum support are pruned before the encoding)
+        one_hot_trans, movies_titles = encode_transactions_sparse(filename, is_implicit, min_support)
+        # print('Number of columns :', one_hot_trans.shape[1])
+
+        # Generating frequent itemsets
+        freq_prod = generate_frequent_movies_itemsets(one_hot_trans, movies_titles, min_support, engine, n_jobs)
+        no_transactions = one_hot_trans.shape[0]
+    # print(freq_prod.to_string())  # Output of frequent products rules
+    mining_time = time.perf_counter() - start
+    if use_store:
+        save_itemsets(filename, params, freq_prod, no_transactions, mining_time)
+
+    return freq_prod, no_transactions, mining_time
+
+
+def mine_association_rules(filename, is_implicit, min_support, rule_metric, rule_metric_threshold, engine="native",
+                           use_store=True, n_jobs=1):
+    """
+    Method that generates association rules and returns them with the number of transactions (read in the same pass
+    over the csv file). The mining results are stored on disk, so the same request (same csv file content and
+    parameters) is only mined once, and requests that only change the rule metric or its threshold reuse the frequent
+    itemsets already mined
     :param filename: path where the csv file is located (this file must be in csv format and must contain
     the following columns: userId, movieTitle, rating)
     :type filename: string
@@ -120,45 +200,419 @@ def generate_association_rules(filename, is_implicit, min_support, rule_metric,
     :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
     :param rule_metric_threshold: minimum value of metric rule
     :type rule_metric_threshold: float
+    :param engine: fp-growth implementation ("native" = FPGrowthMiner over integer movies ids, "mlxtend" = mlxtend,
+    "out_of_core" = OutOfCoreMiner, which streams the csv file twice instead of loading it into memory)
+    :type engine: string
+    :param use_store: if the mining results are read from/written to the artifact store or not
+    :type use_store: boolean
+    :param n_jobs: number of worker processes used by the native engine (1 = serial mining, None or -1 = all CPU
+    cores), the frequent itemsets are the same whatever the number of processes
+    :type n_jobs: integer
+    :return: tuple (association rules in DataFrame type, number of transactions)
+    """
+    params = [is_implicit, min_support, engine, rule_metric, rule_metric_threshold]
+    if use_store:
+        stored = load_rules(filename, params)
+        if stored is not None:
+            return stored
+
+    freq_prod, no_transactions, mining_time = mine_frequent_movies_itemsets(filename, is_implicit, min_support, engine,
+                                                                            use_store, n_jobs)
+
+    # Generating association rules with a certain metric and its threshold value
+    rules = association_rules(freq_prod, metric=rule_metric, min_threshold=rule_metric_threshold)
+    if use_store:
+        save_rules(filename, params, rules, no_transactions)
+
+    return rules, no_transactions
+
+
+def generate_association_rules(filename, is_implicit, min_support, rule_metric, rule_metric_threshold,
+                               engine="native", n_jobs=1):
+    """
+    Method that generates association rules
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
     :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
     :type is_implicit: boolean
+    :param min_support: minimum support for the association rules
+    :type min_support: float
+    :param rule_metric: metric rule for the association rules
+    :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+    :param rule_metric_threshold: minimum value of metric rule
+    :type rule_metric_threshold: float
+    :param engine: fp-growth implementation ("native" = FPGrowthMiner over integer movies ids, "mlxtend" = mlxtend,
+    "out_of_core" = OutOfCoreMiner, which streams the csv file twice instead of loading it into memory)
+    :type engine: string
+    :param n_jobs: number of worker processes used by the native engine (1 = serial mining, None or -1 = all CPU
+    cores), the frequent itemsets are the same whatever the number of processes
+    :type n_jobs: integer
     :return: association rules in DataFrame type
     """
-    trans_full = read_data(filename, is_implicit)
-    # print(trans_full)  # Output of transfull (list of lists of items)
-    # Encoding transactions (Representation of the items in the list in 0's and 1's)
+    return mine_association_rules(filename, is_implicit, min_support, rule_metric, rule_metric_threshold, engine,
+                                  n_jobs=n_jobs)[0]
+
+
+# min_support=0.1 e min_confidence=0.6
+# print(generate_association_rules(filename="datasets/userRatings5k.csv", is_implicit=True, min_support=0.1,
+#                                  rule_metric="confidence",
+#                                  rule_metric_threshold=0.6).to_string())
 
-    # Initialize one hot encoding transactions
-    one_hot_encoding = TransactionEncoder()
 
-    # Data is transformed into one hot encoding format
-    one_hot_trans = one_hot_encoding.fit(trans_full).transform(trans_full)
+def mine_top_k_frequent_movies_itemsets(filename, is_implicit, k, min_len=1):
+    """
+    Method that generates the k most frequent itemsets of movies of a csv file (with at least min_len movies), in a
+    single mining run, without a minimum support (the minimum support is raised while the itemsets are mined)
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param k: number of itemsets
+    :type k: integer
+    :param min_len: minimum number of movies of the itemsets counted as one of the k itemsets (the itemsets with less
+    movies that are at least as frequent are also returned)
+    :type min_len: integer
+    :return: tuple (frequent itemsets (of movies titles) in DataFrame type, number of transactions, minimum support
+    reached)
+    """
+    one_hot_trans, movies_titles = encode_transactions_sparse(filename, is_implicit)
+    freq_prod, min_support = mine_top_k_itemsets(one_hot_trans, k, min_len)
+    freq_prod['itemsets'] = decode_itemsets(freq_prod['itemsets'], movies_titles)
 
-    # Converted into dataframe
-    one_hot_trans_df = pd.DataFrame(one_hot_trans, columns=one_hot_encoding.columns_)
-    # Output of items dataframe transformed into a binary data (one hot encoding)
-    # print(one_hot_trans_df.head(5))
-    # print('Number of columns :', one_hot_trans_df.shape[1])
+    return freq_prod, one_hot_trans.shape[0], min_support
 
-    # Generating association rules
-    freq_prod = fpgrowth(one_hot_trans_df, min_support=min_support, use_colnames=True)
-    # print(freq_prod.to_string())  # Output of frequent products rules
 
-    # Generating association rules with a certain metric and its threshold value
+def generate_top_k_association_rules(filename, is_implicit, k, rule_metric, rule_metric_threshold):
+    """
+    Method that generates the association rules of the k most frequent itemsets with at least 2 movies, without having
+    to guess the minimum support (the minimum support reached is returned, so that it can be used by the other methods)
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param k: number of itemsets with at least 2 movies from which the rules are generated
+    :type k: integer
+    :param rule_metric: metric rule for the association rules
+    :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+    :param rule_metric_threshold: minimum value of metric rule
+    :type rule_metric_threshold: float
+    :return: tuple (association rules in DataFrame type, number of transactions, minimum support reached)
+    """
+    freq_prod, no_transactions, min_support = mine_top_k_frequent_movies_itemsets(filename, is_implicit, k, min_len=2)
     rules = association_rules(freq_prod, metric=rule_metric, min_threshold=rule_metric_threshold)
+    print("Top " + str(k) + " itemsets: suporte mínimo atingido " + str(round(min_support, 6)) + ", " + str(
+        rules.shape[0]) + " regras")
+
+    return rules, no_transactions, min_support
+
+
+# rules, noTransactions, minSupport = generate_top_k_association_rules(filename="datasets/userRatings5k.csv",
+#                                                                      is_implicit=True, k=500,
+#                                                                      rule_metric="confidence",
+#                                                                      rule_metric_threshold=0.6)
+
+
+def generate_approximate_association_rules(filename, is_implicit, min_support, rule_metric, rule_metric_threshold,
+                                           epsilon=0.01, delta=0.05, verify=True, random_state=None):
+    """
+    Method that generates association rules from the frequent itemsets of a random sample of the users (e.g. to explore
+    the parameters of the mining quickly), reporting the expected support error (see mine_sample_itemsets)
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the association rules
+    :type min_support: float
+    :param rule_metric: metric rule for the association rules
+    :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+    :param rule_metric_threshold: minimum value of metric rule
+    :type rule_metric_threshold: float
+    :param epsilon: maximum support error of the sample (the smaller it is, the bigger the sample)
+    :type epsilon: float (values between 0.0 and 1.0)
+    :param delta: probability of the support error of an itemset being greater than epsilon
+    :type delta: float (values between 0.0 and 1.0)
+    :param verify: if the frequent itemsets of the sample are verified over all users (exact supports) or not
+    :type verify: boolean
+    :param random_state: seed of the random sample (None = different sample each time)
+    :type random_state: integer
+    :return: tuple (association rules in DataFrame type, number of transactions, stats of the sample, with the format
+    of mine_sample_itemsets)
+    """
+    one_hot_trans, movies_titles = encode_transactions_sparse(filename, is_implicit)
+    freq_prod, stats = mine_sample_itemsets(one_hot_trans, min_support, epsilon, delta, verify, random_state)
+    freq_prod['itemsets'] = decode_itemsets(freq_prod['itemsets'], movies_titles)
+    rules = association_rules(freq_prod, metric=rule_metric, min_threshold=rule_metric_threshold)
+
+    print("Amostra de " + str(stats['sample_size']) + " de " + str(stats['transactions']) + " utilizadores, erro de "
+          "suporte esperado: " + str(round(stats['support_error'], 4)) + " (probabilidade " + str(
+        1 - delta) + "), " + str(rules.shape[0]) + " regras")
+    if verify:
+        print("Candidatos: " + str(stats['candidates']) + ", falsos positivos removidos: " + str(
+            stats['false_positives']) + ", itemsets frequentes na fronteira negativa: " + str(stats['missed_border']))
+
+    return rules, one_hot_trans.shape[0], stats
+
+
+# rules, noTransactions, sampleStats = generate_approximate_association_rules(filename="datasets/userRatings200k.csv",
+#                                                                             is_implicit=True, min_support=0.1,
+#                                                                             rule_metric="confidence",
+#                                                                             rule_metric_threshold=0.6,
+#                                                                             epsilon=0.01, verify=False)
+
+
+def filter_rules_itemsets_type(association_rules, freq_prod, itemsets_type):
+    """
+    Method that returns the association rules whose itemset (antecedents and consequents) is of a certain type. With
+    the closed itemsets the rules removed are redundant: for each one there is a rule kept with the same antecedents,
+    support and confidence and with more consequents (the closure of its itemset), which satisfies any threshold of the
+    rule metric, so no recommended movie is lost. With the maximal itemsets only the rules of the longest itemsets are
+    kept (less rules, but some recommendations can be lost)
+    :param association_rules: association rules generated
+    :type association_rules: dataframe
+    :param freq_prod: all frequent itemsets from which the rules were generated
+    :type freq_prod: dataframe
+    :param itemsets_type: type of itemsets ("all", "closed" or "maximal")
+    :type itemsets_type: string
+    :return: association rules (in dataframe) of the itemsets of the type
+    """
+    if itemsets_type == "all":
+        return association_rules
+
+    itemsets = set(filter_itemsets_type(freq_prod, itemsets_type)['itemsets'])
+    mask = np.fromiter((antecedents | consequents in itemsets for antecedents, consequents in
+                        zip(association_rules['antecedents'], association_rules['consequents'])), dtype=bool,
+                       count=association_rules.shape[0])
+
+    return association_rules[mask].reset_index(drop=True)
+
+
+def generate_condensed_association_rules(filename, is_implicit, min_support, rule_metric, rule_metric_threshold,
+                                         itemsets_type="closed"):
+    """
+    Method that generates the association rules of the closed or maximal frequent itemsets only, reporting the
+    reduction ratio of the itemsets and of the rules
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the association rules
+    :type min_support: float
+    :param rule_metric: metric rule for the association rules
+    :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+    :param rule_metric_threshold: minimum value of metric rule
+    :type rule_metric_threshold: float
+    :param itemsets_type: type of itemsets ("closed" = non-redundant rules, "maximal" = rules of the longest itemsets)
+    :type itemsets_type: string
+    :return: tuple (association rules in DataFrame type, number of transactions, reduction ratio of the rules, with
+    values between 0.0 and 1.0)
+    """
+    association_rules, list_transactions_size = mine_association_rules(filename, is_implicit, min_support,
+                                                                       rule_metric, rule_metric_threshold)
+    freq_prod = mine_frequent_movies_itemsets(filename, is_implicit, min_support)[0]
+    rules = filter_rules_itemsets_type(association_rules, freq_prod, itemsets_type)
+    no_itemsets = filter_itemsets_type(freq_prod, itemsets_type).shape[0]
+
+    reduction_ratio = 1 - rules.shape[0] / association_rules.shape[0] if association_rules.shape[0] > 0 else 0.0
+    print("Itemsets " + itemsets_type + ": " + str(no_itemsets) + " de " + str(freq_prod.shape[0]) + ", regras: " + str(
+        rules.shape[0]) + " de " + str(association_rules.shape[0]) + " (redução de " + str(
+        round(reduction_ratio * 100, 2)) + "%)")
+
+    return rules, list_transactions_size, reduction_ratio
+
+
+# rules, noTransactions, reductionRatio = generate_condensed_association_rules(filename="datasets/userRatings5k.csv",
+#                                                                              is_implicit=True, min_support=0.1,
+#                                                                              rule_metric="confidence",
+#                                                                              rule_metric_threshold=0.6,
+#                                                                              itemsets_type="closed")
+
+
+def round_array(values, decimals=0):
+    """
+    Method that rounds all values of an array with the same semantics of python's round (round half to even over the
+    exact value of each float)
+    :param values: values to be rounded
+    :type values: numpy float array
+    :param decimals: number of decimal places
+    :type decimals: integer
+    :return: numpy float array with the values rounded
+    """
+    rounded = np.round(values, decimals)
+    if decimals != 0:
+        # numpy rounds values * 10 ** decimals, which isn't exact, so the values close to a tie are rounded by python
+        scaled = values * 10.0 ** decimals
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        if near_tie.any():
+            rounded[near_tie] = [round(value, decimals) for value in values[near_tie].tolist()]
+
+    return rounded
+
+
+def calculate_kulczynski_columns(sup_a, sup_b, sup_ab, total_transactions):
+    """
+    Method that calculates the Kulczynski metric of many association rules at once (same results as
+    calculate_kulczynski)
+    :param sup_a: support count of antecedents of each rule
+    :type sup_a: numpy float array
+    :param sup_b: support count of consequents of each rule
+    :type sup_b: numpy float array
+    :param sup_ab: support count of antecedents and consequents of each rule
+    :type sup_ab: numpy float array
+    :param total_transactions: number of total transactions
+    :type total_transactions: integer
+    :return: numpy float array with the Kulczynski result of each association rule
+    """
+    # Absolute Support A, B and (A U B)
+    abs_sup_countA = round_array(sup_a * total_transactions)
+    abs_sup_countB = round_array(sup_b * total_transactions)
+    abs_sup_countAB = round_array(sup_ab * total_transactions)
+
+    # P(B|A) and P(A|B)
+    pBA = round_array(abs_sup_countAB / abs_sup_countA, 6)
+    pAB = round_array(abs_sup_countAB / abs_sup_countB, 6)
+
+    return round_array(0.5 * (pAB + pBA), 6)
+
+
+def calculate_imbalance_ratio_columns(sup_a, sup_b, sup_ab, total_transactions):
+    """
+    Method that calculates the imbalance ratio metric of many association rules at once (same results as
+    calculate_imbalance_ratio)
+    :param sup_a: support count of antecedents of each rule
+    :type sup_a: numpy float array
+    :param sup_b: support count of consequents of each rule
+    :type sup_b: numpy float array
+    :param sup_ab: support count of antecedents and consequents of each rule
+    :type sup_ab: numpy float array
+    :param total_transactions: number of total transactions
+    :type total_transactions: integer
+    :return: numpy float array with the imbalance ratio result of each association rule
+    """
+    # Absolute Support A, B and (A U B)
+    abs_sup_countA = round_array(sup_a * total_transactions)
+    abs_sup_countB = round_array(sup_b * total_transactions)
+    abs_sup_countAB = round_array(sup_ab * total_transactions)
+
+    return round_array(np.abs(abs_sup_countA - abs_sup_countB) / (abs_sup_countA + abs_sup_countB - abs_sup_countAB), 6)
+
+
+def calculate_rules_kulc_imbalance(association_rules, total_transactions):
+    """
+    Method that calculates the Kulczynski and Imbalance Ratio metrics of all association rules
+    :param association_rules: association rules generated
+    :type association_rules: dataframe
+    :param total_transactions: number of total transactions
+    :type total_transactions: integer
+    :return: association rules (in dataframe) with the Kulczynski and Imbalance Ratio metrics
+    """
+    rules = association_rules[['antecedents', 'consequents', 'antecedent support', 'consequent support', 'support',
+                               'confidence', 'lift']].reset_index(drop=True)
+    sup_a = rules['antecedent support'].to_numpy(dtype=float)
+    sup_b = rules['consequent support'].to_numpy(dtype=float)
+    sup_ab = rules['support'].to_numpy(dtype=float)
+    rules['kulczynski'] = calculate_kulczynski_columns(sup_a, sup_b, sup_ab, total_transactions)
+    rules['imbalance ratio'] = calculate_imbalance_ratio_columns(sup_a, sup_b, sup_ab, total_transactions)
 
     return rules
 
 
-# min_support=0.1 e min_confidence=0.6
-# print(generate_association_rules(filename="datasets/userRatings5k.csv", is_implicit=True, min_support=0.1,
-#                                  rule_metric="confidence",
-#                                  rule_metric_threshold=0.6).to_string())
+def filter_rules_kulc_imbalance(rules, min_kulc_value, min_imbalance_ratio_value):
+    """
+    Method that returns the association rules that satisfy the values assigned to Kulczynski and Imbalance Ratio
+    :param rules: association rules with the Kulczynski and Imbalance Ratio metrics
+    :type rules: dataframe
+    :param min_kulc_value: minimum value of Kulczynski metric
+    :type min_kulc_value: float
+    :param min_imbalance_ratio_value: minimum value of Imbalance Ratio metric
+    :type min_imbalance_ratio_value: float
+    :return: association rules (in dataframe) that satisfy the defined metrics
+    """
+    # The more lesser Imbalance Ratio is, better (0 = perfectly balanced, 1 = unbalanced) and the more greater
+    # Kulczynski is better (0.5 = not interesting rule, Close to 0 = itemsets negatively associated,
+    # Close to 1 = itemsets positively associated)
+    mask = (rules['imbalance ratio'].to_numpy() <= min_imbalance_ratio_value) & (
+            rules['kulczynski'].to_numpy() >= min_kulc_value)
+
+    return rules[mask].reset_index(drop=True)
+
+
+def get_itemsets_bitsets(itemsets):
+    """
+    Method that encodes itemsets into bitsets (one bit for each item, in words of 64 bits)
+    :param itemsets: itemsets of movies titles
+    :type itemsets: series of frozensets
+    :return: tuple (numpy uint64 matrix with one row for each itemset, numpy integer array with the number of items of
+    each itemset)
+    """
+    titles = sorted({title for itemset in itemsets for title in itemset})
+    indptr, indices = encode_itemsets_arrays(itemsets, {title: title_id for title_id, title in enumerate(titles)})
+    lengths = np.diff(indptr)
+    bitsets = np.zeros((len(lengths), max((len(titles) + 63) // 64, 1)), dtype=np.uint64)
+    np.bitwise_or.at(bitsets, (np.repeat(np.arange(len(lengths)), lengths), indices // 64),
+                     np.left_shift(np.uint64(1), (indices % 64).astype(np.uint64)))
+
+    return bitsets, lengths
+
+
+def get_dominated_rules(rules):
+    """
+    Method that verifies which association rules are dominated: the rule X -> Y is dominated if there is a more general
+    rule X' -> Y (X' is a proper subset of X) with equal or higher confidence. The rules are grouped by consequents and
+    the antecedents of each group are compared with bitsets, in blocks of rules at once (each block only with the rules
+    with shorter antecedents)
+    :param rules: association rules
+    :type rules: dataframe
+    :return: numpy bool array (True = dominated rule)
+    """
+    dominated = np.zeros(rules.shape[0], dtype=bool)
+    if rules.shape[0] == 0:
+        return dominated
+
+    bitsets, lengths = get_itemsets_bitsets(rules['antecedents'])
+    confidence = rules['confidence'].to_numpy(dtype=float)
+    consequents_ids, _ = pd.factorize(rules['consequents'])
+    order = np.argsort(consequents_ids, kind='stable')
+    for group in np.split(order, np.cumsum(np.bincount(consequents_ids))[:-1]):
+        if len(group) < 2:
+            continue
+        # The rules of the group are sorted by the length of the antecedents, so the rules that can be more general than
+        # a block of rules are the ones before the first rule with the length of the longest antecedents of the block
+        group = group[np.argsort(lengths[group], kind='stable')]
+        group_lengths = lengths[group]
+        for start in range(np.searchsorted(group_lengths, group_lengths[0], side='right'), len(group),
+                           DOMINANCE_BLOCK_SIZE):
+            block = group[start:start + DOMINANCE_BLOCK_SIZE]
+            candidates = group[:np.searchsorted(group_lengths, lengths[block[-1]])]
+            # more_general[i, j] = antecedents of the rule j are a proper subset of the antecedents of the rule i
+            more_general = (confidence[candidates][None, :] >= confidence[block][:, None]) & (
+                    lengths[candidates][None, :] < lengths[block][:, None])
+            for word in range(bitsets.shape[1]):
+                more_general &= (bitsets[candidates, word][None, :] & ~bitsets[block, word][:, None]) == 0
+            dominated[block] = more_general.any(axis=1)
+
+    return dominated
+
+
+def prune_dominated_rules(rules):
+    """
+    Method that removes the dominated association rules (X -> Y when there is a rule X' -> Y, with X' a proper subset
+    of X, whose confidence is equal or higher), since the more general rule already recommends the same movies with at
+    least the same confidence
+    :param rules: association rules
+    :type rules: dataframe
+    :return: association rules (in dataframe) that aren't dominated
+    """
+    return rules[~get_dominated_rules(rules)].reset_index(drop=True)
 
 
 def generate_association_rules_kulc_imbalance(filename, is_implicit, min_support, rule_metric, min_rule_metric_value,
                                               min_kulc_value,
-                                              min_imbalance_ratio_value):
+                                              min_imbalance_ratio_value, itemsets_type="all", prune_dominated=False):
     """
     Method that will generate rules based on values assigned to Kulczynski and Imbalance Ratio
     :param filename: path where the csv file is located (this file must be in csv format and must contain
@@ -175,38 +629,27 @@ def generate_association_rules_kulc_imbalance(filename, is_implicit, min_support
     :type min_kulc_value: float
     :param min_imbalance_ratio_value: minimum value of Imbalance Ratio metric
     :type min_imbalance_ratio_value: float
+    :param itemsets_type: type of itemsets whose rules are kept before the Kulczynski and Imbalance Ratio filter
+    ("all", "closed" = non-redundant rules or "maximal" = rules of the longest itemsets)
+    :type itemsets_type: string
+    :param prune_dominated: if the dominated rules (see prune_dominated_rules) are removed after the Kulczynski and
+    Imbalance Ratio filter or not (e.g. before writing the rules with write_rules_csv)
+    :type prune_dominated: boolean
     :return: association rules (in dataframe) with the defined metrics
     """
-    list_transactions_size = len(read_data(filename, is_implicit))
-    association_rules = generate_association_rules(filename, is_implicit, min_support, rule_metric,
-                                                   min_rule_metric_value)
+    if itemsets_type == "all":
+        association_rules, list_transactions_size = mine_association_rules(filename, is_implicit, min_support,
+                                                                           rule_metric, min_rule_metric_value)
+    else:
+        association_rules, list_transactions_size, reduction_ratio = generate_condensed_association_rules(
+            filename, is_implicit, min_support, rule_metric, min_rule_metric_value, itemsets_type)
     # print(association_rules.to_string()) # Output of all association rules with metrics applied
-    temp_user_rules_association = []
-    association_rules_list = []
-    for ruleInfo in association_rules.itertuples():
-        new_rule = {'antecedents': ruleInfo.antecedents,
-                    'consequents': ruleInfo.consequents,
-                    'antecedent support': ruleInfo._3,
-                    'consequent support': ruleInfo._4,
-                    'support': ruleInfo.support,
-                    'confidence': ruleInfo.confidence,
-                    'lift': ruleInfo.lift,
-                    'kulczynski': calculate_kulczynski(sup_a=ruleInfo._3, sup_b=ruleInfo._4, sup_ab=ruleInfo.support,
-                                                       total_transactions=list_transactions_size),
-                    'imbalance ratio': calculate_imbalance_ratio(sup_a=ruleInfo._3, sup_b=ruleInfo._4,
-                                                                 sup_ab=ruleInfo.support,
-                                                                 total_transactions=list_transactions_size)}
-        temp_user_rules_association.append(new_rule)
-
-        # The more lesser Imbalance Ratio is, better (0 = perfectly balanced, 1 = unbalanced) and the more greater
-        # Kulczynski is better (0.5 = not interesting rule, Close to 0 = itemsets negatively associated,
-        # Close to 1 = itemsets positively associated)
-    for userRuleAssociation in temp_user_rules_association:
-        if userRuleAssociation['imbalance ratio'] <= min_imbalance_ratio_value and userRuleAssociation[
-            'kulczynski'] >= min_kulc_value:
-            association_rules_list.append(userRuleAssociation)
-
-    rules = pd.DataFrame(association_rules_list)
+    rules = calculate_rules_kulc_imbalance(association_rules, list_transactions_size)
+    rules = filter_rules_kulc_imbalance(rules, min_kulc_value, min_imbalance_ratio_value)
+    if prune_dominated:
+        no_rules = rules.shape[0]
+        rules = prune_dominated_rules(rules)
+        print("Regras dominadas removidas: " + str(no_rules - rules.shape[0]) + " de " + str(no_rules))
 
     return rules
 
@@ -218,6 +661,15 @@ def generate_association_rules_kulc_imbalance(filename, is_implicit, min_support
 #                                                   min_kulc_value=0.6,
 #                                                   min_imbalance_ratio_value=0.3)
 
+# prunedRules = generate_association_rules_kulc_imbalance(filename='datasets/userRatings5k.csv',
+#                                                         is_implicit=True,
+#                                                         min_support=0.1,
+#                                                         rule_metric="confidence", min_rule_metric_value=0.6,
+#                                                         min_kulc_value=0.6,
+#                                                         min_imbalance_ratio_value=0.3,
+#                                                         prune_dominated=True)
+# write_rules_csv('rulesCsv/rules5kUsersImp.csv', prunedRules)
+
 
 # print(rules.to_string())
 
@@ -225,6 +677,59 @@ def generate_association_rules_kulc_imbalance(filename, is_implicit, min_support
 # print(rules.shape[0])
 
 
+def sweep_association_rules(filename, is_implicit, min_support, rule_metrics_thresholds, kulc_imbalance_thresholds):
+    """
+    Method that generates the association rules of several combinations of thresholds (rule metric, Kulczynski and
+    Imbalance Ratio) over the same frequent itemsets, which are only mined once, reporting the mining time saved
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the association rules
+    :type min_support: float
+    :param rule_metrics_thresholds: rule metrics and their minimum values, with the following format:
+    [(rule_metric, min_rule_metric_value), ...]
+    :type rule_metrics_thresholds: list of tuples
+    :param kulc_imbalance_thresholds: minimum values of Kulczynski and Imbalance Ratio metrics, with the following
+    format: [(min_kulc_value, min_imbalance_ratio_value), ...]
+    :type kulc_imbalance_thresholds: list of tuples
+    :return: tuple (association rules of each combination, with the following format:
+    { (rule_metric, min_rule_metric_value, min_kulc_value, min_imbalance_ratio_value): rules }, seconds of mining saved)
+    """
+    start = time.perf_counter()
+    freq_prod, list_transactions_size, mining_time = mine_frequent_movies_itemsets(filename, is_implicit, min_support)
+    itemsets_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sweep_rules = {}
+    for rule_metric, min_rule_metric_value in rule_metrics_thresholds:
+        association_rules_metric = association_rules(freq_prod, metric=rule_metric,
+                                                     min_threshold=min_rule_metric_value)
+        rules = calculate_rules_kulc_imbalance(association_rules_metric, list_transactions_size)
+        for min_kulc_value, min_imbalance_ratio_value in kulc_imbalance_thresholds:
+            sweep_rules[(rule_metric, min_rule_metric_value, min_kulc_value, min_imbalance_ratio_value)] = \
+                filter_rules_kulc_imbalance(rules, min_kulc_value, min_imbalance_ratio_value)
+    derivation_time = time.perf_counter() - start
+
+    # Without reusing the frequent itemsets they would be mined again for each combination of thresholds (the
+    # itemsets time is lower than the mining time when the itemsets are read from the artifact store)
+    time_saved = mining_time * len(sweep_rules) - itemsets_time
+    print(str(len(sweep_rules)) + " combinações de limiares, itemsets frequentes: " + str(round(itemsets_time, 4)) +
+          "s (mineração: " + str(round(mining_time, 4)) + "s), geração das regras: " + str(
+        round(derivation_time, 4)) + "s, tempo de mineração poupado: " + str(round(time_saved, 4)) + "s")
+
+    return sweep_rules, time_saved
+
+
+# sweepRules, timeSaved = sweep_association_rules(filename='datasets/userRatings5k.csv',
+#                                                 is_implicit=True,
+#                                                 min_support=0.1,
+#                                                 rule_metrics_thresholds=[("confidence", 0.5), ("confidence", 0.6),
+#                                                                          ("lift", 1.0), ("lift", 1.5)],
+#                                                 kulc_imbalance_thresholds=[(0.5, 0.3), (0.6, 0.3), (0.6, 0.5)])
+
+
 def get_all_movies(movies_filename):
     """
     Method that returns a list of all movies in  a csv file
@@ -256,19 +761,28 @@ def verify_movie_exists(movies_filename, user_list_movies):
     :type movies_filename: string
     :param user_list_movies: user list movies
     :type user_list_movies: list of string
-    :return:
+    :return: list of movies not found
     """
-    movies = get_all_movies(movies_filename)
-    movies_not_found = []
-    for userMovie in user_list_movies:
-        if userMovie not in movies:
-            movies_not_found.append(userMovie)
-
-    return movies_not_found
+    # The titles are looked up in the movie catalog (loaded once and only reloaded when the csv file is modified)
+    return get_movie_catalog(movies_filename).get_missing_movies(user_list_movies)
 
 
 # print(verify_movie_exists('new_movies.csv'))
 
+
+def verify_movies_exist_batch(movies_filename, users_list_movies):
+    """
+    Method that given the list movies of many users verifies, for each user, if any movie exists or not
+    :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: movieId, title, genres, imdbid, tmdbid, release_date, year, poster)
+    :type movies_filename: string
+    :param users_list_movies: list movies of each user
+    :type users_list_movies: list of lists of strings
+    :return: list with the movies not found of each user (in the same order of users_list_movies)
+    """
+    return get_movie_catalog(movies_filename).get_missing_movies_batch(users_list_movies)
+
+
 def get_popular_rules_movies(rules, no_movies, user_movies):
     """
     Method that returns the most popular movies based on the user movies list
@@ -278,16 +792,59 @@ def get_popular_rules_movies(rules, no_movies, user_movies):
     :type no_movies: integer
     :param user_movies: user movies list
     :type user_movies: list of strings
-    :return: list of popular movies with lenght of noMovies
+    :return: list of popular movies with lenght of noMovies (or less, if there aren't enough movies)
+    """
+    # Only the rules needed to find no_movies distinct movies are sorted by confidence
+    consequents = rules['consequents'].to_numpy()
+    rules_consequents = (consequents[position] for position in iter_descending_order(rules['confidence'].to_numpy()))
+
+    return select_top_n_items(rules_consequents, set(user_movies), no_movies)
+
+
+# rule_indexes = { (filename, is_implicit, min_support, rule_metric, min_rule_metric_value): (file mtime, RuleIndex) }
+rule_indexes = {}
+
+
+def get_rule_index(filename, is_implicit, min_support, rule_metric, min_rule_metric_value):
+    """
+    Method that returns the rule index of the association rules generated with certain parameters. The rules are only
+    mined the first time (or when the csv file is modified), otherwise it's returned the rule index already built
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the association rules
+    :type min_support: float (values between 0.0 and 1.0)
+    :param rule_metric: metric rule for the association rules
+    :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+    :param min_rule_metric_value: minimum value of metric rule
+    :type min_rule_metric_value: float
+    :return: rule index of the association rules
+    """
+    key = (os.path.abspath(filename), is_implicit, min_support, rule_metric, min_rule_metric_value)
+    file_mtime = os.path.getmtime(filename)
+    if key not in rule_indexes or rule_indexes[key][0] != file_mtime:
+        association_rules, list_transactions_size = mine_association_rules(filename, is_implicit, min_support,
+                                                                           rule_metric, min_rule_metric_value)
+        rules = calculate_rules_kulc_imbalance(association_rules, list_transactions_size)
+        rule_indexes[key] = (file_mtime, RuleIndex(rules))
+
+    return rule_indexes[key][1]
+
+
+def get_movies_not_found_message(movies_not_found):
+    """
+    Method that returns the message given when it's not possible to recommend items because some movies don't exist
+    :param movies_not_found: list of movies not found
+    :type movies_not_found: list of strings
+    :return: message with the movies not found
     """
-    pop_items = []
-    for popRule in rules.sort_values('confidence', ascending=False).itertuples():
-        consequents = list(frozenset(popRule.consequents))
-        for consequent in consequents:
-            if consequent not in pop_items and len(pop_items) < no_movies and consequent not in user_movies:
-                pop_items.append(consequent)
-            if len(pop_items) == no_movies:
-                return pop_items
+    movieStr = ""
+    for movie in movies_not_found:
+        movieStr += movie + " "
+
+    return "Não foi possível recomendar itens, pois o(s) seguinte(s) filme(s) não existe(m): " + movieStr
 
 
 def recommend_to_user(list_user_movies, is_implicit, filename, movies_filename, min_support, rule_metric,
@@ -318,75 +875,19 @@ def recommend_to_user(list_user_movies, is_implicit, filename, movies_filename,
     :return: list of the best recommended items for the user or if some of the movies do
     """
 
-    if len(verify_movie_exists(movies_filename, list_user_movies)) > 0:
-        movieStr = ""
-        for movie in verify_movie_exists(movies_filename, list_user_movies):
-            movieStr += movie + " "
-        return "Não foi possível recomendar itens, pois o(s) seguinte(s) filme(s) não existe(m): " + movieStr
-    else:
-        list_transactions_size = len(read_data(filename, is_implicit))
-        association_rules = generate_association_rules(filename, is_implicit, min_support, rule_metric,
-                                                       min_rule_metric_value)
-        # print(association_rules.to_string()) # Output of all association rules with metrics applied
-        temp_user_rules_association = []
-        association_rules_list = []
-        for ruleInfo in association_rules.itertuples():
-            antecedents = list(frozenset(ruleInfo.antecedents))
-            # Verify if an user item exists in antecedents columns in rules
-            count_ante = 0
-
-            for rule_consequent in list_user_movies:
-                if rule_consequent in antecedents:
-                    count_ante += 1
-
-            if 1 <= count_ante <= len(antecedents):
-                new_rule = {'antecedents': ruleInfo.antecedents,
-                            'consequents': ruleInfo.consequents,
-                            'antecedent support': ruleInfo._3,
-                            'consequent support': ruleInfo._4,
-                            'support': ruleInfo.support,
-                            'confidence': ruleInfo.confidence,
-                            'lift': ruleInfo.lift,
-                            'kulczynski': calculate_kulczynski(sup_a=ruleInfo._3, sup_b=ruleInfo._4,
-                                                               sup_ab=ruleInfo.support,
-                                                               total_transactions=list_transactions_size),
-                            'imbalance ratio': calculate_imbalance_ratio(sup_a=ruleInfo._3, sup_b=ruleInfo._4,
-                                                                         sup_ab=ruleInfo.support,
-                                                                         total_transactions=list_transactions_size)}
-                temp_user_rules_association.append(new_rule)
-
-        # The more lesser Imbalance Ratio is, better (0 = perfectly balanced, 1 = unbalanced) and the more greater
-        # Kulczynski is better (0.5 = not interesting rule, Close to 0 = itemsets negatively associated,
-        # Close to 1 = itemsets positively associated)
-        for userRuleAssociation in temp_user_rules_association:
-            if userRuleAssociation['imbalance ratio'] <= min_imbalance_ratio_value and userRuleAssociation[
-                'kulczynski'] >= min_kulc_value:
-                association_rules_list.append(userRuleAssociation)
-
-        # If there isn't any rule generated it will be recommended to the user the popular items
-        if len(association_rules_list) == 0:
-            print("Não foi possível recomendar items, items populares:")
-            return get_popular_rules_movies(association_rules, top_n, list_user_movies)
-
-        all_filtered_rules = pd.DataFrame(association_rules_list).sort_values('confidence', ascending=False)
-
-        # print(recommended_items.to_string()) # Output of topN recommended rules
-        top_n_items = []
-        # Top N Recommended Items (Dataframe type)
-        for filtered_rule in all_filtered_rules.itertuples():
-            rule_consequents = list(frozenset(filtered_rule.consequents))
-            # Remove duplicated recommended items
-            for rule_consequent in rule_consequents:
-                if rule_consequent not in top_n_items:
-                    if rule_consequent not in list_user_movies:
-                        if len(top_n_items) < top_n:
-                            top_n_items.append(rule_consequent)
-                        else:
-                            break
+    movies_not_found = verify_movie_exists(movies_filename, list_user_movies)
+    if len(movies_not_found) > 0:
+        return get_movies_not_found_message(movies_not_found)
+
+    # The rules are only mined the first time, the following requests are answered by the rule index
+    rule_index = get_rule_index(filename, is_implicit, min_support, rule_metric, min_rule_metric_value)
+    top_n_items = rule_index.recommend(list_user_movies, min_kulc_value, min_imbalance_ratio_value, top_n)
+
+    # If there isn't any rule generated it will be recommended to the user the popular items
+    if len(top_n_items) == 0:
+        print("Não foi possível recomendar items, items populares:")
+        return rule_index.get_popular_items(top_n, list_user_movies)
 
-        if len(top_n_items) == 0:
-            print("Não foi possível recomendar items, items populares:")
-            return get_popular_rules_movies(association_rules, top_n, list_user_movies)
     return top_n_items
 
 
@@ -410,6 +911,66 @@ def recommend_to_user(list_user_movies, is_implicit, filename, movies_filename,
 # print(recommItems.to_string())
 
 
+def recommend_batch(users_list_movies, is_implicit, filename, movies_filename, min_support, rule_metric,
+                    min_rule_metric_value, min_kulc_value, min_imbalance_ratio_value, top_n, full_match=False):
+    """
+    Method that returns top n recommended items for many users at once (e.g. to precompute the recommendations of every
+    user), mining the rules only once and matching the rules of all users with sparse matrices
+    :param users_list_movies: list of items that each user liked/interacted with
+    :type users_list_movies: list of string lists
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: movieId, title, genres, imdbid, tmdbid, release_date, year, poster)
+    :type movies_filename: string
+    :param min_support: minimum support for the association rules
+    :type min_support: float (values between 0.0 and 1.0)
+    :param rule_metric: metric rule for the association rules
+    :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+    :param min_rule_metric_value: minimum value of metric rule
+    :type min_rule_metric_value: float
+    :param min_kulc_value: minimum value of kulczynski metric
+    :type min_kulc_value: float (values between 0.0 and 1.0)
+    :param min_imbalance_ratio_value: minimum value of imbalance ratio
+    :type min_imbalance_ratio_value: float (values between 0.0 and 1.0)
+    :param top_n: number of best recommendations
+    :type top_n: integer
+    :param full_match: if a rule is only applied when the user has all its antecedents (True) or at least one of its
+    antecedents (False, same as recommend_to_user)
+    :type full_match: boolean
+    :return: list with the result of each user (in the same order of users_list_movies), which is the same that
+    recommend_to_user returns: the best recommended items, the popular items or the message with the movies not found
+    """
+    users_movies_not_found = verify_movies_exist_batch(movies_filename, users_list_movies)
+    rule_index = get_rule_index(filename, is_implicit, min_support, rule_metric, min_rule_metric_value)
+    valid_users = [user for user, movies_not_found in enumerate(users_movies_not_found) if len(movies_not_found) == 0]
+    valid_users_top_n_items = rule_index.recommend_batch([users_list_movies[user] for user in valid_users],
+                                                         min_kulc_value, min_imbalance_ratio_value, top_n, full_match)
+
+    users_top_n_items = [get_movies_not_found_message(movies_not_found) for movies_not_found in users_movies_not_found]
+    for user, top_n_items in zip(valid_users, valid_users_top_n_items):
+        # If there isn't any rule to be applied it will be recommended to the user the popular items
+        if len(top_n_items) == 0:
+            top_n_items = rule_index.get_popular_items(top_n, users_list_movies[user])
+        users_top_n_items[user] = top_n_items
+
+    return users_top_n_items
+
+
+# usersRecommItems = recommend_batch(
+#     users_list_movies=[["No More School (2000)"], ['Lord of the Rings: The Fellowship of the Ring, The (2001)']],
+#     is_implicit=True,
+#     filename='datasets/userRatings5k.csv',
+#     movies_filename='datasets/movies.csv',
+#     min_support=0.1,
+#     rule_metric="confidence", min_rule_metric_value=0.6, min_kulc_value=0.6,
+#     min_imbalance_ratio_value=0.3,
+#     top_n=5)
+
+
 def write_rules_csv(to_csv_file, rules):
     """
     Method that writes association rules into a csv file
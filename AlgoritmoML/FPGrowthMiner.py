@@ -0,0 +1,661 @@
+import heapq
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# Conditional trees with fewer paths are mined without merging the equal paths (merging them costs more than it saves)
+MIN_PATHS_TO_COMPRESS = 64
+# Trees with fewer frequent items are mined serially (starting the worker processes costs more than it saves)
+MIN_ITEMS_TO_PARALLELIZE = 16
+
+
+def compress_packed_paths(packed, counts, no_columns):
+    """
+    Method that compresses transactions packed in bytes (np.packbits of each row) by merging the equal ones into a
+    single path whose count is the sum of their counts (transactions without any item are discarded). The unique paths
+    keep the order of their first occurrence, which is the order in which they are inserted in the tree
+    :param packed: transactions packed in bytes (one row for each transaction)
+    :type packed: numpy uint8 matrix
+    :param counts: number of times that each transaction occurs
+    :type counts: numpy integer array
+    :param no_columns: number of items (columns) of the transactions
+    :type no_columns: integer
+    :return: tuple (unique paths, counts of the unique paths)
+    """
+    not_empty = packed.any(axis=1)
+    packed, counts = np.ascontiguousarray(packed[not_empty]), counts[not_empty]
+    if packed.shape[0] <= 1:
+        return np.unpackbits(packed, axis=1, count=no_columns).view(bool), counts
+
+    # Each path is viewed as a single value, so that np.unique compares whole rows at once
+    keys = packed.view(np.dtype((np.void, packed.shape[1]))).reshape(-1)
+    _, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    unique_counts = np.bincount(inverse.reshape(-1), weights=counts, minlength=len(first_index)).astype(np.int64)
+    order = np.argsort(first_index)
+
+    # The unpacked bits (0 or 1) are viewed as booleans without another copy of the paths
+    return np.unpackbits(packed[first_index[order]], axis=1, count=no_columns).view(bool), unique_counts[order]
+
+
+def compress_paths(paths, counts):
+    """
+    Method that compresses transactions (paths of the FP-tree) by merging the equal ones into a single path whose count
+    is the sum of their counts (transactions without any item are discarded). The unique paths keep the order of their
+    first occurrence, which is the order in which they are inserted in the tree
+    :param paths: one hot encoding of the transactions (one row for each transaction and one column for each item)
+    :type paths: numpy bool matrix
+    :param counts: number of times that each transaction occurs
+    :type counts: numpy integer array
+    :return: tuple (unique paths, counts of the unique paths)
+    """
+    not_empty = paths.any(axis=1)
+    paths, counts = paths[not_empty], counts[not_empty]
+    if paths.shape[0] <= 1:
+        return paths, counts
+
+    return compress_packed_paths(np.packbits(paths, axis=1), counts, paths.shape[1])
+
+
+def build_fp_tree(one_hot_trans, items):
+    """
+    Method that builds the FP-tree of the transactions, represented by its unique paths (with the items ordered by
+    descending support) and the number of transactions that follow each path. The transactions are packed in bytes
+    straight from the rows of the sparse matrix (indptr/indices), so the transactions x items matrix is never dense
+    :param one_hot_trans: one hot encoding of the transactions (one row for each transaction and one column for each
+    item)
+    :type one_hot_trans: scipy.sparse matrix
+    :param items: items ids (columns) that will be part of the tree, ordered by descending support
+    :type items: numpy integer array
+    :return: tuple (unique paths, counts of the unique paths)
+    """
+    tree_trans = (one_hot_trans[:, items] != 0).tocsr()
+    no_transactions = tree_trans.shape[0]
+    rows = np.repeat(np.arange(no_transactions, dtype=np.int32), np.diff(tree_trans.indptr))
+    columns = tree_trans.indices
+    # Same bits as np.packbits (the first column of each byte is its most significant bit)
+    packed = np.zeros((no_transactions, (len(items) + 7) // 8), dtype=np.uint8)
+    np.bitwise_or.at(packed, (rows, columns // 8), (128 >> (columns % 8)).astype(np.uint8))
+
+    return compress_packed_paths(packed, np.ones(no_transactions, dtype=np.int64), len(items))
+
+
+def get_nodes_order(paths):
+    """
+    Method that returns the columns (items) of the tree in the order in which their first node is created when the
+    paths are inserted in the tree, i.e. by the first path that contains the item (ties by column). This is the order in
+    which mlxtend visits the items of a tree, so the itemsets are generated in the same order as in mlxtend
+    :param paths: paths of the tree (one column for each item, in the order of the items in the tree)
+    :type paths: numpy bool matrix
+    :return: numpy array of columns
+    """
+    first_paths = np.argmax(paths, axis=0)
+
+    return np.lexsort((np.arange(paths.shape[1]), first_paths))
+
+
+def is_single_path(paths):
+    """
+    Method that verifies if the tree is a single path, i.e. if every path is a prefix of the longest path (the same path
+    or the same items with less items at the end)
+    :param paths: paths of the tree (one column for each item, in the order of the items in the tree)
+    :type paths: numpy bool matrix
+    :return: boolean
+    """
+    if paths.shape[0] <= 1:
+        return True
+
+    lengths = paths.sum(axis=1)
+    longest_paths = paths[:, np.flatnonzero(paths[np.argmax(lengths)])]
+    # No path has items outside the longest path, and each one has its first items (no item after a missing one)
+    if (longest_paths.sum(axis=1) != lengths).any():
+        return False
+
+    return not (longest_paths[:, 1:] & ~longest_paths[:, :-1]).any()
+
+
+def grow_itemsets(paths, counts, items_counts, items, prefix, min_count, max_len, itemsets, supports):
+    """
+    Method that performs a recursive step of the FP-Growth algorithm: each item of the tree is added to the prefix
+    (suffix pattern) and then the conditional tree of each item (paths that contain the item, restricted to the more
+    frequent items) is mined recursively, in the same order as the fpg_step method of mlxtend
+    :param paths: paths of the tree (one column for each item, ordered by descending support)
+    :type paths: numpy bool matrix
+    :param counts: counts of the paths
+    :type counts: numpy integer array
+    :param items_counts: support count of each item of the tree
+    :type items_counts: numpy integer array
+    :param items: items ids of the columns of the tree
+    :type items: numpy integer array
+    :param prefix: items ids of the itemset that originated the tree
+    :type prefix: tuple of integers
+    :param min_count: minimum support count
+    :type min_count: integer
+    :param max_len: maximum length of the itemsets (None = no limit)
+    :type max_len: integer
+    :param itemsets: list where the frequent itemsets found are added
+    :type itemsets: list of tuples of integers
+    :param supports: list where the support counts of the frequent itemsets found are added
+    :type supports: list of integers
+    """
+    nodes_order = get_nodes_order(paths).tolist()
+    if is_single_path(paths):
+        # Single path tree: every combination of its items is frequent, with the count of its last item (the counts
+        # only decrease along the path)
+        max_length = len(items) if max_len is None else max_len - len(prefix)
+        for length in range(1, max_length + 1):
+            for columns in combinations(nodes_order, length):
+                itemsets.append(prefix + tuple(int(items[column]) for column in columns))
+                supports.append(int(items_counts[columns[-1]]))
+        return
+
+    if max_len is not None and len(prefix) >= max_len:
+        return
+    for column in nodes_order:
+        itemsets.append(prefix + (int(items[column]),))
+        supports.append(int(items_counts[column]))
+    for column in nodes_order:
+        grow_item_itemsets(paths, counts, items, column, prefix, min_count, max_len, itemsets, supports)
+
+
+def grow_item_itemsets(paths, counts, items, column, prefix, min_count, max_len, itemsets, supports):
+    """
+    Method that mines the conditional tree of an item of the tree (paths that contain the item, restricted to the more
+    frequent items, i.e. the previous columns), whose itemsets are the item and the prefix plus the itemsets of the
+    conditional tree. The items of the conditional tree are ordered as in the conditional_tree method of mlxtend: by
+    descending support, ties by the reverse order of their first occurrence in the paths
+    :param paths: paths of the tree (one column for each item, ordered by descending support)
+    :type paths: numpy bool matrix
+    :param counts: counts of the paths
+    :type counts: numpy integer array
+    :param items: items ids of the columns of the tree
+    :type items: numpy integer array
+    :param column: column of the item
+    :type column: integer
+    :param prefix: items ids of the itemset that originated the tree
+    :type prefix: tuple of integers
+    :param min_count: minimum support count
+    :type min_count: integer
+    :param max_len: maximum length of the itemsets (None = no limit)
+    :type max_len: integer
+    :param itemsets: list where the frequent itemsets found are added
+    :type itemsets: list of tuples of integers
+    :param supports: list where the support counts of the frequent itemsets found are added
+    :type supports: list of integers
+    """
+    itemset = prefix + (int(items[column]),)
+    if max_len is not None and len(itemset) >= max_len:
+        return
+
+    # Conditional tree of the item
+    rows = paths[:, column]
+    cond_paths = paths[rows, :column]
+    cond_counts = counts[rows]
+    cond_items_counts = cond_counts @ cond_paths
+    frequent = np.nonzero(cond_items_counts >= min_count)[0]
+    if len(frequent) == 0:
+        return
+
+    cond_paths = cond_paths[:, frequent]
+    first_occurrence = np.empty(len(frequent), dtype=np.int64)
+    first_occurrence[get_nodes_order(cond_paths)] = np.arange(len(frequent))
+    order = np.lexsort((-first_occurrence, -cond_items_counts[frequent]))
+    cond_paths = cond_paths[:, order]
+    if cond_paths.shape[0] > MIN_PATHS_TO_COMPRESS:
+        cond_paths, cond_counts = compress_paths(cond_paths, cond_counts)
+    grow_itemsets(cond_paths, cond_counts, cond_items_counts[frequent[order]], items[:column][frequent[order]],
+                  itemset, min_count, max_len, itemsets, supports)
+
+
+def group_items_columns(paths, no_groups):
+    """
+    Method that splits the columns (items) of the tree into groups with similar mining cost, assigning each column,
+    from the most to the least expensive, to the group with the lowest cost (the cost of a column is estimated by the
+    size of its conditional tree: number of paths with the item x number of more frequent items)
+    :param paths: unique paths of the tree (one column for each item, ordered by descending support)
+    :type paths: numpy bool matrix
+    :param no_groups: number of groups
+    :type no_groups: integer
+    :return: list of groups, each one with its columns in ascending order
+    """
+    costs = paths.sum(axis=0, dtype=np.int64) * np.arange(paths.shape[1])
+    groups = [[] for i in range(no_groups)]
+    groups_costs = np.zeros(no_groups, dtype=np.int64)
+    for column in np.argsort(-costs, kind='stable').tolist():
+        group = int(np.argmin(groups_costs))
+        groups[group].append(column)
+        groups_costs[group] += costs[column]
+
+    return [sorted(group) for group in groups if len(group) > 0]
+
+
+def get_group_shard(paths, counts, group):
+    """
+    Method that returns the group-dependent shard of the tree (as in Parallel FP-Growth): the paths that contain at
+    least one item of the group, restricted to the columns up to the last column of the group, which is all that is
+    needed to mine the conditional trees of the items of the group
+    :param paths: unique paths of the tree (one column for each item, ordered by descending support)
+    :type paths: numpy bool matrix
+    :param counts: counts of the paths
+    :type counts: numpy integer array
+    :param group: columns of the group (in ascending order)
+    :type group: list of integers
+    :return: tuple (paths of the shard, counts of the paths of the shard)
+    """
+    rows = paths[:, group].any(axis=1)
+
+    return paths[rows, :group[-1] + 1], counts[rows]
+
+
+def mine_group_itemsets(paths, counts, items, group, min_count, max_len):
+    """
+    Method that mines, in a worker process, the conditional trees of a group of items (the frequent itemsets with more
+    than one item whose last item, the least frequent one, belongs to the group)
+    :param paths: paths of the shard of the group
+    :type paths: numpy bool matrix
+    :param counts: counts of the paths of the shard
+    :type counts: numpy integer array
+    :param items: items ids of the columns of the shard
+    :type items: numpy integer array
+    :param group: columns of the group
+    :type group: list of integers
+    :param min_count: minimum support count
+    :type min_count: integer
+    :param max_len: maximum length of the itemsets (None = no limit)
+    :type max_len: integer
+    :return: list with the frequent itemsets and their support counts of each column of the group, with the following
+    format: [(itemsets, supports), ...]
+    """
+    columns_itemsets = []
+    for column in group:
+        itemsets = []
+        supports = []
+        grow_item_itemsets(paths, counts, items, column, (), min_count, max_len, itemsets, supports)
+        columns_itemsets.append((itemsets, supports))
+
+    return columns_itemsets
+
+
+def grow_itemsets_parallel(paths, counts, items_counts, items, min_count, max_len, n_jobs, itemsets, supports):
+    """
+    Method that performs the first step of the FP-Growth algorithm in parallel: the conditional trees of the items are
+    split into groups, each group is mined in a worker process over its shard of the tree and the itemsets of all items
+    are added in the same order as grow_itemsets (so the results are identical to the serial mining)
+    :param paths: unique paths of the tree (one column for each item, ordered by descending support)
+    :type paths: numpy bool matrix
+    :param counts: counts of the paths
+    :type counts: numpy integer array
+    :param items_counts: support count of each item of the tree
+    :type items_counts: numpy integer array
+    :param items: items ids of the columns of the tree
+    :type items: numpy integer array
+    :param min_count: minimum support count
+    :type min_count: integer
+    :param max_len: maximum length of the itemsets (None = no limit)
+    :type max_len: integer
+    :param n_jobs: number of worker processes
+    :type n_jobs: integer
+    :param itemsets: list where the frequent itemsets found are added
+    :type itemsets: list of tuples of integers
+    :param supports: list where the support counts of the frequent itemsets found are added
+    :type supports: list of integers
+    """
+    nodes_order = get_nodes_order(paths).tolist()
+    for column in nodes_order:
+        itemsets.append((int(items[column]),))
+        supports.append(int(items_counts[column]))
+
+    groups = group_items_columns(paths, n_jobs)
+    columns_itemsets = [None] * len(items)
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(groups))) as executor:
+        futures = {}
+        for group in groups:
+            shard_paths, shard_counts = get_group_shard(paths, counts, group)
+            last = group[-1] + 1
+            futures[executor.submit(mine_group_itemsets, shard_paths, shard_counts, items[:last], group, min_count,
+                                    max_len)] = group
+        for future, group in futures.items():
+            for column, column_itemsets in zip(group, future.result()):
+                columns_itemsets[column] = column_itemsets
+
+    for column in nodes_order:
+        itemsets.extend(columns_itemsets[column][0])
+        supports.extend(columns_itemsets[column][1])
+
+
+def get_n_jobs(n_jobs):
+    """
+    Method that returns the number of worker processes to be used
+    :param n_jobs: number of worker processes requested (None or a value lower than 1 = all CPU cores)
+    :type n_jobs: integer
+    :return: number of worker processes (never more than the number of CPU cores)
+    """
+    no_cores = os.cpu_count() or 1
+    if n_jobs is None or n_jobs < 1:
+        return no_cores
+
+    return min(n_jobs, no_cores)
+
+
+def mine_fp_tree(paths, counts, items_counts, items, min_count, max_len=None, n_jobs=1):
+    """
+    Method that generates all frequent itemsets of a FP-tree (serially or split among worker processes)
+    :param paths: unique paths of the tree (one column for each item, ordered by descending support)
+    :type paths: numpy bool matrix
+    :param counts: counts of the paths
+    :type counts: numpy integer array
+    :param items_counts: support count of each item of the tree
+    :type items_counts: numpy integer array
+    :param items: items ids of the columns of the tree
+    :type items: numpy integer array
+    :param min_count: minimum support count
+    :type min_count: integer
+    :param max_len: maximum length of the itemsets (None = no limit)
+    :type max_len: integer
+    :param n_jobs: number of worker processes (1 = serial mining, None or -1 = all CPU cores)
+    :type n_jobs: integer
+    :return: tuple (frequent itemsets as tuples of items ids, support counts of the frequent itemsets)
+    """
+    itemsets = []
+    supports = []
+    n_jobs = get_n_jobs(n_jobs)
+    # Small trees and single path trees (mined at once) aren't split among processes
+    if n_jobs > 1 and len(items) >= MIN_ITEMS_TO_PARALLELIZE and not is_single_path(paths):
+        grow_itemsets_parallel(paths, counts, items_counts, items, min_count, max_len, n_jobs, itemsets, supports)
+    else:
+        grow_itemsets(paths, counts, items_counts, items, (), min_count, max_len, itemsets, supports)
+
+    return itemsets, supports
+
+
+def get_tree_items(items_supports, frequent):
+    """
+    Method that orders the frequent items by descending support as in the setup_fptree method of mlxtend (the reverse
+    of the argsort of their supports, with the same sort algorithm), so that the ties keep the same order as in mlxtend
+    :param items_supports: relative support of each item
+    :type items_supports: numpy float array
+    :param frequent: frequent items ids, in ascending order
+    :type frequent: numpy integer array
+    :return: numpy array of items ids
+    """
+    return frequent[items_supports[frequent].argsort()][::-1]
+
+
+def mine_frequent_itemsets(one_hot_trans, min_support, max_len=None, n_jobs=1):
+    """
+    Method that generates frequent itemsets using the FP-Growth algorithm over transactions with integer items ids
+    (same results, in the same order, as the fpgrowth method of mlxtend with use_colnames=False)
+    :param one_hot_trans: one hot encoding of the transactions (one row for each transaction and one column for each
+    item)
+    :type one_hot_trans: scipy.sparse matrix
+    :param min_support: minimum support for the frequent itemsets
+    :type min_support: float (values between 0.0 and 1.0)
+    :param max_len: maximum length of the itemsets (None = no limit)
+    :type max_len: integer
+    :param n_jobs: number of worker processes (1 = serial mining, None or -1 = all CPU cores); the results are the same
+    whatever the number of processes
+    :type n_jobs: integer
+    :return: frequent itemsets (of items ids) in DataFrame type, with the columns support and itemsets
+    """
+    if min_support <= 0.:
+        raise ValueError('`min_support` must be a positive number within the interval `(0, 1]`. Got %s.' % min_support)
+
+    no_transactions = one_hot_trans.shape[0]
+    itemsets = []
+    supports = []
+    if no_transactions > 0:
+        items_counts = np.asarray((one_hot_trans != 0).sum(axis=0), dtype=np.int64).reshape(-1)
+        # Single items are compared by relative support and the other itemsets by support count (as in mlxtend)
+        items_supports = items_counts / float(no_transactions)
+        frequent = np.nonzero(items_supports >= min_support)[0]
+        min_count = math.ceil(min_support * no_transactions)
+
+        items = get_tree_items(items_supports, frequent)
+        paths, counts = build_fp_tree(one_hot_trans, items)
+        itemsets, supports = mine_fp_tree(paths, counts, items_counts[items], items, min_count, max_len, n_jobs)
+
+    return pd.DataFrame({'support': np.array(supports, dtype=float) / max(no_transactions, 1),
+                         'itemsets': [frozenset(itemset) for itemset in itemsets]}, columns=['support', 'itemsets'])
+
+
+class TopKThreshold:
+    """
+    Class that keeps the support counts of the k most frequent itemsets found so far, whose smallest value is the
+    minimum support count that an itemset must have to be one of the k most frequent ones (this threshold only
+    increases while the itemsets are mined)
+    """
+
+    def __init__(self, k, min_len=1, min_count_bound=1):
+        """
+        Method that builds an empty threshold
+        :param k: number of itemsets
+        :type k: integer
+        :param min_len: minimum length of the itemsets that are counted as one of the k itemsets
+        :type min_len: integer
+        :param min_count_bound: lower bound of the support count of the k-th most frequent itemset (e.g. given by
+        get_top_k_min_count_bound), used as the threshold until k itemsets are found above it
+        :type min_count_bound: integer
+        """
+        self.k = k
+        self.min_len = min_len
+        self.min_count_bound = min_count_bound
+        # Min-heap with the support counts of the k most frequent itemsets found so far
+        self.counts = []
+
+    @property
+    def min_count(self):
+        """
+        Method that returns the current minimum support count (the lower bound while less than k itemsets were found)
+        :return: minimum support count
+        """
+        return max(self.counts[0], self.min_count_bound) if len(self.counts) == self.k else self.min_count_bound
+
+    def add(self, itemset_length, count):
+        """
+        Method that updates the threshold with the support count of an itemset found
+        :param itemset_length: number of items of the itemset
+        :type itemset_length: integer
+        :param count: support count of the itemset
+        :type count: integer
+        """
+        if itemset_length < self.min_len:
+            return
+        if len(self.counts) < self.k:
+            heapq.heappush(self.counts, count)
+        elif count > self.counts[0]:
+            heapq.heapreplace(self.counts, count)
+
+
+def grow_top_k_itemsets(paths, counts, items_counts, items, prefix, threshold, max_len, itemsets, supports):
+    """
+    Method that performs a recursive step of the FP-Growth algorithm with a dynamic minimum support count: the itemsets
+    (and the items of the conditional trees) are compared with the current threshold, which is raised by each itemset
+    found, so the branches that can't reach the k most frequent itemsets are pruned as soon as possible
+    :param paths: unique paths of the tree (one column for each item, ordered by descending support)
+    :type paths: numpy bool matrix
+    :param counts: counts of the paths
+    :type counts: numpy integer array
+    :param items_counts: support count of each item of the tree
+    :type items_counts: numpy integer array
+    :param items: items ids of the columns of the tree
+    :type items: numpy integer array
+    :param prefix: items ids of the itemset that originated the tree
+    :type prefix: tuple of integers
+    :param threshold: support counts of the k most frequent itemsets found so far
+    :type threshold: TopKThreshold
+    :param max_len: maximum length of the itemsets (None = no limit)
+    :type max_len: integer
+    :param itemsets: list where the candidate itemsets found are added
+    :type itemsets: list of tuples of integers
+    :param supports: list where the support counts of the candidate itemsets found are added
+    :type supports: list of integers
+    """
+    if paths.shape[0] == 1:
+        # Single path tree: every combination of its items has the count of the path
+        count = int(counts[0])
+        for length in range(1, len(items) + 1):
+            if (max_len is not None and len(prefix) + length > max_len) or count < threshold.min_count:
+                break
+            for columns in combinations(range(len(items)), length):
+                itemsets.append(prefix + tuple(int(items[column]) for column in columns))
+                supports.append(count)
+                threshold.add(len(prefix) + length, count)
+        return
+
+    for column in range(len(items)):
+        if items_counts[column] < threshold.min_count:
+            continue
+        itemset = prefix + (int(items[column]),)
+        itemsets.append(itemset)
+        supports.append(int(items_counts[column]))
+        threshold.add(len(itemset), int(items_counts[column]))
+        if column == 0 or (max_len is not None and len(itemset) >= max_len):
+            continue
+
+        # Conditional tree of the item
+        rows = paths[:, column]
+        cond_paths = paths[rows, :column]
+        cond_counts = counts[rows]
+        cond_items_counts = cond_counts @ cond_paths
+        frequent = np.nonzero(cond_items_counts >= threshold.min_count)[0]
+        if len(frequent) == 0:
+            continue
+
+        cond_paths = cond_paths[:, frequent]
+        if cond_paths.shape[0] > MIN_PATHS_TO_COMPRESS:
+            cond_paths, cond_counts = compress_paths(cond_paths, cond_counts)
+        grow_top_k_itemsets(cond_paths, cond_counts, cond_items_counts[frequent], items[:column][frequent], itemset,
+                            threshold, max_len, itemsets, supports)
+
+
+def get_top_k_min_count_bound(one_hot_trans, items_counts, k, min_len):
+    """
+    Method that returns a lower bound of the support count of the k-th most frequent itemset: the k-th greatest support
+    of the items (if the single items are counted as itemsets) or the k-th greatest support of the pairs of the most
+    frequent items (if the pairs are counted as itemsets), since there are at least k itemsets with that support
+    :param one_hot_trans: one hot encoding of the transactions (one row for each transaction and one column for each
+    item)
+    :type one_hot_trans: scipy.sparse matrix
+    :param items_counts: support count of each item
+    :type items_counts: numpy integer array
+    :param k: number of itemsets
+    :type k: integer
+    :param min_len: minimum length of the itemsets counted as one of the k itemsets
+    :type min_len: integer
+    :return: minimum support count (1 if there isn't any bound)
+    """
+    if min_len <= 1 and len(items_counts) >= k:
+        return max(int(np.partition(items_counts, len(items_counts) - k)[len(items_counts) - k]), 1)
+
+    # Number of most frequent items whose pairs are at least k
+    no_items = math.ceil((1 + math.sqrt(1 + 8 * k)) / 2)
+    if min_len != 2 or len(items_counts) < no_items:
+        return 1
+
+    top_items = np.argsort(-items_counts, kind='stable')[:no_items]
+    top_trans = one_hot_trans[:, top_items].astype(np.int64)
+    pairs_counts = (top_trans.T @ top_trans).toarray()[np.triu_indices(no_items, 1)]
+
+    return max(int(np.partition(pairs_counts, len(pairs_counts) - k)[len(pairs_counts) - k]), 1)
+
+
+def mine_top_k_itemsets(one_hot_trans, k, min_len=1, max_len=None):
+    """
+    Method that generates the k most frequent itemsets (with at least min_len items) in a single mining run, without a
+    minimum support: the minimum support count starts at a lower bound (get_top_k_min_count_bound) and is raised by
+    each itemset found while the itemsets are mined. All itemsets with a support equal to the k-th greatest support
+    are kept (so more than k itemsets can be returned), together with all the itemsets with less than min_len items
+    that are at least as frequent (the subsets needed to generate association rules), which are the frequent itemsets
+    of the minimum support returned
+    :param one_hot_trans: one hot encoding of the transactions (one row for each transaction and one column for each
+    item)
+    :type one_hot_trans: scipy.sparse matrix
+    :param k: number of itemsets
+    :type k: integer
+    :param min_len: minimum length of the itemsets counted as one of the k itemsets (e.g. 2 to get the k most frequent
+    itemsets that can generate association rules)
+    :type min_len: integer
+    :param max_len: maximum length of the itemsets (None = no limit)
+    :type max_len: integer
+    :return: tuple (frequent itemsets (of items ids) in DataFrame type, with the columns support and itemsets, minimum
+    support reached, which mines the same itemsets again with mine_frequent_itemsets)
+    """
+    if k <= 0:
+        raise ValueError('`k` must be a positive integer. Got %s.' % k)
+
+    no_transactions = one_hot_trans.shape[0]
+    threshold = TopKThreshold(k, min_len)
+    itemsets = []
+    supports = []
+    if no_transactions > 0:
+        items_counts = np.asarray((one_hot_trans != 0).sum(axis=0), dtype=np.int64).reshape(-1)
+        # The items below a lower bound of the final minimum support count are left out of the tree and the itemsets
+        # below it are pruned from the start
+        threshold = TopKThreshold(k, min_len, get_top_k_min_count_bound(one_hot_trans, items_counts, k, min_len))
+        frequent = np.nonzero(items_counts >= threshold.min_count)[0]
+
+        # Items ordered by descending support (ties by item id)
+        items = frequent[np.lexsort((frequent, -items_counts[frequent]))]
+        paths, counts = build_fp_tree(one_hot_trans, items)
+        grow_top_k_itemsets(paths, counts, items_counts[items], items, (), threshold, max_len, itemsets, supports)
+
+    # The itemsets found before the threshold reached its final value are discarded
+    min_count = threshold.min_count
+    top_k = [position for position, support in enumerate(supports) if support >= min_count]
+
+    freq_prod = pd.DataFrame({'support': np.array([supports[position] for position in top_k], dtype=float) / max(
+        no_transactions, 1), 'itemsets': [frozenset(itemsets[position]) for position in top_k]},
+                             columns=['support', 'itemsets'])
+
+    # Half a transaction below the minimum support count, so that ceil(min_support * no_transactions) is min_count
+    # again despite the rounding of the division (e.g. 955 / 3000 * 3000 is rounded up to 956)
+    return freq_prod, (min_count - 0.5) / float(max(no_transactions, 1))
+
+
+def get_closed_maximal_flags(freq_prod):
+    """
+    Method that verifies which frequent itemsets are closed (no superset has the same support) and maximal (no superset
+    is frequent). Only the supersets with one more item need to be checked, since the support of a superset can only
+    be the same (or the superset can only be frequent) if the same happens to a superset with one more item
+    :param freq_prod: all frequent itemsets, with the columns support and itemsets
+    :type freq_prod: dataframe
+    :return: tuple (closed, maximal) of numpy bool arrays (one position for each itemset)
+    """
+    itemsets = freq_prod['itemsets'].tolist()
+    supports = freq_prod['support'].tolist()
+    positions = {itemset: position for position, itemset in enumerate(itemsets)}
+    closed = np.ones(len(itemsets), dtype=bool)
+    maximal = np.ones(len(itemsets), dtype=bool)
+    for itemset, support in zip(itemsets, supports):
+        if len(itemset) < 2:
+            continue
+        # Each subset with one item less is frequent (so it was mined) and isn't maximal
+        for item in itemset:
+            position = positions[itemset - {item}]
+            maximal[position] = False
+            if supports[position] == support:
+                closed[position] = False
+
+    return closed, maximal
+
+
+def filter_itemsets_type(freq_prod, itemsets_type):
+    """
+    Method that returns the frequent itemsets of a certain type
+    :param freq_prod: all frequent itemsets, with the columns support and itemsets
+    :type freq_prod: dataframe
+    :param itemsets_type: type of itemsets ("all", "closed" or "maximal")
+    :type itemsets_type: string
+    :return: frequent itemsets of the type in DataFrame type
+    """
+    if itemsets_type == "all":
+        return freq_prod
+    if itemsets_type not in ("closed", "maximal"):
+        raise ValueError("Itemsets type must be 'all', 'closed' or 'maximal', got '{}'".format(itemsets_type))
+
+    closed, maximal = get_closed_maximal_flags(freq_prod)
+
+    return freq_prod[closed if itemsets_type == "closed" else maximal].reset_index(drop=True)
@@ -0,0 +1,456 @@
+import math
+from itertools import combinations, product
+
+import numpy as np
+import pandas as pd
+
+from FPGrowthAlgo import calculate_rules_kulc_imbalance, filter_rules_kulc_imbalance
+from MovieCatalog import get_movie_catalog
+from RatingsReader import load_ratings_arrays
+
+RULES_COLUMNS = ['antecedents', 'consequents', 'antecedent support', 'consequent support', 'support', 'confidence',
+                 'lift', 'kulczynski', 'imbalance ratio']
+
+
+def calculate_rules_metrics(sup_a, sup_c, sup_ac):
+    """
+    Method that calculates the metrics of many association rules at once (same formulas as the association_rules
+    method of mlxtend)
+    :param sup_a: support of antecedents of each rule
+    :type sup_a: numpy float array
+    :param sup_c: support of consequents of each rule
+    :type sup_c: numpy float array
+    :param sup_ac: support of antecedents and consequents of each rule
+    :type sup_ac: numpy float array
+    :return: dictionary with the following format: { "support": ..., "confidence": ..., "lift": ..., "leverage": ...,
+    "conviction": ... }
+    """
+    confidence = sup_ac / sup_a
+    conviction = np.full(len(confidence), np.inf)
+    not_certain = confidence != 1.0
+    conviction[not_certain] = (1.0 - sup_c[not_certain]) / (1.0 - confidence[not_certain])
+
+    return {'support': sup_ac, 'confidence': confidence, 'lift': confidence / sup_c,
+            'leverage': sup_ac - sup_a * sup_c, 'conviction': conviction}
+
+
+class IncrementalMiner:
+    """
+    Class that keeps the frequent itemsets (with their support counts) and the association rules of a set of
+    transactions up to date while user-item interactions are added or removed, without mining all transactions again.
+    Each item is stored with the set of users that interacted with it (a python int used as a bitset), so the support
+    count of any itemset is the number of bits of the intersection of its items bitsets
+    """
+
+    def __init__(self, min_support, rule_metric, min_rule_metric_value, min_kulc_value, min_imbalance_ratio_value,
+                 is_implicit=True):
+        """
+        Method that creates an incremental miner without any transaction
+        :param min_support: minimum support for the association rules
+        :type min_support: float (values between 0.0 and 1.0)
+        :param rule_metric: metric rule for the association rules
+        :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+        :param min_rule_metric_value: minimum value of metric rule
+        :type min_rule_metric_value: float
+        :param min_kulc_value: minimum value of kulczynski metric
+        :type min_kulc_value: float (values between 0.0 and 1.0)
+        :param min_imbalance_ratio_value: minimum value of imbalance ratio
+        :type min_imbalance_ratio_value: float (values between 0.0 and 1.0)
+        :param is_implicit: if the data is implicit (every watched movie is an interaction) or explicit (only the movies
+        rated with 3.0 or more are interactions)
+        :type is_implicit: boolean
+        """
+        if min_support <= 0.:
+            raise ValueError(
+                '`min_support` must be a positive number within the interval `(0, 1]`. Got %s.' % min_support)
+        self.min_support = min_support
+        self.rule_metric = rule_metric
+        self.min_rule_metric_value = min_rule_metric_value
+        self.min_kulc_value = min_kulc_value
+        self.min_imbalance_ratio_value = min_imbalance_ratio_value
+        self.is_implicit = is_implicit
+
+        # users_bits = { "userId": bit of the user in the items bitsets } (userId values as strings, as in the csv)
+        self.users_bits = {}
+        # users_sizes = { "userId": number of items of the user }
+        self.users_sizes = {}
+        # items_tids = { item: bitset of the users that interacted with the item }
+        self.items_tids = {}
+        self.no_transactions = 0
+        # itemsets_counts = { frozenset of items: support count } (only the frequent itemsets)
+        self.itemsets_counts = {}
+        # rules = { (antecedents, consequents): (antecedent support, consequent support, support, confidence, lift,
+        # kulczynski, imbalance ratio) } (only the rules that satisfy all thresholds)
+        self.rules = {}
+        # pairs_rules = { (antecedent item, consequent item): set of rules keys }
+        self.pairs_rules = {}
+
+    def get_min_count(self):
+        """
+        Method that returns the minimum support count of the itemsets with more than one item
+        :return: minimum support count
+        """
+        return math.ceil(self.min_support * self.no_transactions)
+
+    def is_frequent(self, count, length):
+        """
+        Method that verifies if an itemset is frequent (single items are compared by relative support and the other
+        itemsets by support count, as in the fpgrowth method of mlxtend)
+        :param count: support count of the itemset
+        :type count: integer
+        :param length: number of items of the itemset
+        :type length: integer
+        :return: True if the itemset is frequent, otherwise it will return False
+        """
+        if self.no_transactions == 0:
+            return False
+        if length == 1:
+            return count / float(self.no_transactions) >= self.min_support
+
+        return count >= self.get_min_count()
+
+    def get_frequent_items(self):
+        """
+        Method that returns the frequent items ordered by descending support count
+        :return: list of tuples (item, bitset of the users, support count)
+        """
+        items = []
+        for item, tids in self.items_tids.items():
+            count = tids.bit_count()
+            if self.is_frequent(count, 1):
+                items.append((item, tids, count))
+
+        return sorted(items, key=lambda item: -item[2])
+
+    def grow_itemsets(self, prefix, candidates, itemsets_counts):
+        """
+        Method that performs a recursive step of the Eclat algorithm: each candidate item is added to the prefix and the
+        itemset is extended with the following candidates that remain frequent
+        :param prefix: items of the itemset being extended
+        :type prefix: frozenset
+        :param candidates: items that extend the prefix, with the users of the prefix and the item and their count
+        :type candidates: list of tuples (item, bitset of the users, support count)
+        :param itemsets_counts: dictionary where the frequent itemsets found are added
+        :type itemsets_counts: dictionary
+        """
+        min_count = self.get_min_count()
+        for position, (item, tids, count) in enumerate(candidates):
+            itemset = prefix | {item}
+            itemsets_counts[itemset] = count
+            next_candidates = []
+            for next_item, next_tids, next_count in candidates[position + 1:]:
+                itemset_tids = tids & next_tids
+                itemset_count = itemset_tids.bit_count()
+                if itemset_count >= min_count:
+                    next_candidates.append((next_item, itemset_tids, itemset_count))
+            if len(next_candidates) > 0:
+                self.grow_itemsets(itemset, next_candidates, itemsets_counts)
+
+    def mine_itemsets(self, changed_items=None):
+        """
+        Method that mines the frequent itemsets. If the changed items are given only the itemsets that contain at least
+        one of them are mined again (the counts of the other itemsets can't have changed)
+        :param changed_items: items whose users have changed (None = mine all itemsets)
+        :type changed_items: set
+        :return: frequent itemsets, with the following format: { frozenset of items: support count }
+        """
+        frequent_items = self.get_frequent_items()
+        if changed_items is None:
+            itemsets_counts = {}
+            self.grow_itemsets(frozenset(), frequent_items, itemsets_counts)
+            return itemsets_counts
+
+        itemsets_counts = {itemset: count for itemset, count in self.itemsets_counts.items() if
+                           itemset.isdisjoint(changed_items) and self.is_frequent(count, len(itemset))}
+        min_count = self.get_min_count()
+        # Itemsets with a changed item are grown from it, with the frequent items that aren't changed items already
+        # grown (so each itemset is only found once)
+        grown_items = set()
+        for item, tids, count in frequent_items:
+            if item not in changed_items:
+                continue
+            itemsets_counts[frozenset([item])] = count
+            candidates = []
+            for next_item, next_tids, next_count in frequent_items:
+                if next_item == item or next_item in grown_items:
+                    continue
+                itemset_tids = tids & next_tids
+                itemset_count = itemset_tids.bit_count()
+                if itemset_count >= min_count:
+                    candidates.append((next_item, itemset_tids, itemset_count))
+            self.grow_itemsets(frozenset([item]), candidates, itemsets_counts)
+            grown_items.add(item)
+
+        return itemsets_counts
+
+    def generate_rules(self, itemsets):
+        """
+        Method that generates the association rules of some frequent itemsets that satisfy the rule metric, Kulczynski
+        and Imbalance Ratio thresholds
+        :param itemsets: frequent itemsets (with more than one item)
+        :type itemsets: iterable of frozensets
+        :return: association rules in DataFrame type (with the columns antecedents, consequents, antecedent support,
+        consequent support, support, confidence, lift, kulczynski, imbalance ratio)
+        """
+        antecedents = []
+        consequents = []
+        counts = []
+        for itemset in itemsets:
+            items = list(itemset)
+            for length in range(1, len(items)):
+                for antecedent in combinations(items, length):
+                    antecedent = frozenset(antecedent)
+                    consequent = itemset - antecedent
+                    antecedents.append(antecedent)
+                    consequents.append(consequent)
+                    counts.append((self.itemsets_counts[antecedent], self.itemsets_counts[consequent],
+                                   self.itemsets_counts[itemset]))
+        if len(counts) == 0:
+            return pd.DataFrame(columns=RULES_COLUMNS)
+
+        supports = np.array(counts, dtype=float) / self.no_transactions
+        metrics = calculate_rules_metrics(supports[:, 0], supports[:, 1], supports[:, 2])
+        valid = metrics[self.rule_metric] >= self.min_rule_metric_value
+        association_rules = pd.DataFrame({'antecedents': antecedents, 'consequents': consequents,
+                                          'antecedent support': supports[:, 0], 'consequent support': supports[:, 1],
+                                          'support': supports[:, 2], 'confidence': metrics['confidence'],
+                                          'lift': metrics['lift']})[valid]
+        rules = calculate_rules_kulc_imbalance(association_rules, self.no_transactions)
+
+        return filter_rules_kulc_imbalance(rules, self.min_kulc_value, self.min_imbalance_ratio_value)
+
+    def apply_interactions(self, interactions):
+        """
+        Method that adds and removes user-item interactions from the transactions
+        :param interactions: interactions, with the following format: [(userId, item, is_added), ...]
+        :type interactions: list of tuples
+        :return: set of items whose users have changed
+        """
+        changed_items = set()
+        for user_id, item, is_added in interactions:
+            if user_id not in self.users_bits:
+                if not is_added:
+                    continue
+                self.users_bits[user_id] = len(self.users_bits)
+                self.users_sizes[user_id] = 0
+            user_bit = 1 << self.users_bits[user_id]
+            tids = self.items_tids.get(item, 0)
+            if bool(tids & user_bit) == is_added:
+                # The user has already interacted (or hasn't interacted) with the item
+                continue
+
+            self.items_tids[item] = tids ^ user_bit
+            if self.items_tids[item] == 0:
+                del self.items_tids[item]
+            self.users_sizes[user_id] += 1 if is_added else -1
+            if is_added and self.users_sizes[user_id] == 1:
+                self.no_transactions += 1
+            elif not is_added and self.users_sizes[user_id] == 0:
+                self.no_transactions -= 1
+            changed_items.add(item)
+
+        return changed_items
+
+    def load_interactions(self, users_ids, items):
+        """
+        Method that loads all interactions of the initial transactions at once and mines their frequent itemsets and
+        association rules
+        :param users_ids: userId of each interaction
+        :type users_ids: numpy array of strings
+        :param items: item of each interaction
+        :type items: numpy array
+        """
+        users_codes, unique_users = pd.factorize(users_ids, sort=False)
+        items_codes, unique_items = pd.factorize(items, sort=False)
+        one_hot_trans = pd.DataFrame({'user': users_codes, 'item': items_codes}).drop_duplicates()
+        for user_id in unique_users.tolist():
+            self.users_bits.setdefault(user_id, len(self.users_bits))
+        users_bits = np.array([self.users_bits[user_id] for user_id in unique_users.tolist()], dtype=np.int64)
+
+        for item_code, item_users in one_hot_trans.groupby('item')['user']:
+            bits = np.zeros(len(self.users_bits), dtype=bool)
+            bits[users_bits[item_users.to_numpy()]] = True
+            self.items_tids[unique_items[item_code]] = int.from_bytes(np.packbits(bits, bitorder='little').tobytes(),
+                                                                      'little')
+        sizes = np.bincount(one_hot_trans['user'].to_numpy(), minlength=len(unique_users))
+        for user_id, size in zip(unique_users.tolist(), sizes.tolist()):
+            self.users_sizes[user_id] = size
+        self.no_transactions = int(np.count_nonzero(sizes))
+
+        self.itemsets_counts = self.mine_itemsets()
+        self.rules = {}
+        self.pairs_rules = {}
+        self.update_rules({}, self.generate_rules(itemset for itemset in self.itemsets_counts if len(itemset) > 1))
+
+    def get_pair_confidence(self, pair):
+        """
+        Method that returns the confidence of the RECOMMENDS relationship of a pair of items (the greatest confidence of
+        the rules with the first item in the antecedents and the second item in the consequents)
+        :param pair: pair of items (antecedent item, consequent item)
+        :type pair: tuple
+        :return: confidence or None if the pair doesn't have any rule
+        """
+        return max((self.rules[rule_key][3] for rule_key in self.pairs_rules.get(pair, ())), default=None)
+
+    def update_rules(self, old_rules, new_rules):
+        """
+        Method that replaces some of the rules kept by the miner and returns the changes of the RECOMMENDS
+        relationships
+        :param old_rules: rules that are removed, with the format of the rules attribute
+        :type old_rules: dictionary
+        :param new_rules: rules that are added
+        :type new_rules: dataframe
+        :return: dictionary with the following format: { (antecedent item, consequent item): confidence or None if the
+        pair doesn't have any rule }
+        """
+        new_keys = list(zip(new_rules['antecedents'], new_rules['consequents']))
+        touched_pairs = {pair for rule_key in list(old_rules) + new_keys for pair in product(*rule_key)}
+        old_confidences = {pair: self.get_pair_confidence(pair) for pair in touched_pairs}
+
+        for rule_key in old_rules:
+            del self.rules[rule_key]
+            for pair in product(*rule_key):
+                self.pairs_rules[pair].discard(rule_key)
+        for rule_key, rule in zip(new_keys, new_rules.iloc[:, 2:].itertuples(index=False, name=None)):
+            self.rules[rule_key] = rule
+            for pair in product(*rule_key):
+                self.pairs_rules.setdefault(pair, set()).add(rule_key)
+
+        recommends_changes = {}
+        for pair in touched_pairs:
+            confidence = self.get_pair_confidence(pair)
+            if confidence is None:
+                del self.pairs_rules[pair]
+            if confidence != old_confidences[pair]:
+                recommends_changes[pair] = confidence
+
+        return recommends_changes
+
+    def apply_deltas(self, interactions):
+        """
+        Method that adds and removes user-item interactions and updates the frequent itemsets and the association rules.
+        Only the itemsets with a changed item are mined again, unless the number of transactions decreases (items
+        that weren't frequent may become frequent) and only the rules of those itemsets are generated again, unless the
+        number of transactions changes (the supports of all rules change)
+        :param interactions: interactions, with the following format: [(userId, item, is_added), ...]
+        :type interactions: list of tuples
+        :return: dictionary with the following format: { "added": rules that now satisfy all thresholds, "removed":
+        rules that no longer satisfy them, "recommends": { (antecedent item, consequent item): confidence or None } }
+        """
+        old_no_transactions = self.no_transactions
+        changed_items = self.apply_interactions(interactions)
+        if len(changed_items) == 0:
+            return {'added': pd.DataFrame(columns=RULES_COLUMNS), 'removed': pd.DataFrame(columns=RULES_COLUMNS),
+                    'recommends': {}}
+
+        if self.no_transactions < old_no_transactions:
+            self.itemsets_counts = self.mine_itemsets()
+        else:
+            self.itemsets_counts = self.mine_itemsets(changed_items)
+
+        if self.no_transactions != old_no_transactions:
+            old_rules = dict(self.rules)
+            itemsets = [itemset for itemset in self.itemsets_counts if len(itemset) > 1]
+        else:
+            old_rules = {rule_key: rule for rule_key, rule in self.rules.items() if
+                         not (rule_key[0] | rule_key[1]).isdisjoint(changed_items)}
+            itemsets = [itemset for itemset in self.itemsets_counts if
+                        len(itemset) > 1 and not itemset.isdisjoint(changed_items)]
+        new_rules = self.generate_rules(itemsets)
+        recommends_changes = self.update_rules(old_rules, new_rules)
+
+        # Only the rules that crossed the thresholds are returned
+        new_keys = set(zip(new_rules['antecedents'], new_rules['consequents']))
+        is_new = np.array([rule_key not in old_rules for rule_key in zip(new_rules['antecedents'],
+                                                                          new_rules['consequents'])], dtype=bool)
+        added = new_rules[is_new]
+        removed_keys = [rule_key for rule_key in old_rules if rule_key not in new_keys]
+        removed = pd.DataFrame([rule_key + old_rules[rule_key] for rule_key in removed_keys], columns=RULES_COLUMNS)
+
+        return {'added': added.reset_index(drop=True), 'removed': removed, 'recommends': recommends_changes}
+
+    def handle_interaction(self, user_id, movie_id, relationship, rating_value, is_added):
+        """
+        Method that applies a change of a relationship between a user and a movie of the graph database (RATED or
+        WATCHED): with implicit data the WATCHED relationships are interactions and with explicit data the RATED
+        relationships with a rating of 3.0 or more are interactions (a RATED relationship created with a rating below
+        3.0 removes the interaction, if it exists)
+        :param user_id: user's id
+        :type user_id: integer
+        :param movie_id: movie's id
+        :type movie_id: integer
+        :param relationship: type of relationship ("RATED" or "WATCHED")
+        :type relationship: string
+        :param rating_value: user's rating value given to the movie (None for WATCHED relationships or removals)
+        :type rating_value: float
+        :param is_added: if the relationship was created (True) or deleted (False)
+        :type is_added: boolean
+        :return: same result as apply_deltas
+        """
+        # The userId values are kept as strings, as they are read from the csv files
+        user_id = str(user_id)
+        if self.is_implicit and relationship == "WATCHED":
+            return self.apply_deltas([(user_id, movie_id, is_added)])
+        if not self.is_implicit and relationship == "RATED":
+            # A rating below 3.0 (e.g. a movie rated again with a lower value) removes the interaction
+            is_liked = is_added and rating_value is not None and rating_value >= 3.0
+            return self.apply_deltas([(user_id, movie_id, is_liked)])
+
+        return self.apply_deltas([])
+
+    def get_rules(self):
+        """
+        Method that returns all association rules that satisfy the thresholds
+        :return: association rules in DataFrame type
+        """
+        return pd.DataFrame([rule_key + rule for rule_key, rule in self.rules.items()], columns=RULES_COLUMNS)
+
+
+def build_incremental_miner(filename, is_implicit, movies_filename, min_support, rule_metric, min_rule_metric_value,
+                            min_kulc_value, min_imbalance_ratio_value):
+    """
+    Method that creates an incremental miner with the users ratings of a csv file, where the items are the movies ids
+    (the same ids of the Movie nodes of the graph database)
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: movieId, title, genres, imdbid, tmdbid, release_date, year, poster)
+    :type movies_filename: string
+    :param min_support: minimum support for the association rules
+    :type min_support: float (values between 0.0 and 1.0)
+    :param rule_metric: metric rule for the association rules
+    :type rule_metric: string (it only accepts support,confidence, lift, leverage, conviction)
+    :param min_rule_metric_value: minimum value of metric rule
+    :type min_rule_metric_value: float
+    :param min_kulc_value: minimum value of kulczynski metric
+    :type min_kulc_value: float (values between 0.0 and 1.0)
+    :param min_imbalance_ratio_value: minimum value of imbalance ratio
+    :type min_imbalance_ratio_value: float (values between 0.0 and 1.0)
+    :return: incremental miner
+    """
+    ratings = load_ratings_arrays(filename)
+    users = np.asarray(ratings['users_ids'])[ratings['users']]
+    movies = np.asarray(ratings['movies'])
+    if not is_implicit:
+        liked = np.asarray(ratings['ratings']) >= 3.0
+        users, movies = users[liked], movies[liked]
+
+    # The titles are converted into movies ids (the titles that don't exist in the movies csv file are ignored)
+    movie_catalog = get_movie_catalog(movies_filename)
+    titles_ids = np.array([movie_catalog.get_movie_id(title) for title in ratings['titles'].tolist()], dtype=object)
+    movies_ids = titles_ids[movies]
+    found = np.array([movie_id is not None for movie_id in movies_ids.tolist()], dtype=bool)
+
+    miner = IncrementalMiner(min_support, rule_metric, min_rule_metric_value, min_kulc_value,
+                             min_imbalance_ratio_value, is_implicit)
+    miner.load_interactions(users[found], movies_ids[found].astype(np.int64))
+
+    return miner
+
+# miner = build_incremental_miner(filename='datasets/userRatings5k.csv', is_implicit=True,
+#                                 movies_filename='datasets/movies.csv', min_support=0.1, rule_metric="confidence",
+#                                 min_rule_metric_value=0.6, min_kulc_value=0.6, min_imbalance_ratio_value=0.3)
+# print(miner.handle_interaction(5001, 1, "WATCHED", None, True)["recommends"])
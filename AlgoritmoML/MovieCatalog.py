@@ -0,0 +1,88 @@
+import os
+
+from DatasetCache import load_movies_arrays
+
+
+class MovieCatalog:
+    """
+    Class that stores the titles of all movies of a csv file in a hashed index (title -> movieId), so that the existence
+    of a movie is verified in constant time instead of scanning the list of all movies
+    """
+
+    def __init__(self, movies_filename):
+        """
+        Method that builds the movie catalog
+        :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
+        the following columns: movieId, title, genres, imdbid, tmdbid, release_date, year, poster)
+        :type movies_filename: string
+        """
+        movies = load_movies_arrays(movies_filename)
+        # titles_ids = { "Movie": movieId } (if a title is repeated the first movieId is kept)
+        self.titles_ids = {}
+        for title, movie_id in zip(movies['titles'].tolist(), movies['movies_ids'].tolist()):
+            self.titles_ids.setdefault(title, movie_id)
+
+    def __len__(self):
+        return len(self.titles_ids)
+
+    def __contains__(self, title):
+        return title in self.titles_ids
+
+    def get_movie_id(self, title):
+        """
+        Method that returns the movieId of a movie
+        :param title: movie title
+        :type title: string
+        :return: movieId of the movie or None if the movie doesn't exist
+        """
+        return self.titles_ids.get(title)
+
+    def get_missing_movies(self, user_list_movies):
+        """
+        Method that returns the movies of a user list movies that don't exist in the catalog
+        :param user_list_movies: user list movies
+        :type user_list_movies: list of strings
+        :return: list of movies not found (in the same order of the user list movies)
+        """
+        return [user_movie for user_movie in user_list_movies if user_movie not in self.titles_ids]
+
+    def get_missing_movies_batch(self, users_list_movies):
+        """
+        Method that returns, for many users at once, the movies that don't exist in the catalog (each distinct title is
+        only looked up once)
+        :param users_list_movies: list movies of each user
+        :type users_list_movies: list of lists of strings
+        :return: list with the movies not found of each user (in the same order of users_list_movies)
+        """
+        missing_titles = {title for user_list_movies in users_list_movies for title in user_list_movies
+                          if title not in self.titles_ids}
+        if len(missing_titles) == 0:
+            return [[] for user_list_movies in users_list_movies]
+
+        return [[user_movie for user_movie in user_list_movies if user_movie in missing_titles] for user_list_movies in
+                users_list_movies]
+
+
+# movie_catalogs = { movies_filename: ((file size, file mtime), MovieCatalog) }
+movie_catalogs = {}
+
+
+def get_movie_catalog(movies_filename):
+    """
+    Method that returns the catalog of the movies of a csv file. The catalog is only built the first time (or when the
+    csv file is modified), otherwise it's returned the catalog already built
+    :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: movieId, title, genres, imdbid, tmdbid, release_date, year, poster)
+    :type movies_filename: string
+    :return: movie catalog
+    """
+    key = os.path.abspath(movies_filename)
+    file_stat = os.stat(movies_filename)
+    file_version = (file_stat.st_size, file_stat.st_mtime_ns)
+    if key not in movie_catalogs or movie_catalogs[key][0] != file_version:
+        movie_catalogs[key] = (file_version, MovieCatalog(movies_filename))
+
+    return movie_catalogs[key][1]
+
+# catalog = get_movie_catalog('datasets/movies.csv')
+# print(catalog.get_movie_id('Toy Story (1995)'))
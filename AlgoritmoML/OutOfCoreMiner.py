@@ -0,0 +1,186 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from FPGrowthMiner import compress_paths, get_tree_items, mine_fp_tree
+from RatingsReader import CHUNK_SIZE, read_ratings_chunks
+from TransactionEncoding import decode_itemsets
+
+
+def split_users_chunks(chunks):
+    """
+    Method that regroups chunks of users ratings into blocks of complete users: the ratings of the last user of each
+    chunk are kept until the next chunk, so that no user is split between two blocks
+    :param chunks: chunks of users ratings (with the column userId)
+    :type chunks: iterator of DataFrames
+    :return: iterator of DataFrames
+    """
+    pending = None
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        if pending is not None:
+            chunk = pd.concat([pending, chunk])
+        users = chunk['userId'].to_numpy()
+        other_users = np.nonzero(users != users[-1])[0]
+        split = other_users[-1] + 1 if len(other_users) > 0 else 0
+        pending = chunk.iloc[split:]
+        if split > 0:
+            yield chunk.iloc[:split]
+
+    if pending is not None:
+        yield pending
+
+
+def read_users_blocks(filename, is_implicit, chunksize=CHUNK_SIZE):
+    """
+    Method that streams a csv file of users ratings in blocks of complete users (the ratings of each user must be in
+    consecutive lines, as in the MovieLens files). If the data is explicit only the ratings greater than or equal to
+    3.0 are kept
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param chunksize: number of lines read at a time
+    :type chunksize: integer
+    :return: iterator of tuples (userId of each rating, movie title of each rating) as numpy arrays
+    """
+    seen_users = set()
+    chunks = read_ratings_chunks(filename, {'userId': str, 'movie': str, 'rating': 'float64'}, chunksize)
+    for block in split_users_chunks(chunks):
+        block_users = pd.unique(block['userId'].to_numpy()).tolist()
+        if not seen_users.isdisjoint(block_users):
+            raise ValueError("The ratings of each user must be in consecutive lines of '{}'".format(filename))
+        seen_users.update(block_users)
+
+        if not is_implicit:
+            block = block[block['rating'].to_numpy() >= 3.0]
+        yield block['userId'].to_numpy(), block['movie'].to_numpy()
+
+
+def count_items_support(filename, is_implicit, chunksize=CHUNK_SIZE):
+    """
+    Method that performs the first pass over the csv file: counts the number of users (transactions) that rated each
+    movie and the number of transactions, keeping in memory only the counters
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param chunksize: number of lines read at a time
+    :type chunksize: integer
+    :return: tuple (support count of each movie, with the following format: { "Movie": count }, number of
+    transactions)
+    """
+    titles_counts = {}
+    no_transactions = 0
+    for users, titles in read_users_blocks(filename, is_implicit, chunksize):
+        # Repeated ratings of the same movie by the same user are counted once
+        pairs = pd.DataFrame({'userId': users, 'movie': titles}).drop_duplicates()
+        for title, count in pairs['movie'].value_counts(sort=False).items():
+            titles_counts[title] = titles_counts.get(title, 0) + int(count)
+        no_transactions += len(pd.unique(users))
+
+    return titles_counts, no_transactions
+
+
+def build_fp_tree_out_of_core(filename, is_implicit, frequent_titles, chunksize=CHUNK_SIZE):
+    """
+    Method that performs the second pass over the csv file: builds the FP-tree of the transactions restricted to the
+    frequent movies, merging the equal paths of each block into the paths already found (only the compressed tree is
+    kept in memory)
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param frequent_titles: frequent movies titles, ordered by descending support (columns of the tree)
+    :type frequent_titles: list of strings
+    :param chunksize: number of lines read at a time
+    :type chunksize: integer
+    :return: tuple (unique paths, counts of the unique paths)
+    """
+    no_columns = len(frequent_titles)
+    # paths_counts = { packed path: count }
+    paths_counts = {}
+    for users, titles in read_users_blocks(filename, is_implicit, chunksize):
+        # Infrequent movies get the column -1
+        columns = pd.Categorical(titles, categories=frequent_titles).codes.astype(np.int64)
+        frequent = columns >= 0
+        if not frequent.any():
+            continue
+
+        users_ids, _ = pd.factorize(users[frequent], sort=False)
+        block_paths = np.zeros((int(users_ids.max()) + 1, no_columns), dtype=bool)
+        block_paths[users_ids, columns[frequent]] = True
+        block_paths, block_counts = compress_paths(block_paths, np.ones(block_paths.shape[0], dtype=np.int64))
+        packed = np.packbits(block_paths, axis=1)
+        for path, count in zip(packed, block_counts.tolist()):
+            key = path.tobytes()
+            paths_counts[key] = paths_counts.get(key, 0) + count
+
+    if len(paths_counts) == 0:
+        return np.zeros((0, no_columns), dtype=bool), np.zeros(0, dtype=np.int64)
+
+    packed = np.frombuffer(b''.join(paths_counts.keys()), dtype=np.uint8).reshape(len(paths_counts), -1)
+    paths = np.unpackbits(packed, axis=1, count=no_columns).astype(bool)
+
+    return paths, np.fromiter(paths_counts.values(), dtype=np.int64, count=len(paths_counts))
+
+
+def mine_frequent_itemsets_out_of_core(filename, is_implicit, min_support, max_len=None, chunksize=CHUNK_SIZE,
+                                       n_jobs=1):
+    """
+    Method that generates the frequent itemsets of movies of a csv file without loading all the ratings into memory,
+    in two passes over the file: the first one counts the support of each movie (and prunes the infrequent ones) and
+    the second one builds the FP-tree over the frequent movies only (same results as generate_frequent_movies_itemsets)
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating, with the ratings of each user in consecutive lines)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the frequent itemsets
+    :type min_support: float (values between 0.0 and 1.0)
+    :param max_len: maximum length of the itemsets (None = no limit)
+    :type max_len: integer
+    :param chunksize: number of lines read at a time
+    :type chunksize: integer
+    :param n_jobs: number of worker processes (1 = serial mining, None or -1 = all CPU cores)
+    :type n_jobs: integer
+    :return: tuple (frequent itemsets (of movies titles) in DataFrame type, number of transactions)
+    """
+    if min_support <= 0.:
+        raise ValueError('`min_support` must be a positive number within the interval `(0, 1]`. Got %s.' % min_support)
+
+    titles_counts, no_transactions = count_items_support(filename, is_implicit, chunksize)
+    itemsets = []
+    supports = []
+    frequent_titles = []
+    if no_transactions > 0:
+        # Single items are compared by relative support and the other itemsets by support count (as in mlxtend). The
+        # movies ids follow the alphabetical order of the frequent titles (as the columns of the one hot encoding) and
+        # the columns of the tree are ordered by descending support in the same way as generate_frequent_movies_itemsets
+        frequent_titles = sorted(title for title, count in titles_counts.items() if
+                                 count / float(no_transactions) >= min_support)
+        titles_supports = np.array([titles_counts[title] for title in frequent_titles], dtype=np.int64) / float(
+            no_transactions)
+        items = get_tree_items(titles_supports, np.arange(len(frequent_titles)))
+        min_count = math.ceil(min_support * no_transactions)
+
+        paths, counts = build_fp_tree_out_of_core(filename, is_implicit, [frequent_titles[item] for item in items],
+                                                  chunksize)
+        items_counts = np.array([titles_counts[frequent_titles[item]] for item in items], dtype=np.int64)
+        itemsets, supports = mine_fp_tree(paths, counts, items_counts, items, min_count, max_len, n_jobs)
+
+    freq_prod = pd.DataFrame({'support': np.array(supports, dtype=float) / max(no_transactions, 1),
+                              'itemsets': decode_itemsets(pd.Series([frozenset(itemset) for itemset in itemsets],
+                                                                    dtype=object), frequent_titles)},
+                             columns=['support', 'itemsets'])
+
+    return freq_prod, no_transactions
+
+# freqProd, noTransactions = mine_frequent_itemsets_out_of_core('datasets/userRatings5k.csv', is_implicit=True,
+#                                                               min_support=0.1)
+# print(freqProd.to_string())
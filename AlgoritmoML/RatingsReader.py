@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+from DatasetCache import load_cached_arrays
+
+# Number of csv lines read (and kept in memory as text) at a time
+CHUNK_SIZE = 500000
+
+
+def read_ratings_chunks(filename, dtype, chunksize=CHUNK_SIZE):
+    """
+    Method that reads a csv file of users ratings in chunks of lines
+    :param filename: path where the csv file is located (this file must be in csv format and its first 3 columns must
+    be: userId, movieTitle (or movieId), rating)
+    :type filename: string
+    :param dtype: type of each column, with the following format: { "userId": ..., "movie": ..., "rating": ... }
+    :type dtype: dictionary
+    :param chunksize: number of lines of each chunk
+    :type chunksize: integer
+    :return: iterator of DataFrames with the columns userId, movie, rating
+    """
+    return pd.read_csv(filename, usecols=[0, 1, 2], header=0, names=['userId', 'movie', 'rating'], dtype=dtype,
+                       keep_default_na=False, na_values=[], encoding='utf-8', chunksize=chunksize)
+
+
+def read_ratings_arrays(filename, chunksize=CHUNK_SIZE):
+    """
+    Method that parses, in a single pass over the csv file, all the users ratings into arrays (the users and the movies
+    are converted into integer ids). The userId values are read as strings, as in the rest of the csv readers, so any
+    kind of userId is accepted
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param chunksize: number of lines read at a time
+    :type chunksize: integer
+    :return: dictionary with the following format: { "users": user id of each rating, "movies": movie id of each
+    rating, "ratings": rating value, "users_ids": userId values indexed by the users ids (in order of appearance),
+    "titles": titles sorted alphabetically and indexed by the movies ids }
+    """
+    # users_codes = { "userId": user id } and titles_codes = { "Movie": movie id } (in order of appearance)
+    users_codes = {}
+    titles_codes = {}
+    users_chunks = []
+    movies_chunks = []
+    ratings_chunks = []
+    for chunk in read_ratings_chunks(filename, {'userId': 'category', 'movie': 'category', 'rating': 'float64'},
+                                     chunksize):
+        chunk_users, chunk_users_ids = pd.factorize(chunk['userId'], sort=False)
+        users_map = np.array([users_codes.setdefault(user_id, len(users_codes)) for user_id in
+                              chunk_users_ids.tolist()], dtype=np.int32)
+        users_chunks.append(users_map[chunk_users])
+        titles = chunk['movie'].cat.remove_unused_categories()
+        titles_map = np.array([titles_codes.setdefault(title, len(titles_codes)) for title in
+                               titles.cat.categories.tolist()], dtype=np.int32)
+        movies_chunks.append(titles_map[titles.cat.codes.to_numpy()])
+        ratings_chunks.append(chunk['rating'].to_numpy())
+
+    # Movies ids follow the alphabetical order of the titles (same order as the columns of TransactionEncoder)
+    titles = np.array(list(titles_codes.keys()), dtype=str)
+    order = np.argsort(titles, kind='stable')
+    remap = np.empty(len(order), dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    movies = np.concatenate(movies_chunks) if movies_chunks else np.zeros(0, dtype=np.int32)
+
+    return {'users': np.concatenate(users_chunks) if users_chunks else np.zeros(0, dtype=np.int32),
+            'movies': remap[movies],
+            'ratings': np.concatenate(ratings_chunks) if ratings_chunks else np.zeros(0, dtype=np.float64),
+            'users_ids': np.array(list(users_codes.keys()), dtype=str),
+            'titles': titles[order]}
+
+
+def load_ratings_arrays(filename, use_cache=True):
+    """
+    Method that returns all the users ratings of a csv file, using its binary version when it's available
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param use_cache: if the binary version of the csv file is used/created or not
+    :type use_cache: boolean
+    :return: dictionary with the following format: { "users": ..., "movies": ..., "ratings": ..., "users_ids": ...,
+    "titles": ... }
+    """
+    if not use_cache:
+        return read_ratings_arrays(filename)
+
+    return load_cached_arrays(filename, 'ratings', lambda: read_ratings_arrays(filename))
+
+
+def read_ratings_codes(filename, is_implicit, use_cache=True):
+    """
+    Method that reads the users ratings and converts the users and the movies into integer ids (if the data is
+    explicit only the ratings greater than or equal to 3.0 are kept)
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param use_cache: if the binary version of the csv file is used/created or not
+    :type use_cache: boolean
+    :return: tuple (users ids, movies ids, movies titles), where users ids (in order of appearance) and movies ids are
+    integer arrays (one position for each rating) and movies titles is the list of titles, sorted alphabetically,
+    indexed by the movies ids
+    """
+    ratings = load_ratings_arrays(filename, use_cache)
+    users = np.asarray(ratings['users'])
+    movies = np.asarray(ratings['movies'])
+    titles = ratings['titles']
+    if not is_implicit:
+        liked = np.asarray(ratings['ratings']) >= 3.0
+        users, movies = users[liked], movies[liked]
+        # Only the movies with ratings greater than or equal to 3.0 are kept (keeping the alphabetical order)
+        used_movies = np.zeros(len(titles), dtype=bool)
+        used_movies[movies] = True
+        remap = np.cumsum(used_movies, dtype=np.int64).astype(np.int32) - 1
+        movies = remap[movies]
+        titles = titles[used_movies]
+
+    users_ids, _ = pd.factorize(users, sort=False)
+
+    return users_ids.astype(np.int32), movies.astype(np.int32), titles.tolist()
+
+
+def group_transactions(users_ids, movies_ids, movies_titles):
+    """
+    Method that groups the ratings by user, forming the list of transactions
+    :param users_ids: user id of each rating
+    :type users_ids: numpy integer array
+    :param movies_ids: movie id of each rating
+    :type movies_ids: numpy integer array
+    :param movies_titles: list of titles indexed by the movies ids
+    :type movies_titles: list of strings
+    :return: list of transactions (one for each user, in order of appearance) with the movies titles in the order they
+    were rated
+    """
+    if len(users_ids) == 0:
+        return []
+
+    order = np.argsort(users_ids, kind='stable')
+    splits = np.cumsum(np.bincount(users_ids))[:-1]
+    titles = np.array(movies_titles, dtype=object)[movies_ids[order]]
+
+    return [transaction.tolist() for transaction in np.split(titles, splits)]
+
+
+def read_transactions(filename, is_implicit, use_cache=True):
+    """
+    Method that reads from a csv file, in a single pass, the list of movies rated by each user and the number of
+    transactions
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param use_cache: if the binary version of the csv file is used/created or not
+    :type use_cache: boolean
+    :return: tuple (list of transactions with all users' items, number of transactions)
+    """
+    users_ids, movies_ids, movies_titles = read_ratings_codes(filename, is_implicit, use_cache)
+    transactions = group_transactions(users_ids, movies_ids, movies_titles)
+
+    return transactions, len(transactions)
+
+
+def read_ratings_rows(filename, qty_users, chunksize=CHUNK_SIZE):
+    """
+    Method that reads from a csv file the ratings of the first users (the file is read until the user with id
+    qty_users + 1 is found)
+    :param filename: path where the csv file is located (this file must be in csv format and its first 3 columns must
+    be: userId, movieId (or movieTitle), rating)
+    :type filename: string
+    :param qty_users: quantity of users id's who rated movies
+    :type qty_users: integer
+    :param chunksize: number of lines read at a time
+    :type chunksize: integer
+    :return: list of ratings with the following format: [userId, movieId, rating] (all values as strings)
+    """
+    tot_users = str(qty_users + 1)
+    ratings_list = []
+    for chunk in read_ratings_chunks(filename, str, chunksize):
+        last_user = np.nonzero(chunk['userId'].to_numpy() == tot_users)[0]
+        if len(last_user) > 0:
+            ratings_list.extend(chunk.iloc[:last_user[0]].values.tolist())
+            break
+        ratings_list.extend(chunk.values.tolist())
+
+    return ratings_list
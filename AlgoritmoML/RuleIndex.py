@@ -0,0 +1,290 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Number of users whose rules are matched at a time by recommend_batch (bounds the size of the users x rules matrix)
+USERS_BATCH_SIZE = 2048
+# Number of rules sorted by iter_descending_order in its first block (each following block is 4 times bigger)
+FIRST_BLOCK_SIZE = 64
+
+
+def iter_descending_order(values, first_block_size=FIRST_BLOCK_SIZE):
+    """
+    Method that yields the positions of the values in descending order (ties by ascending position) without sorting all
+    values at once: the greatest values are selected with a partial sort (np.partition) in blocks of growing size, so
+    if the iteration stops early only the first blocks are sorted
+    :param values: values (e.g. confidence of the rules)
+    :type values: numpy array
+    :param first_block_size: number of values of the first block
+    :type first_block_size: integer
+    :return: generator of positions
+    """
+    values = np.asarray(values, dtype=float)
+    remaining = np.arange(len(values))
+    block_size = first_block_size
+    while len(remaining) > 0:
+        if block_size < len(remaining):
+            remaining_values = values[remaining]
+            min_value = np.partition(remaining_values, len(remaining) - block_size)[len(remaining) - block_size]
+            # All the values equal to the smallest value of the block are kept in the block, so ties stay in order
+            in_block = remaining_values >= min_value
+            block, remaining = remaining[in_block], remaining[~in_block]
+        else:
+            block, remaining = remaining, remaining[:0]
+        yield from block[np.lexsort((block, -values[block]))].tolist()
+        block_size *= 4
+
+
+def select_top_n_items(items_lists, excluded_items, top_n):
+    """
+    Method that selects the first n distinct items of a stream of items lists (e.g. the consequents of the rules ordered
+    by confidence), stopping as soon as n items are found
+    :param items_lists: iterable of lists of items, in order of preference
+    :type items_lists: iterable of string lists
+    :param excluded_items: items that can't be selected (e.g. the items that the user liked/interacted with)
+    :type excluded_items: set of strings
+    :param top_n: number of items
+    :type top_n: integer
+    :return: list of items with length of top_n (or less, if there aren't enough items)
+    """
+    top_n_items = []
+    if top_n <= 0:
+        return top_n_items
+
+    seen_items = set(excluded_items)
+    for items in items_lists:
+        for item in items:
+            if item not in seen_items:
+                seen_items.add(item)
+                top_n_items.append(item)
+                if len(top_n_items) == top_n:
+                    return top_n_items
+
+    return top_n_items
+
+
+class RuleIndex:
+    """
+    Class that stores a set of association rules already mined and answers recommendations by matching the user items
+    against the antecedents of all rules at once (each antecedent is encoded as a bitset of items ids), without mining
+    the rules again
+    """
+
+    def __init__(self, rules):
+        """
+        Method that builds the rule index
+        :param rules: association rules with the kulczynski and imbalance ratio metrics (this dataframe must contain
+        the following columns: antecedents, consequents, confidence, kulczynski, imbalance ratio)
+        :type rules: dataframe
+        """
+        # Rules ids are the positions of the rules ordered by confidence (descending), so any ascending list of ids is
+        # already ordered by confidence
+        self.rules = rules.sort_values('confidence', ascending=False, kind='mergesort').reset_index(drop=True)
+        self.antecedents = list(self.rules['antecedents'])
+        self.consequents = [list(consequents) for consequents in self.rules['consequents']]
+        self.kulczynski = self.rules['kulczynski'].to_numpy(dtype=float)
+        self.imbalance_ratio = self.rules['imbalance ratio'].to_numpy(dtype=float)
+
+        # item_rules = { "Movie": [rule id, ...] }
+        self.item_rules = {}
+        for rule_id, antecedents in enumerate(self.antecedents):
+            for antecedent in antecedents:
+                if antecedent in self.item_rules:
+                    self.item_rules[antecedent].append(rule_id)
+                else:
+                    self.item_rules[antecedent] = [rule_id]
+        self.build_antecedents_matrix()
+        self.popular_items = None
+
+    def __len__(self):
+        return len(self.antecedents)
+
+    def build_antecedents_matrix(self):
+        """
+        Method that encodes the antecedents of the rules with integer items ids, as bitsets (64 bits words where the bit
+        of each antecedent item is set) and as a sparse matrix (one row for each rule and one column for each antecedent
+        item)
+        """
+        # items_ids = { "Movie": item id (bit of the bitsets and column of the sparse matrix) }
+        self.items_ids = {item: item_id for item_id, item in enumerate(self.item_rules)}
+        rows = np.array([rule_id for rule_id, antecedents in enumerate(self.antecedents) for antecedent in antecedents],
+                        dtype=np.int64)
+        columns = np.array([self.items_ids[antecedent] for antecedents in self.antecedents for antecedent in
+                            antecedents], dtype=np.int64)
+        # antecedents_masks[word, rule id] (the words are the rows, so that each word of all rules is contiguous)
+        self.antecedents_masks = np.zeros(((len(self.items_ids) + 63) // 64, len(self.antecedents)), dtype=np.uint64)
+        np.bitwise_or.at(self.antecedents_masks, (columns >> 6, rows),
+                         np.left_shift(np.uint64(1), (columns & 63).astype(np.uint64)))
+        self.antecedents_matrix = csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, columns)),
+                                             shape=(len(self.antecedents), len(self.items_ids)))
+        self.antecedents_lengths = np.diff(self.antecedents_matrix.indptr)
+
+    def get_item_rules(self, item):
+        """
+        Method that returns the ids of the rules that contain a certain item in its antecedents
+        :param item: item (movie title)
+        :type item: string
+        :return: list of rules ids ordered by confidence (descending)
+        """
+        return self.item_rules.get(item, [])
+
+    def get_user_mask(self, list_user_movies):
+        """
+        Method that encodes the items of a user as a bitset (the items that aren't part of any antecedent are ignored)
+        :param list_user_movies: list of items that user liked/interacted with
+        :type list_user_movies: string list
+        :return: bitset of the user items (numpy array of 64 bits words)
+        """
+        user_mask = np.zeros(self.antecedents_masks.shape[0], dtype=np.uint64)
+        for user_movie in set(list_user_movies):
+            item_id = self.items_ids.get(user_movie)
+            if item_id is not None:
+                user_mask[item_id >> 6] |= np.uint64(1 << (item_id & 63))
+
+        return user_mask
+
+    def get_applicable_rules(self, list_user_movies, full_match=False):
+        """
+        Method that verifies, for all rules at once, which rules can be applied to the user items
+        :param list_user_movies: list of items that user liked/interacted with
+        :type list_user_movies: string list
+        :param full_match: if a rule is only applied when the user has all its antecedents (True) or at least one of its
+        antecedents (False)
+        :type full_match: boolean
+        :return: numpy bool array with one position for each rule id
+        """
+        user_mask = self.get_user_mask(list_user_movies)
+        if full_match:
+            # Subset test: no antecedent item outside the user items
+            outside_items = np.zeros(len(self.antecedents), dtype=np.uint64)
+            for word in range(len(user_mask)):
+                outside_items |= self.antecedents_masks[word] & ~user_mask[word]
+            return outside_items == 0
+
+        # Intersection test: only the words with user items are verified
+        applicable_rules = np.zeros(len(self.antecedents), dtype=bool)
+        for word in np.nonzero(user_mask)[0]:
+            applicable_rules |= (self.antecedents_masks[word] & user_mask[word]) != 0
+
+        return applicable_rules
+
+    def get_user_rules(self, list_user_movies, full_match=False):
+        """
+        Method that returns the ids of the rules that contain at least one of the user items (or, if full_match is
+        True, only user items) in its antecedents
+        :param list_user_movies: list of items that user liked/interacted with
+        :type list_user_movies: string list
+        :param full_match: if a rule is only applied when the user has all its antecedents (True) or at least one of its
+        antecedents (False)
+        :type full_match: boolean
+        :return: list of rules ids ordered by confidence (descending)
+        """
+        return np.nonzero(self.get_applicable_rules(list_user_movies, full_match))[0].tolist()
+
+    def recommend(self, list_user_movies, min_kulc_value, min_imbalance_ratio_value, top_n, full_match=False):
+        """
+        Method that returns top n recommended items, based on the rules that can be applied to the user items and that
+        satisfy the Kulczynski and Imbalance Ratio values
+        :param list_user_movies: list of items that user liked/interacted with
+        :type list_user_movies: string list
+        :param min_kulc_value: minimum value of kulczynski metric
+        :type min_kulc_value: float (values between 0.0 and 1.0)
+        :param min_imbalance_ratio_value: minimum value of imbalance ratio
+        :type min_imbalance_ratio_value: float (values between 0.0 and 1.0)
+        :param top_n: number of best recommendations
+        :type top_n: integer
+        :param full_match: if a rule is only applied when the user has all its antecedents (True) or at least one of its
+        antecedents (False)
+        :type full_match: boolean
+        :return: list of the best recommended items for the user (empty if there isn't any rule to be applied)
+        """
+        user_movies = set(list_user_movies)
+        if top_n <= 0:
+            return []
+
+        # The more lesser Imbalance Ratio is, better (0 = perfectly balanced, 1 = unbalanced) and the more greater
+        # Kulczynski is better
+        valid_rules = self.get_applicable_rules(user_movies, full_match) & (
+                self.imbalance_ratio <= min_imbalance_ratio_value) & (self.kulczynski >= min_kulc_value)
+
+        return select_top_n_items((self.consequents[rule_id] for rule_id in np.flatnonzero(valid_rules)), user_movies,
+                                  top_n)
+
+    def get_popular_items(self, top_n, list_user_movies):
+        """
+        Method that returns the most popular items (consequents of the rules with greater confidence) that the user
+        hasn't interacted with
+        :param top_n: number of popular items
+        :type top_n: integer
+        :param list_user_movies: list of items that user liked/interacted with
+        :type list_user_movies: string list
+        :return: list of popular items with length of top_n (or less, if there aren't enough items)
+        """
+        if self.popular_items is None:
+            # Distinct consequents in order of confidence (only computed the first time)
+            self.popular_items = select_top_n_items(self.consequents, set(), len(self.consequents))
+
+        return select_top_n_items([self.popular_items], set(list_user_movies), top_n)
+
+    def get_users_matrix(self, users_list_movies):
+        """
+        Method that converts the items of many users into a sparse matrix (one row for each user and one column for
+        each antecedent item, the items that aren't part of any antecedent are ignored)
+        :param users_list_movies: list of items that each user liked/interacted with
+        :type users_list_movies: list of string lists
+        :return: users matrix (scipy.sparse CSR matrix)
+        """
+        rows = []
+        columns = []
+        for user_id, list_user_movies in enumerate(users_list_movies):
+            for user_movie in set(list_user_movies):
+                item_id = self.items_ids.get(user_movie)
+                if item_id is not None:
+                    rows.append(user_id)
+                    columns.append(item_id)
+
+        return csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, columns)),
+                          shape=(len(users_list_movies), len(self.items_ids)))
+
+    def recommend_batch(self, users_list_movies, min_kulc_value, min_imbalance_ratio_value, top_n,
+                        full_match=False):
+        """
+        Method that returns top n recommended items for many users at once. The rules of all users are matched with a
+        single sparse product (users x items matrix by the transposed rules x antecedents matrix), which gives the
+        number of antecedents of each rule that each user has
+        :param users_list_movies: list of items that each user liked/interacted with
+        :type users_list_movies: list of string lists
+        :param min_kulc_value: minimum value of kulczynski metric
+        :type min_kulc_value: float (values between 0.0 and 1.0)
+        :param min_imbalance_ratio_value: minimum value of imbalance ratio
+        :type min_imbalance_ratio_value: float (values between 0.0 and 1.0)
+        :param top_n: number of best recommendations
+        :type top_n: integer
+        :param full_match: if a rule is only applied when the user has all its antecedents (True) or at least one of its
+        antecedents (False, same as the recommend method)
+        :type full_match: boolean
+        :return: list with the best recommended items of each user (in the same order of users_list_movies)
+        """
+        users_top_n_items = [[] for list_user_movies in users_list_movies]
+        if top_n <= 0 or len(self.antecedents) == 0:
+            return users_top_n_items
+
+        # Rules that satisfy the Kulczynski and Imbalance Ratio values (ids in ascending order = confidence order)
+        valid_rules = np.nonzero((self.imbalance_ratio <= min_imbalance_ratio_value) & (
+                self.kulczynski >= min_kulc_value))[0]
+        valid_antecedents_t = self.antecedents_matrix[valid_rules].T.tocsr()
+        valid_lengths = self.antecedents_lengths[valid_rules]
+
+        for start in range(0, len(users_list_movies), USERS_BATCH_SIZE):
+            batch_list_movies = users_list_movies[start:start + USERS_BATCH_SIZE]
+            # matches[user, rule] = number of antecedents of the rule that the user has
+            matches = (self.get_users_matrix(batch_list_movies) @ valid_antecedents_t).tocsr()
+            matches.sort_indices()
+            for user in range(len(batch_list_movies)):
+                row = slice(matches.indptr[user], matches.indptr[user + 1])
+                rules_ids = valid_rules[matches.indices[row]]
+                if full_match:
+                    rules_ids = rules_ids[matches.data[row] == valid_lengths[matches.indices[row]]]
+                users_top_n_items[start + user] = select_top_n_items(
+                    (self.consequents[rule_id] for rule_id in rules_ids), set(batch_list_movies[user]), top_n)
+
+        return users_top_n_items
@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from DatasetCache import CACHE_FOLDER, get_dataset_hash
+
+# Folder (inside the cache folder of each csv file) where the mined artifacts (frequent itemsets and rules) are stored
+STORE_FOLDER = 'mined'
+# Maximum disk space used by the artifacts of a store folder (the least recently used ones are deleted first)
+MAX_STORE_SIZE = 512 * 1024 * 1024
+# Version of the format of the artifacts (part of their key, so artifacts of older formats are never read)
+ARTIFACTS_VERSION = 2
+
+RULES_METRICS_COLUMNS = ['antecedent support', 'consequent support', 'support', 'confidence', 'lift', 'leverage',
+                         'conviction']
+
+
+def get_store_folder(filename):
+    """
+    Method that returns the path of the folder where the mined artifacts of a csv file are stored
+    :param filename: path where the csv file is located
+    :type filename: string
+    :return: path of the store folder
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_FOLDER, STORE_FOLDER)
+
+
+def get_artifact_path(filename, kind, params):
+    """
+    Method that returns the path of the file of a mined artifact, which is named after the hash of the content of the
+    csv file, the kind of artifact and the mining parameters
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param kind: kind of artifact (e.g. "itemsets", "rules")
+    :type kind: string
+    :param params: mining parameters (e.g. [is_implicit, min_support, engine, rule_metric, rule_metric_threshold])
+    :type params: list
+    :return: path of the artifact file
+    """
+    key = json.dumps([ARTIFACTS_VERSION, get_dataset_hash(filename), kind, params])
+
+    return os.path.join(get_store_folder(filename), kind + '-' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '.npz')
+
+
+def encode_itemsets_arrays(itemsets, titles_ids):
+    """
+    Method that encodes itemsets of movies titles into two integer arrays (in CSR format: the items of the itemset i are
+    indices[indptr[i]:indptr[i + 1]])
+    :param itemsets: itemsets of movies titles
+    :type itemsets: series of frozensets
+    :param titles_ids: ids of the movies titles, with the following format: { "Movie": id }
+    :type titles_ids: dictionary
+    :return: tuple (indptr, indices)
+    """
+    lengths = np.fromiter((len(itemset) for itemset in itemsets), dtype=np.int64, count=len(itemsets))
+    indptr = np.zeros(len(itemsets) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((titles_ids[title] for itemset in itemsets for title in itemset), dtype=np.int32,
+                          count=int(indptr[-1]))
+
+    return indptr, indices
+
+
+def decode_itemsets_arrays(indptr, indices, titles):
+    """
+    Method that decodes itemsets encoded by encode_itemsets_arrays into itemsets of movies titles
+    :param indptr: positions where the items of each itemset start
+    :type indptr: numpy integer array
+    :param indices: ids of the movies titles of all itemsets
+    :type indices: numpy integer array
+    :param titles: movies titles indexed by their ids
+    :type titles: list of strings
+    :return: list of frozensets of movies titles
+    """
+    items = [titles[title_id] for title_id in indices.tolist()]
+    indptr = indptr.tolist()
+
+    return [frozenset(items[indptr[i]:indptr[i + 1]]) for i in range(len(indptr) - 1)]
+
+
+def save_artifact(path, arrays):
+    """
+    Method that writes the arrays of a mined artifact into a .npz file (the file is written to a temporary file and
+    replaced at once, so that a partially written artifact is never read) and evicts the least recently used artifacts
+    if the store folder exceeds its maximum size
+    :param path: path of the artifact file
+    :type path: string
+    :param arrays: arrays of the artifact (they can't have the object dtype), with the following format:
+    { "name": numpy array }
+    :type arrays: dictionary
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as fp:
+            np.savez(fp, **arrays)
+        fp.close()
+        os.replace(temp_path, path)
+        evict_artifacts(os.path.dirname(path))
+    except OSError:
+        # If the artifact can't be written the mining results are used anyway
+        pass
+
+
+def load_artifact(path):
+    """
+    Method that reads the arrays of a mined artifact, marking it as recently used
+    :param path: path of the artifact file
+    :type path: string
+    :return: dictionary with the following format: { "name": numpy array } or None if the artifact doesn't exist
+    """
+    try:
+        with np.load(path, allow_pickle=False) as artifact:
+            arrays = {name: artifact[name] for name in artifact.files}
+        # The modification time of the artifacts is their last use (used by the LRU eviction)
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+
+    return arrays
+
+
+def evict_artifacts(store_folder, max_size=MAX_STORE_SIZE):
+    """
+    Method that deletes the least recently used artifacts of a store folder until their total size is lower than or
+    equal to the maximum size
+    :param store_folder: path of the store folder
+    :type store_folder: string
+    :param max_size: maximum size (in bytes) of all artifacts
+    :type max_size: integer
+    :return: number of artifacts deleted
+    """
+    artifacts = []
+    for entry in os.scandir(store_folder):
+        if entry.is_file() and entry.name.endswith('.npz'):
+            entry_stat = entry.stat()
+            artifacts.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+
+    total_size = sum(size for last_use, size, path in artifacts)
+    no_deleted = 0
+    for last_use, size, path in sorted(artifacts):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+        no_deleted += 1
+
+    return no_deleted
+
+
+def save_itemsets(filename, params, freq_prod, no_transactions, mining_time):
+    """
+    Method that stores the frequent itemsets mined from a csv file with certain parameters
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param params: mining parameters, with the following format: [is_implicit, min_support, engine]
+    :type params: list
+    :param freq_prod: frequent itemsets (of movies titles), with the columns support and itemsets
+    :type freq_prod: dataframe
+    :param no_transactions: number of transactions
+    :type no_transactions: integer
+    :param mining_time: seconds spent mining the frequent itemsets (reported when the itemsets are reused)
+    :type mining_time: float
+    """
+    titles = sorted({title for itemset in freq_prod['itemsets'] for title in itemset})
+    titles_ids = {title: title_id for title_id, title in enumerate(titles)}
+    itemsets_indptr, itemsets_indices = encode_itemsets_arrays(freq_prod['itemsets'], titles_ids)
+    save_artifact(get_artifact_path(filename, 'itemsets', params),
+                  {'titles': np.array(titles, dtype=str), 'no_transactions': np.array(no_transactions),
+                   'mining_time': np.array(mining_time, dtype=np.float64),
+                   'support': freq_prod['support'].to_numpy(dtype=np.float64),
+                   'itemsets_indptr': itemsets_indptr, 'itemsets_indices': itemsets_indices})
+
+
+def load_itemsets(filename, params):
+    """
+    Method that returns the frequent itemsets stored for a csv file and certain parameters
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param params: mining parameters, with the following format: [is_implicit, min_support, engine]
+    :type params: list
+    :return: tuple (frequent itemsets, number of transactions, seconds spent mining the frequent itemsets) or None if
+    they weren't stored
+    """
+    artifact = load_artifact(get_artifact_path(filename, 'itemsets', params))
+    if artifact is None:
+        return None
+
+    freq_prod = pd.DataFrame({'support': artifact['support'],
+                              'itemsets': decode_itemsets_arrays(artifact['itemsets_indptr'],
+                                                                 artifact['itemsets_indices'],
+                                                                 artifact['titles'].tolist())},
+                             columns=['support', 'itemsets'])
+
+    return freq_prod, int(artifact['no_transactions']), float(artifact['mining_time'])
+
+
+def save_rules(filename, params, rules, no_transactions):
+    """
+    Method that stores the association rules mined from a csv file with certain parameters
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param params: mining parameters, with the following format: [is_implicit, min_support, engine, rule_metric,
+    rule_metric_threshold]
+    :type params: list
+    :param rules: association rules (in the format of the association_rules method of mlxtend)
+    :type rules: dataframe
+    :param no_transactions: number of transactions
+    :type no_transactions: integer
+    """
+    titles = sorted({title for itemsets in (rules['antecedents'], rules['consequents']) for itemset in itemsets for
+                     title in itemset})
+    titles_ids = {title: title_id for title_id, title in enumerate(titles)}
+    antecedents_indptr, antecedents_indices = encode_itemsets_arrays(rules['antecedents'], titles_ids)
+    consequents_indptr, consequents_indices = encode_itemsets_arrays(rules['consequents'], titles_ids)
+    save_artifact(get_artifact_path(filename, 'rules', params),
+                  {'titles': np.array(titles, dtype=str), 'no_transactions': np.array(no_transactions),
+                   'antecedents_indptr': antecedents_indptr, 'antecedents_indices': antecedents_indices,
+                   'consequents_indptr': consequents_indptr, 'consequents_indices': consequents_indices,
+                   'metrics': rules[RULES_METRICS_COLUMNS].to_numpy(dtype=np.float64).reshape(-1, 7)})
+
+
+def load_rules(filename, params):
+    """
+    Method that returns the association rules stored for a csv file and certain parameters
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param params: mining parameters, with the following format: [is_implicit, min_support, engine, rule_metric,
+    rule_metric_threshold]
+    :type params: list
+    :return: tuple (association rules, number of transactions) or None if they weren't stored
+    """
+    artifact = load_artifact(get_artifact_path(filename, 'rules', params))
+    if artifact is None:
+        return None
+
+    titles = artifact['titles'].tolist()
+    rules = pd.DataFrame(artifact['metrics'], columns=RULES_METRICS_COLUMNS)
+    rules.insert(0, 'antecedents', decode_itemsets_arrays(artifact['antecedents_indptr'],
+                                                          artifact['antecedents_indices'], titles))
+    rules.insert(1, 'consequents', decode_itemsets_arrays(artifact['consequents_indptr'],
+                                                          artifact['consequents_indices'], titles))
+
+    return rules, int(artifact['no_transactions'])
+
+
+def clear_store(filename):
+    """
+    Method that deletes all mined artifacts stored for the csv files of the same folder of a csv file
+    :param filename: path where the csv file is located
+    :type filename: string
+    :return: number of artifacts deleted
+    """
+    store_folder = get_store_folder(filename)
+    if not os.path.isdir(store_folder):
+        return 0
+
+    return evict_artifacts(store_folder, max_size=0)
+
+# print(load_itemsets('datasets/userRatings5k.csv', [True, 0.1, "native"]))
+# print(load_rules('datasets/userRatings5k.csv', [True, 0.1, "native", "confidence", 0.6]))
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from RatingsReader import read_ratings_codes
+
+
+# Functions called with the statistics of the items pruned every time the transactions are encoded with a minimum
+# support, with the following format: hook(stats)
+pruning_hooks = []
+
+
+def register_pruning_hook(hook):
+    """
+    Method that registers a function that receives the statistics of the items pruned before the one hot encoding
+    :param hook: function with the following format: hook(stats), where stats is the dictionary returned by
+    prune_infrequent_movies
+    :type hook: function
+    """
+    pruning_hooks.append(hook)
+
+
+def print_pruning_stats(stats):
+    """
+    Method that prints the statistics of the items pruned before the one hot encoding (it can be registered as a
+    pruning hook)
+    :param stats: statistics of the items pruned (returned by prune_infrequent_movies)
+    :type stats: dictionary
+    """
+    print("Filmes removidos antes da codificação: " + str(stats['pruned_items']) + " de " + str(
+        stats['items']) + " (colunas: " + str(stats['frequent_items']) + "), avaliações removidas: " + str(
+        stats['pruned_ratings']) + " de " + str(stats['ratings']))
+
+
+def prune_infrequent_movies(users_ids, movies_ids, movies_titles, min_support):
+    """
+    Method that removes the ratings of the movies whose support is lower than the minimum support (these movies can't
+    be part of any frequent itemset), keeping the alphabetical order of the remaining movies ids
+    :param users_ids: user id of each rating (ids from 0 to the number of users - 1)
+    :type users_ids: numpy integer array
+    :param movies_ids: movie id of each rating
+    :type movies_ids: numpy integer array
+    :param movies_titles: list of titles indexed by the movies ids
+    :type movies_titles: list of strings
+    :param min_support: minimum support for the frequent itemsets
+    :type min_support: float
+    :return: tuple (users ids, movies ids, movies titles, stats), where stats has the following format:
+    { "transactions": ..., "items": ..., "frequent_items": ..., "pruned_items": ..., "ratings": ...,
+    "pruned_ratings": ... }
+    """
+    no_users = int(users_ids.max()) + 1 if len(users_ids) > 0 else 0
+    no_movies = len(movies_titles)
+    # Repeated ratings of the same movie by the same user are counted once
+    pairs = np.unique(users_ids.astype(np.int64) * no_movies + movies_ids)
+    movies_counts = np.bincount(pairs % no_movies, minlength=no_movies) if no_movies > 0 else np.zeros(0, np.int64)
+    frequent = movies_counts / float(max(no_users, 1)) >= min_support
+
+    kept = frequent[movies_ids]
+    remap = np.cumsum(frequent, dtype=np.int64).astype(np.int32) - 1
+    stats = {'transactions': no_users, 'items': no_movies, 'frequent_items': int(frequent.sum()),
+             'pruned_items': no_movies - int(frequent.sum()), 'ratings': len(movies_ids),
+             'pruned_ratings': len(movies_ids) - int(kept.sum())}
+
+    return users_ids[kept], remap[movies_ids[kept]], [title for title, is_frequent in zip(movies_titles, frequent) if
+                                                      is_frequent], stats
+
+
+def encode_transactions_sparse(filename, is_implicit, min_support=None):
+    """
+    Method that reads from a csv file the users ratings and returns the transactions in sparse one hot encoding format
+    (CSR matrix with one row for each user and one column for each movie)
+    :param filename: path where the csv file is located (this file must be in csv format and must contain
+    the following columns: userId, movieTitle, rating)
+    :type filename: string
+    :param is_implicit: if the data is implicit or explicit (False = explicit data, True = implicit data)
+    :type is_implicit: boolean
+    :param min_support: minimum support for the frequent itemsets, if it's given the movies with lower support are
+    removed before the encoding (only the columns of the frequent movies are created, the number of rows is the same)
+    :type min_support: float
+    :return: tuple (one hot encoding matrix, movies titles), where movies titles is the list of titles indexed by the
+    columns of the matrix
+    """
+    users_ids, movies_ids, movies_titles = read_ratings_codes(filename, is_implicit)
+    no_users = int(users_ids.max()) + 1 if len(users_ids) > 0 else 0
+    if min_support is not None:
+        users_ids, movies_ids, movies_titles, stats = prune_infrequent_movies(users_ids, movies_ids, movies_titles,
+                                                                              min_support)
+        for hook in pruning_hooks:
+            hook(stats)
+    one_hot_trans = csr_matrix((np.ones(len(users_ids), dtype=bool), (users_ids, movies_ids)),
+                               shape=(no_users, len(movies_titles)))
+    # Repeated ratings of the same movie by the same user are merged in a single True value
+    one_hot_trans.sum_duplicates()
+
+    return one_hot_trans, movies_titles
+
+# register_pruning_hook(print_pruning_stats)
+
+
+def sparse_transactions_dataframe(one_hot_trans):
+    """
+    Method that converts a sparse one hot encoding matrix into a sparse DataFrame (pd.SparseDtype) accepted by the
+    mlxtend algorithms, where the columns are the integer ids of the movies
+    :param one_hot_trans: one hot encoding matrix (one row for each user and one column for each movie)
+    :type one_hot_trans: scipy.sparse matrix
+    :return: one hot encoding transactions in sparse DataFrame type
+    """
+    return pd.DataFrame.sparse.from_spmatrix(one_hot_trans.astype(bool))
+
+
+def decode_itemsets(itemsets, movies_titles):
+    """
+    Method that converts itemsets of movies ids into itemsets of movies titles
+    :param itemsets: itemsets of movies ids
+    :type itemsets: series of frozensets
+    :param movies_titles: list of titles indexed by the movies ids
+    :type movies_titles: list of strings
+    :return: itemsets of movies titles
+    """
+    return itemsets.apply(lambda itemset: frozenset(movies_titles[movie_id] for movie_id in itemset))
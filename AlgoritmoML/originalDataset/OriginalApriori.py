@@ -1,10 +1,13 @@
 import json
-import csv
 import pandas as pd
 import numpy as np
 from mlxtend.preprocessing import TransactionEncoder
 from mlxtend.frequent_patterns import apriori, association_rules, fpgrowth
 
+# The shared modules (RatingsReader, ...) are located in the parent folder (AlgoritmoML), so this script is run as a
+# module of the originalDataset package from that folder (python -m originalDataset.OriginalApriori)
+from RatingsReader import read_transactions
+
 
 # Data Extraction
 
@@ -29,19 +32,7 @@ def read_data(filename):
     :type filename: string
     :return: list of transactions with all users' items
     """
-    # Open the file
-    with open(filename, encoding='utf-8') as fp:
-        USERID, MOVIETITLE, RATING = 0, 1, 2
-        reader = csv.reader(fp)
-        next(reader, None)  # skip the headers
-        ratingsDict = {}
-
-        for line in reader:
-            if line[USERID] in ratingsDict.keys():
-                ratingsDict[line[USERID]].append((line[MOVIETITLE]))
-            else:
-                ratingsDict[line[USERID]] = [(line[MOVIETITLE])]
-    return list(ratingsDict.values())
+    return read_transactions(filename, is_implicit=True)[0]
 
 
 # print(read_data('ratings_sampled.csv')[0])
@@ -269,7 +260,7 @@ def recommend_to_user(listUserItems, filename, min_support, ruleMetric, minRuleM
 
 # min_support=0.1 e min_confidence=0.6
 # Adicionar rating e géneros, nos antecedents passo a ter mais info
-print(generate_association_rules(filename="../datasets/userRatings5k.csv", min_support=0.1, ruleMetric="confidence",
+print(generate_association_rules(filename="datasets/userRatings5k.csv", min_support=0.1, ruleMetric="confidence",
                                  ruleMetricThreshold=0.6).to_string())
 
 # recommItems = recommend_to_user(listUserItems=["Blind Turn (2012)"],
@@ -2,6 +2,10 @@ import csv
 import json
 import pandas as pd
 
+# The shared modules (RatingsReader, ...) are located in the parent folder (AlgoritmoML), so this script is run as a
+# module of the originalDataset package from that folder (python -m originalDataset.OriginalCleanData)
+from RatingsReader import read_ratings_rows
+
 
 def read_data(filename):
     """
@@ -10,19 +14,7 @@ def read_data(filename):
     :type filename: string
     :return: list of transactions with all users' items
     """
-    # Open the file
-    with open(filename, encoding='utf-8') as fp:
-        reader = csv.reader(fp)
-        next(reader, None)  # skip the headers
-        i = 0
-        ratingsList = []
-        for line in reader:
-            if line[0] == '5001':
-                break
-            new_line = [line[0], line[1], line[2]]
-            ratingsList.append(new_line)
-
-    return ratingsList
+    return read_ratings_rows(filename, qty_users=5000)
 
 
 # print(read_data('movies.csv'))
@@ -95,8 +87,8 @@ def write_ratings_with_sampled_movies(originalFilename, newFilename, sampledFile
 def write_data(filename):
     with open(filename, 'w', newline='', encoding='utf-8') as new_fp:
         USERID, MOVIEID, RATING = 0, 1, 2
-        moviesDict = get_movies_dict('movies.csv')
-        items = read_data('../datasets/new_ratings.csv')
+        moviesDict = get_movies_dict('originalDataset/movies.csv')
+        items = read_data('datasets/new_ratings.csv')
         write = csv.writer(new_fp)
         write.writerow(["userId", "movieTitle", "rating"])
         for line in items:
@@ -106,4 +98,4 @@ def write_data(filename):
     new_fp.close()
 
 # 2º Descomentar esta linha
-# write_data('../datasets/userRatings5k.csv')
+# write_data('datasets/userRatings5k.csv')
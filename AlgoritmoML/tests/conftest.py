@@ -0,0 +1,79 @@
+import csv
+
+import numpy as np
+import pytest
+
+# Number of users and movies of the synthetic datasets
+NO_USERS = 400
+NO_MOVIES = 30
+
+
+def get_movies_titles(no_movies=NO_MOVIES):
+    """
+    Method that returns the titles of the synthetic movies (the movieId of each title is its position + 1)
+    :param no_movies: number of movies
+    :type no_movies: integer
+    :return: list of titles
+    """
+    return ["Movie " + str(movie).zfill(2) + " (2000)" for movie in range(no_movies)]
+
+
+def write_movies_csv(filename, titles):
+    """
+    Method that writes a csv file of movies with the columns of datasets/movies.csv
+    :param filename: path where the csv file is written
+    :type filename: string
+    :param titles: list of movies titles
+    :type titles: list of strings
+    """
+    with open(filename, 'w', newline='', encoding='utf-8') as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["movieId", "title", "genres", "imdbid", "tmdbid", "release_date", "year", "poster"])
+        for movie, title in enumerate(titles):
+            writer.writerow([movie + 1, title, "Drama|Comedy" if movie % 2 else "Action", 100 + movie, 200 + movie,
+                             "2000-01-01", 2000, ""])
+    fp.close()
+
+
+def write_ratings_csv(filename, titles, no_users=NO_USERS, seed=0):
+    """
+    Method that writes a csv file of users ratings (userId, movieTitle, rating) where the users are split into groups
+    that prefer different movies, so that there are frequent itemsets of several lengths and ties between supports
+    :param filename: path where the csv file is written
+    :type filename: string
+    :param titles: list of movies titles
+    :type titles: list of strings
+    :param no_users: number of users
+    :type no_users: integer
+    :param seed: seed of the random generator
+    :type seed: integer
+    """
+    random = np.random.RandomState(seed)
+    groups = [titles[:8], titles[6:16], titles[14:24]]
+    with open(filename, 'w', newline='', encoding='utf-8') as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["userId", "movieTitle", "rating"])
+        for user in range(no_users):
+            group = groups[user % len(groups)]
+            # Users ids aren't consecutive and their movies aren't sorted, like in the real datasets
+            user_id = 1 + user * 3
+            for title in random.permutation(titles):
+                if random.rand() < (0.55 if title in group else 0.06):
+                    writer.writerow([user_id, title, random.choice([1.0, 2.5, 3.0, 3.5, 4.0, 5.0])])
+    fp.close()
+
+
+@pytest.fixture
+def movies_file(tmp_path):
+    filename = str(tmp_path / "movies.csv")
+    write_movies_csv(filename, get_movies_titles())
+
+    return filename
+
+
+@pytest.fixture
+def ratings_file(tmp_path):
+    filename = str(tmp_path / "userRatings.csv")
+    write_ratings_csv(filename, get_movies_titles())
+
+    return filename
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+from ApproximateMiner import count_itemsets, get_negative_border, get_sample_size, mine_sample_itemsets
+from FPGrowthMiner import mine_frequent_itemsets
+
+
+def random_transactions(no_transactions, seed):
+    random = np.random.RandomState(seed)
+    dense = random.rand(no_transactions, 12) < np.linspace(0.05, 0.6, 12)
+    # Correlated items, so that there are itemsets with more than two items
+    dense[:, :4] |= random.rand(no_transactions, 1) < 0.3
+
+    return csr_matrix(dense)
+
+
+def get_itemsets_supports(freq_prod):
+    return dict(zip(freq_prod['itemsets'], freq_prod['support']))
+
+
+def test_sample_with_all_transactions_is_mined_exactly():
+    one_hot_trans = random_transactions(300, 0)
+    assert get_sample_size(0.01, 0.05) > 300
+
+    freq_prod, stats = mine_sample_itemsets(one_hot_trans, 0.1, epsilon=0.01, delta=0.05, random_state=0)
+
+    assert freq_prod.equals(mine_frequent_itemsets(one_hot_trans, 0.1))
+    assert stats['sample_size'] == 300 and stats['support_error'] == 0.0 and not stats['verified']
+    assert stats['false_positives'] == 0 and stats['missed_border'] == 0
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_verified_sample_has_exact_supports(seed):
+    one_hot_trans = random_transactions(3000, seed)
+    expected = get_itemsets_supports(mine_frequent_itemsets(one_hot_trans, 0.1))
+
+    freq_prod, stats = mine_sample_itemsets(one_hot_trans, 0.1, epsilon=0.05, delta=0.05, random_state=seed)
+
+    assert stats['verified'] and stats['sample_size'] == get_sample_size(0.05, 0.05) < 3000
+    itemsets_supports = get_itemsets_supports(freq_prod)
+    assert all(expected[itemset] == support for itemset, support in itemsets_supports.items())
+    if stats['missed_border'] == 0:
+        # No itemset of the negative border is frequent, so no frequent itemset was missed
+        assert itemsets_supports == expected
+
+
+def test_count_itemsets():
+    one_hot_trans = random_transactions(200, 1)
+    dense = one_hot_trans.toarray()
+    itemsets = [frozenset([3]), frozenset([0, 1]), frozenset([0, 1, 2]), frozenset([0, 2]), frozenset([1, 5, 7]),
+                frozenset([0, 1, 2, 3])]
+
+    assert count_itemsets(one_hot_trans, itemsets).tolist() == [int(dense[:, sorted(itemset)].all(axis=1).sum()) for
+                                                                itemset in itemsets]
+
+
+def test_get_negative_border():
+    itemsets = {frozenset([0]), frozenset([1]), frozenset([2]), frozenset([0, 1]), frozenset([1, 2])}
+
+    assert sorted(map(sorted, get_negative_border(itemsets, [0, 1, 2, 3]))) == [[0, 2], [3]]
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+
+from DatasetCache import (CACHE_VERSION, clear_cache, get_cache_folder, get_dataset_hash, get_file_hash,
+                          load_cached_arrays, load_movies_arrays, read_metadata, write_metadata)
+
+
+def build_counter(calls):
+    def build_arrays():
+        calls.append(1)
+        return {'values': np.arange(5, dtype=np.int64), 'names': np.array(['a', 'b'], dtype=str)}
+
+    return build_arrays
+
+
+def test_arrays_are_only_built_once(ratings_file):
+    calls = []
+    arrays = load_cached_arrays(ratings_file, 'test', build_counter(calls))
+    cached = load_cached_arrays(ratings_file, 'test', build_counter(calls))
+
+    assert len(calls) == 1
+    assert isinstance(cached['values'], np.memmap)
+    assert cached['values'].tolist() == arrays['values'].tolist()
+    assert cached['names'].tolist() == ['a', 'b']
+
+
+def test_cache_is_rebuilt_when_the_content_changes(ratings_file):
+    calls = []
+    load_cached_arrays(ratings_file, 'test', build_counter(calls))
+    with open(ratings_file, 'a', encoding='utf-8') as fp:
+        fp.write("9999,Movie 00 (2000),4.0\n")
+    fp.close()
+    load_cached_arrays(ratings_file, 'test', build_counter(calls))
+
+    assert len(calls) == 2
+
+
+def test_cache_is_kept_when_only_the_modification_time_changes(ratings_file):
+    calls = []
+    load_cached_arrays(ratings_file, 'test', build_counter(calls))
+    os.utime(ratings_file, ns=(0, 10 ** 9))
+    load_cached_arrays(ratings_file, 'test', build_counter(calls))
+
+    assert len(calls) == 1
+    assert read_metadata(get_cache_folder(ratings_file, 'test'))['mtime_ns'] == 10 ** 9
+
+
+def test_cache_of_other_version_is_rebuilt(ratings_file):
+    calls = []
+    load_cached_arrays(ratings_file, 'test', build_counter(calls))
+    cache_folder = get_cache_folder(ratings_file, 'test')
+    metadata = read_metadata(cache_folder)
+    metadata['version'] = CACHE_VERSION - 1
+    write_metadata(cache_folder, metadata)
+    load_cached_arrays(ratings_file, 'test', build_counter(calls))
+
+    assert len(calls) == 2
+    clear_cache(ratings_file, 'test')
+    assert not os.path.exists(cache_folder)
+
+
+def test_dataset_hash_reuses_the_stored_hash(ratings_file):
+    assert get_dataset_hash(ratings_file) == get_file_hash(ratings_file)
+    load_cached_arrays(ratings_file, 'ratings', build_counter([]))
+    cache_folder = get_cache_folder(ratings_file, 'ratings')
+    metadata = read_metadata(cache_folder)
+    metadata['sha1'] = 'stored'
+    write_metadata(cache_folder, metadata)
+
+    assert get_dataset_hash(ratings_file) == 'stored'
+
+
+def test_movies_arrays(movies_file):
+    movies = load_movies_arrays(movies_file)
+
+    assert movies['movies_ids'][:2].tolist() == [1, 2]
+    assert movies['titles'][0] == "Movie 00 (2000)"
+    assert load_movies_arrays(movies_file, use_cache=False)['genres'].tolist() == movies['genres'].tolist()
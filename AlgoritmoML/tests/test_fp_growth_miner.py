@@ -0,0 +1,162 @@
+import math
+import os
+
+import numpy as np
+import pytest
+from mlxtend.frequent_patterns import association_rules, fpgrowth
+from scipy.sparse import csr_matrix
+
+from Benchmarks import same_rules
+from FPGrowthAlgo import mine_frequent_movies_itemsets
+from FPGrowthMiner import (build_fp_tree, compress_paths, get_n_jobs, get_tree_items, grow_itemsets,
+                           grow_itemsets_parallel, is_single_path, mine_frequent_itemsets, mine_top_k_itemsets,
+                           TopKThreshold)
+from TransactionEncoding import sparse_transactions_dataframe
+
+
+def same_itemsets(freq_prod, other_freq_prod):
+    """
+    Method that verifies if two dataframes of frequent itemsets are equal row for row (without sorting them), including
+    the order in which the items of each itemset are iterated
+    """
+    return freq_prod.equals(other_freq_prod) and all(
+        list(itemset) == list(other_itemset) for itemset, other_itemset in
+        zip(freq_prod['itemsets'], other_freq_prod['itemsets']))
+
+
+def random_transactions(seed):
+    random = np.random.RandomState(seed)
+    no_transactions, no_items = random.randint(5, 200), random.randint(2, 14)
+    dense = random.rand(no_transactions, no_items) < random.rand(no_items) * 0.7
+    # Correlated items, so that there are long itemsets and single path conditional trees
+    dense[:, :no_items // 2] |= random.rand(no_transactions, 1) < 0.3
+
+    return csr_matrix(dense)
+
+
+@pytest.mark.parametrize("seed", range(12))
+@pytest.mark.parametrize("max_len", [None, 2, 3])
+def test_native_matches_mlxtend_row_for_row(seed, max_len):
+    one_hot_trans = random_transactions(seed)
+    for min_support in [0.05, 0.2, 0.5]:
+        expected = fpgrowth(sparse_transactions_dataframe(one_hot_trans), min_support=min_support, max_len=max_len)
+        freq_prod = mine_frequent_itemsets(one_hot_trans, min_support, max_len=max_len)
+
+        assert same_itemsets(freq_prod, expected)
+        if len(expected) > 0:
+            assert same_rules(association_rules(freq_prod, metric="confidence", min_threshold=0.3),
+                              association_rules(expected, metric="confidence", min_threshold=0.3))
+
+
+@pytest.mark.parametrize("is_implicit", [True, False])
+def test_engines_match_mlxtend_row_for_row(ratings_file, is_implicit):
+    expected = mine_frequent_movies_itemsets(ratings_file, is_implicit, 0.05, engine="mlxtend", use_store=False)[0]
+
+    for engine, n_jobs in [("native", 1), ("native", 2), ("out_of_core", 1)]:
+        freq_prod = mine_frequent_movies_itemsets(ratings_file, is_implicit, 0.05, engine=engine, use_store=False,
+                                                  n_jobs=n_jobs)[0]
+        assert same_itemsets(freq_prod, expected), engine
+
+
+def test_compress_paths_keeps_first_occurrence_order():
+    paths = np.array([[1, 1, 0], [0, 1, 1], [0, 0, 0], [1, 1, 0], [0, 0, 1]], dtype=bool)
+    unique_paths, counts = compress_paths(paths, np.array([1, 2, 5, 3, 1]))
+
+    assert unique_paths.tolist() == [[True, True, False], [False, True, True], [False, False, True]]
+    assert counts.tolist() == [4, 2, 1]
+
+
+def test_is_single_path():
+    assert is_single_path(np.array([[1, 1, 1], [1, 1, 0], [0, 0, 0], [1, 0, 0]], dtype=bool))
+    assert not is_single_path(np.array([[1, 1, 0], [1, 0, 1]], dtype=bool))
+    assert not is_single_path(np.array([[1, 1, 1], [0, 1, 0]], dtype=bool))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_parallel_growth_matches_serial_growth(seed):
+    one_hot_trans = random_transactions(seed)
+    items_counts = np.asarray(one_hot_trans.sum(axis=0)).reshape(-1)
+    items_supports = items_counts / float(one_hot_trans.shape[0])
+    min_count = math.ceil(0.05 * one_hot_trans.shape[0])
+    items = get_tree_items(items_supports, np.nonzero(items_supports >= 0.05)[0])
+    paths, counts = build_fp_tree(one_hot_trans, items)
+    serial = ([], [])
+    grow_itemsets(paths, counts, items_counts[items], items, (), min_count, None, *serial)
+    # The worker processes are used even if the machine has fewer cores
+    parallel = ([], [])
+    grow_itemsets_parallel(paths, counts, items_counts[items], items, min_count, None, 2, *parallel)
+
+    assert parallel == serial
+
+
+def test_n_jobs_never_exceeds_cpu_cores():
+    no_cores = os.cpu_count() or 1
+
+    assert get_n_jobs(no_cores + 8) == no_cores
+    assert get_n_jobs(None) == no_cores
+    assert get_n_jobs(1) == 1
+
+
+def get_itemsets_supports(freq_prod):
+    return dict(zip(freq_prod['itemsets'], freq_prod['support']))
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("k, min_len", [(1, 1), (5, 1), (10, 2), (40, 2)])
+def test_top_k_min_support_mines_the_same_itemsets(seed, k, min_len):
+    one_hot_trans = random_transactions(seed)
+    freq_prod, min_support = mine_top_k_itemsets(one_hot_trans, k, min_len)
+
+    assert get_itemsets_supports(mine_frequent_itemsets(one_hot_trans, min_support)) == get_itemsets_supports(freq_prod)
+
+
+def test_top_k_min_support_keeps_the_min_count():
+    # 955 / 3000 * 3000 is rounded up to 956, so that support would leave out the pair found 955 times
+    dense = np.zeros((3000, 3), dtype=bool)
+    dense[:955, :2] = True
+    dense[955:1500, 2] = True
+    # Other paths with the items, so that the tree isn't a single path (whose itemsets are all kept)
+    dense[1500:1600, [1, 2]] = True
+    dense[1600:1700, [0, 2]] = True
+    one_hot_trans = csr_matrix(dense)
+    freq_prod, min_support = mine_top_k_itemsets(one_hot_trans, 1, min_len=2)
+
+    assert frozenset([0, 1]) in get_itemsets_supports(freq_prod)
+    assert get_itemsets_supports(mine_frequent_itemsets(one_hot_trans, min_support)) == get_itemsets_supports(freq_prod)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_build_fp_tree_matches_dense_paths(seed):
+    one_hot_trans = random_transactions(seed)
+    items = np.random.RandomState(seed).permutation(one_hot_trans.shape[1])[:-1]
+    paths, counts = build_fp_tree(one_hot_trans, items)
+    dense_paths = one_hot_trans[:, items].toarray().astype(bool)
+    expected_paths, expected_counts = compress_paths(dense_paths, np.ones(dense_paths.shape[0], dtype=np.int64))
+
+    assert paths.dtype == bool
+    assert paths.tolist() == expected_paths.tolist()
+    assert counts.tolist() == expected_counts.tolist()
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("k, min_len", [(1, 1), (5, 1), (10, 2), (40, 2)])
+def test_top_k_itemsets_have_the_k_greatest_supports(seed, k, min_len):
+    one_hot_trans = random_transactions(seed)
+    all_itemsets = mine_frequent_itemsets(one_hot_trans, 1 / one_hot_trans.shape[0])
+    supports = sorted(all_itemsets['support'][all_itemsets['itemsets'].map(len) >= min_len], reverse=True)
+    freq_prod, min_support = mine_top_k_itemsets(one_hot_trans, k, min_len)
+
+    kth_support = supports[min(k, len(supports)) - 1]
+    assert min(freq_prod['support'][freq_prod['itemsets'].map(len) >= min_len]) == kth_support
+    assert sum(support >= kth_support for support in supports) == sum(freq_prod['itemsets'].map(len) >= min_len)
+
+
+def test_top_k_threshold_starts_at_the_bound():
+    threshold = TopKThreshold(2, min_count_bound=5)
+    assert threshold.min_count == 5
+
+    threshold.add(1, 7)
+    threshold.add(1, 3)
+    assert threshold.min_count == 5
+    threshold.add(1, 9)
+    assert threshold.min_count == 7
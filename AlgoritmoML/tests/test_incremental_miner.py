@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from mlxtend.frequent_patterns import fpgrowth
+
+from IncrementalMiner import IncrementalMiner, build_incremental_miner
+
+PARAMS = {'min_support': 0.1, 'rule_metric': "confidence", 'min_rule_metric_value': 0.3, 'min_kulc_value': 0.4,
+          'min_imbalance_ratio_value': 0.3}
+
+
+def get_liked_interactions(ratings_file, movies_file):
+    """
+    Method that returns the interactions (userId, movieId) of the explicit data of a csv file of users ratings
+    """
+    titles_ids = dict(pd.read_csv(movies_file, usecols=['movieId', 'title']).set_index('title')['movieId'])
+    ratings = pd.read_csv(ratings_file, dtype={'userId': str})
+    liked = ratings[ratings['rating'] >= 3.0]
+
+    return {(user_id, int(titles_ids[title])) for user_id, title in zip(liked['userId'], liked['movieTitle'])}
+
+
+def sort_rules(rules):
+    rules = rules.assign(antecedents=rules['antecedents'].map(sorted).map(tuple),
+                         consequents=rules['consequents'].map(sorted).map(tuple))
+
+    return rules.sort_values(['antecedents', 'consequents']).reset_index(drop=True)
+
+
+def test_incremental_miner_matches_full_mining(ratings_file, movies_file):
+    miner = build_incremental_miner(ratings_file, False, movies_file, **PARAMS)
+    interactions = get_liked_interactions(ratings_file, movies_file)
+    users_ids = sorted({user_id for user_id, movie_id in interactions})
+
+    random = np.random.RandomState(1)
+    for step in range(300):
+        user_id = users_ids[random.randint(len(users_ids))] if step % 10 else str(2000 + step)
+        movie_id = int(random.randint(1, 31))
+        if random.rand() < 0.5:
+            # New ratings, with ratings below 3.0 that remove the interaction
+            rating_value = float(random.choice([1.0, 2.5, 3.0, 4.0, 5.0]))
+            miner.handle_interaction(int(user_id), movie_id, "RATED", rating_value, True)
+            if rating_value >= 3.0:
+                interactions.add((user_id, movie_id))
+            else:
+                interactions.discard((user_id, movie_id))
+        else:
+            miner.handle_interaction(int(user_id), movie_id, "RATED", None, False)
+            interactions.discard((user_id, movie_id))
+        # WATCHED relationships aren't interactions of explicit data
+        miner.handle_interaction(int(user_id), int(random.randint(1, 31)), "WATCHED", None, True)
+
+    users, movies = zip(*sorted(interactions))
+    full_miner = IncrementalMiner(is_implicit=False, **PARAMS)
+    full_miner.load_interactions(np.array(users), np.array(movies))
+
+    assert miner.no_transactions == len(set(users))
+    assert miner.itemsets_counts == full_miner.itemsets_counts
+    pd.testing.assert_frame_equal(sort_rules(miner.get_rules()), sort_rules(full_miner.get_rules()))
+
+    one_hot_trans = pd.crosstab(pd.Series(users), pd.Series(movies)).astype(bool)
+    frequent_itemsets = fpgrowth(one_hot_trans, min_support=PARAMS['min_support'], use_colnames=True)
+    expected = {itemset: round(support * len(one_hot_trans)) for itemset, support in
+                zip(frequent_itemsets['itemsets'], frequent_itemsets['support'])}
+    assert miner.itemsets_counts == expected
@@ -0,0 +1,19 @@
+from RatingsReader import read_ratings_codes, read_ratings_arrays, read_transactions
+
+
+def test_users_ids_are_strings_in_order_of_appearance(tmp_path):
+    filename = str(tmp_path / "ratings.csv")
+    with open(filename, 'w', encoding='utf-8') as fp:
+        fp.write("userId,movieTitle,rating\nu10,B (2001),4.0\nu10,A (2000),2.0\n007,A (2000),5.0\n7,C (2002),1.0\n")
+    fp.close()
+
+    ratings = read_ratings_arrays(filename, chunksize=2)
+    assert ratings['users_ids'].tolist() == ['u10', '007', '7']
+    assert ratings['users'].tolist() == [0, 0, 1, 2]
+    assert ratings['titles'].tolist() == ['A (2000)', 'B (2001)', 'C (2002)']
+
+    users_ids, movies_ids, movies_titles = read_ratings_codes(filename, is_implicit=False, use_cache=False)
+    assert users_ids.tolist() == [0, 1]
+    assert [movies_titles[movie_id] for movie_id in movies_ids] == ['B (2001)', 'A (2000)']
+    assert read_transactions(filename, is_implicit=True, use_cache=False) == (
+        [['B (2001)', 'A (2000)'], ['A (2000)'], ['C (2002)']], 3)
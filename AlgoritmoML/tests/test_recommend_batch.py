@@ -0,0 +1,40 @@
+from itertools import combinations
+
+from FPGrowthAlgo import get_rule_index, recommend_batch, recommend_to_user
+
+from conftest import get_movies_titles
+
+PARAMS = {'min_support': 0.1, 'rule_metric': "confidence", 'min_rule_metric_value': 0.3, 'min_kulc_value': 0.4,
+          'min_imbalance_ratio_value': 0.3, 'top_n': 4}
+
+
+def get_users_list_movies():
+    titles = get_movies_titles()
+    users_list_movies = [[title] for title in titles] + [list(pair) for pair in combinations(titles[:12], 2)]
+    # Users without movies, with movies that don't exist and with repeated movies
+    users_list_movies += [[], ["Missing (1999)"], [titles[0], "Missing (1999)"], [titles[3], titles[3], titles[7]]]
+
+    return users_list_movies
+
+
+def test_recommend_batch_matches_recommend_to_user(ratings_file, movies_file):
+    users_list_movies = get_users_list_movies()
+    for is_implicit in [True, False]:
+        expected = [recommend_to_user(list_user_movies, is_implicit, ratings_file, movies_file, **PARAMS) for
+                    list_user_movies in users_list_movies]
+
+        assert recommend_batch(users_list_movies, is_implicit, ratings_file, movies_file, **PARAMS) == expected
+
+
+def test_recommend_batch_full_match_matches_rule_index(ratings_file, movies_file):
+    users_list_movies = get_users_list_movies()[:-3]
+    rule_index = get_rule_index(ratings_file, True, PARAMS['min_support'], PARAMS['rule_metric'],
+                                PARAMS['min_rule_metric_value'])
+    users_top_n_items = recommend_batch(users_list_movies, True, ratings_file, movies_file, full_match=True, **PARAMS)
+
+    for list_user_movies, top_n_items in zip(users_list_movies, users_top_n_items):
+        expected = rule_index.recommend(list_user_movies, PARAMS['min_kulc_value'],
+                                        PARAMS['min_imbalance_ratio_value'], PARAMS['top_n'], full_match=True)
+        if len(expected) == 0:
+            expected = rule_index.get_popular_items(PARAMS['top_n'], list_user_movies)
+        assert top_n_items == expected
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from FPGrowthAlgo import calculate_rules_kulc_imbalance, mine_association_rules
+from RuleIndex import RuleIndex, iter_descending_order, select_top_n_items
+
+
+def recommend_loop(rules, list_user_movies, min_kulc_value, min_imbalance_ratio_value, top_n):
+    """
+    Method that recommends items by looping over all rules, the way recommend_to_user did before the RuleIndex (with a
+    stable sort by confidence)
+    """
+    user_rules = []
+    for ruleInfo in rules.itertuples(index=False):
+        antecedents = list(ruleInfo.antecedents)
+        count_ante = sum(1 for user_movie in list_user_movies if user_movie in antecedents)
+        if 1 <= count_ante and ruleInfo.kulczynski >= min_kulc_value and ruleInfo._8 <= min_imbalance_ratio_value:
+            user_rules.append(ruleInfo)
+    user_rules.sort(key=lambda ruleInfo: -ruleInfo.confidence)
+
+    top_n_items = []
+    for ruleInfo in user_rules:
+        for consequent in ruleInfo.consequents:
+            if consequent not in top_n_items and consequent not in list_user_movies and len(top_n_items) < top_n:
+                top_n_items.append(consequent)
+
+    return top_n_items
+
+
+@pytest.fixture
+def rules(ratings_file):
+    association_rules, no_transactions = mine_association_rules(ratings_file, True, 0.1, "confidence", 0.3,
+                                                                engine="mlxtend", use_store=False)
+
+    return calculate_rules_kulc_imbalance(association_rules, no_transactions)
+
+
+def test_iter_descending_order_is_a_stable_sort():
+    values = np.random.RandomState(1).randint(0, 20, size=500) / 4.0
+    expected = np.lexsort((np.arange(len(values)), -values)).tolist()
+
+    assert list(iter_descending_order(values, first_block_size=8)) == expected
+    assert list(iter_descending_order(values[:0])) == []
+
+
+def test_select_top_n_items():
+    items_lists = [["a", "b"], ["b", "c"], ["d"], ["e"]]
+
+    assert select_top_n_items(items_lists, {"a"}, 3) == ["b", "c", "d"]
+    assert select_top_n_items(items_lists, set(), 10) == ["a", "b", "c", "d", "e"]
+    assert select_top_n_items(items_lists, set(), 0) == []
+
+
+def test_recommend_matches_rules_loop(rules):
+    rule_index = RuleIndex(rules)
+    users = [[title] for title in rule_index.items_ids] + [list(antecedents) + ["Missing (1999)"] for antecedents in
+                                                          rules['antecedents']]
+    assert len(rule_index) == len(rules) > 0
+
+    for list_user_movies in users:
+        for min_kulc_value, min_imbalance_ratio_value in [(0.0, 1.0), (0.4, 0.3)]:
+            assert rule_index.recommend(list_user_movies, min_kulc_value, min_imbalance_ratio_value, 5) == \
+                   recommend_loop(rules, list_user_movies, min_kulc_value, min_imbalance_ratio_value, 5)
+
+
+def test_full_match_only_applies_rules_contained_in_user_items(rules):
+    rule_index = RuleIndex(rules)
+    list_user_movies = list(rule_index.antecedents[0])
+
+    for rule_id in rule_index.get_user_rules(list_user_movies, full_match=True):
+        assert set(rule_index.antecedents[rule_id]) <= set(list_user_movies)
+    assert 0 in rule_index.get_user_rules(list_user_movies, full_match=True)
@@ -0,0 +1,53 @@
+import os
+
+import DatasetCache
+from Benchmarks import same_rules
+from FPGrowthAlgo import mine_association_rules, mine_frequent_movies_itemsets
+from RulesStore import (clear_store, evict_artifacts, get_artifact_path, get_store_folder, load_itemsets, load_rules,
+                        save_artifact)
+
+
+def test_stored_rules_are_the_rules_mined(ratings_file):
+    rules, no_transactions = mine_association_rules(ratings_file, True, 0.1, "confidence", 0.3, use_store=False)
+    mine_association_rules(ratings_file, True, 0.1, "confidence", 0.3)
+
+    stored_rules, stored_no_transactions = load_rules(ratings_file, [True, 0.1, "native", "confidence", 0.3])
+    assert stored_no_transactions == no_transactions
+    assert stored_rules.equals(rules)
+    assert same_rules(mine_association_rules(ratings_file, True, 0.1, "confidence", 0.3)[0], stored_rules)
+    # The frequent itemsets are reused by the other rule metrics
+    assert load_itemsets(ratings_file, [True, 0.1, "native"]) is not None
+    assert load_rules(ratings_file, [True, 0.1, "native", "lift", 1.0]) is None
+
+
+def test_engines_have_their_own_artifacts(ratings_file):
+    mine_frequent_movies_itemsets(ratings_file, True, 0.1, engine="native")
+
+    assert load_itemsets(ratings_file, [True, 0.1, "mlxtend"]) is None
+    assert get_artifact_path(ratings_file, 'itemsets', [True, 0.1, "native"]) != get_artifact_path(
+        ratings_file, 'itemsets', [True, 0.1, "mlxtend"])
+
+
+def test_csv_file_is_hashed_once(ratings_file, monkeypatch):
+    hashed_files = []
+    get_file_hash = DatasetCache.get_file_hash
+    monkeypatch.setattr(DatasetCache, 'get_file_hash', lambda filename: hashed_files.append(filename) or
+                        get_file_hash(filename))
+    for i in range(3):
+        get_artifact_path(ratings_file, 'itemsets', [True, 0.1, "native"])
+    mine_association_rules(ratings_file, True, 0.1, "confidence", 0.3, engine="out_of_core")
+    mine_association_rules(ratings_file, True, 0.1, "confidence", 0.3)
+
+    assert hashed_files == [ratings_file]
+
+
+def test_least_recently_used_artifacts_are_evicted(ratings_file):
+    paths = [get_artifact_path(ratings_file, 'test', [i]) for i in range(3)]
+    for i, path in enumerate(paths):
+        save_artifact(path, {'values': list(range(100))})
+        os.utime(path, ns=(i * 10 ** 9, i * 10 ** 9))
+    size = os.path.getsize(paths[0])
+
+    assert evict_artifacts(get_store_folder(ratings_file), max_size=2 * size) == 1
+    assert [os.path.exists(path) for path in paths] == [False, True, True]
+    assert clear_store(ratings_file) == 2
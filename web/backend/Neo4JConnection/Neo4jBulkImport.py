@@ -0,0 +1,294 @@
+import ast
+import csv
+import os
+
+# Headers of the csv files of the offline import (neo4j-admin database import format: the ids of each label are in
+# their own id space, so the relationships files reference the nodes by the ids of the cleaned datasets)
+IMPORT_HEADERS = {
+    "genres.csv": ["genreId:ID(Genre)", "genre", ":LABEL"],
+    "movies.csv": ["movieId:ID(Movie)", "title", "imdbId:int", "tmdbId:int", "released_date", "year", "poster",
+                   "overview", ":LABEL"],
+    "users.csv": ["userId:ID(User)", ":LABEL"],
+    "in_genre.csv": [":START_ID(Movie)", ":END_ID(Genre)", ":TYPE"],
+    "watched.csv": [":START_ID(User)", ":END_ID(Movie)", ":TYPE"],
+    "rated.csv": [":START_ID(User)", ":END_ID(Movie)", "rating:float", ":TYPE"],
+    "recommends.csv": [":START_ID(Movie)", ":END_ID(Movie)", "confidence:float", ":TYPE"],
+}
+NODES_FILES = ["genres.csv", "movies.csv", "users.csv"]
+RELATIONSHIPS_FILES = ["in_genre.csv", "watched.csv", "rated.csv", "recommends.csv"]
+
+
+def read_recommends_confidences(rules_filename):
+    """
+    Method that reads a csv file containing association rules and collapses them into the pairs of movies
+    (antecedent, consequent) of all rules, keeping the max confidence of the rules of each pair
+    :param rules_filename: csv file path where the association rules are located (this file must be in csv format and
+                           must contain the following columns: id, antecedents, consequents, antecedent_support,
+                           consequent_support, support, confidence, kulczynski, imbalance_ratio)
+    :type rules_filename: string
+    :return: dictionary with the following format: { ("Antecedent title", "Consequent title"): confidence }
+    """
+    confidences = {}
+    with open(rules_filename, encoding='utf-8') as fp:
+        reader = csv.reader(fp)
+        next(reader, None)  # skip the headers
+        ID, ANTECEDENTS, CONSEQUENTS, ANTECEDENTSUPPORT, CONSEQUENTSUPPORT, SUPPORT, CONFIDENCE, KULC, IBRATIO = \
+            0, 1, 2, 3, 4, 5, 6, 7, 8
+        for line in reader:
+            confidence = float(line[CONFIDENCE])
+            for antecedent in ast.literal_eval(line[ANTECEDENTS]):
+                for consequent in ast.literal_eval(line[CONSEQUENTS]):
+                    if confidence > confidences.get((antecedent, consequent), -1.0):
+                        confidences[(antecedent, consequent)] = confidence
+    fp.close()
+
+    return confidences
+
+
+def write_movies_files(movies_filename, output_folder):
+    """
+    Method that writes the nodes files of the genres and of the movies and the relationships file
+    movie-[:IN_GENRE]->genre. Only the movies with title, tmdbId, released_date and overview are written (as in the
+    query query_create_nodes_movies) and the genres ids are given by the order in which they first appear (as in
+    write_movie_genres_files)
+    :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
+                            the following columns: movieId, title, genres, imdbId, tmdbId, released_date, year, poster,
+                            overview)
+    :type movies_filename: string
+    :param output_folder: path of the folder where the import files are written
+    :type output_folder: string
+    :return: tuple (number of rows of each file, with the following format: { "file.csv": rows },
+    ids of the movies written, with the following format: { "Movie title": movieId })
+    """
+    genres_ids = {}
+    movies_ids = {}
+    written_ids = set()
+    no_in_genre = 0
+    with open(movies_filename, encoding='utf-8') as fp, \
+            open(os.path.join(output_folder, "movies.csv"), 'w', newline='', encoding='utf-8') as movies_fp, \
+            open(os.path.join(output_folder, "in_genre.csv"), 'w', newline='', encoding='utf-8') as in_genre_fp:
+        reader = csv.reader(fp)
+        next(reader, None)  # skip the headers
+        movies_write = csv.writer(movies_fp)
+        movies_write.writerow(IMPORT_HEADERS["movies.csv"])
+        in_genre_write = csv.writer(in_genre_fp)
+        in_genre_write.writerow(IMPORT_HEADERS["in_genre.csv"])
+        MOVIEID, TITLE, GENRES, IMDBID, TMDBID, RELEASEDDATE, YEAR, POSTER, OVERVIEW = 0, 1, 2, 3, 4, 5, 6, 7, 8
+        for line in reader:
+            for genre in line[GENRES].split('|'):
+                genres_ids.setdefault(genre, len(genres_ids) + 1)
+            if line[TITLE] == "" or line[TMDBID] == "" or line[RELEASEDDATE] == "" or line[OVERVIEW] == "":
+                continue
+            if line[MOVIEID] in written_ids:
+                continue
+
+            movies_write.writerow([line[MOVIEID], line[TITLE], line[IMDBID], line[TMDBID], line[RELEASEDDATE],
+                                   line[YEAR], line[POSTER], line[OVERVIEW], "Movie"])
+            movies_ids.setdefault(line[TITLE], line[MOVIEID])
+            written_ids.add(line[MOVIEID])
+            for genre in line[GENRES].split('|'):
+                in_genre_write.writerow([line[MOVIEID], genres_ids[genre], "IN_GENRE"])
+                no_in_genre += 1
+    fp.close()
+
+    with open(os.path.join(output_folder, "genres.csv"), 'w', newline='', encoding='utf-8') as genres_fp:
+        write = csv.writer(genres_fp)
+        write.writerow(IMPORT_HEADERS["genres.csv"])
+        for genre, genre_id in genres_ids.items():
+            write.writerow([genre_id, genre, "Genre"])
+    genres_fp.close()
+
+    return {"genres.csv": len(genres_ids), "movies.csv": len(written_ids), "in_genre.csv": no_in_genre}, movies_ids
+
+
+def write_users_files(user_ratings_filename, movies_ids, output_folder):
+    """
+    Method that writes the nodes file of the users and the relationships files user-[:WATCHED]->movie and
+    user-[:RATED {rating}]->movie, reading the ratings line by line (the ratings of each user must be in consecutive
+    lines, so that only the movies of the current user are kept to remove the repeated relationships, as the MERGE of
+    create_users_movies_relationships). The ratings of movies that weren't written are skipped
+    :param user_ratings_filename: path where the csv file is located (this file must be in csv format and must contain
+                            the following columns: userId, movieTitle, rating)
+    :type user_ratings_filename: string
+    :param movies_ids: ids of the movies written, with the following format: { "Movie title": movieId }
+    :type movies_ids: dictionary
+    :param output_folder: path of the folder where the import files are written
+    :type output_folder: string
+    :return: number of rows of each file, with the following format: { "file.csv": rows }
+    """
+    users = set()
+    counts = {"users.csv": 0, "watched.csv": 0, "rated.csv": 0}
+    current_user = None
+    # Movies watched and (movie, rating) pairs rated by the current user
+    watched = set()
+    rated = set()
+    with open(user_ratings_filename, encoding='utf-8') as fp, \
+            open(os.path.join(output_folder, "users.csv"), 'w', newline='', encoding='utf-8') as users_fp, \
+            open(os.path.join(output_folder, "watched.csv"), 'w', newline='', encoding='utf-8') as watched_fp, \
+            open(os.path.join(output_folder, "rated.csv"), 'w', newline='', encoding='utf-8') as rated_fp:
+        reader = csv.reader(fp)
+        next(reader, None)  # skip the headers
+        writers = {"users.csv": csv.writer(users_fp), "watched.csv": csv.writer(watched_fp),
+                   "rated.csv": csv.writer(rated_fp)}
+        for name, write in writers.items():
+            write.writerow(IMPORT_HEADERS[name])
+        USERID, MOVIETITLE, RATING = 0, 1, 2
+        for line in reader:
+            user_id = int(line[USERID])
+            if user_id != current_user:
+                if user_id in users:
+                    raise ValueError(
+                        "The ratings of each user must be in consecutive lines of '{}'".format(user_ratings_filename))
+                users.add(user_id)
+                writers["users.csv"].writerow([user_id, "User"])
+                counts["users.csv"] += 1
+                current_user = user_id
+                watched = set()
+                rated = set()
+
+            movie_id = movies_ids.get(line[MOVIETITLE])
+            if movie_id is None:
+                continue
+            rating = float(line[RATING])
+            if movie_id not in watched:
+                watched.add(movie_id)
+                writers["watched.csv"].writerow([user_id, movie_id, "WATCHED"])
+                counts["watched.csv"] += 1
+            if (movie_id, rating) not in rated:
+                rated.add((movie_id, rating))
+                writers["rated.csv"].writerow([user_id, movie_id, rating, "RATED"])
+                counts["rated.csv"] += 1
+    fp.close()
+
+    return counts
+
+
+def write_recommends_file(rules_filename, movies_ids, output_folder):
+    """
+    Method that writes the relationships file movieA-[:RECOMMENDS {confidence}]->movieB, with one relationship for each
+    pair of movies of the rules (with the max confidence of its rules). The pairs of movies that weren't written are
+    skipped
+    :param rules_filename: csv file path where the association rules are located (this file must be in csv format and
+                           must contain the following columns: id, antecedents, consequents, antecedent_support,
+                           consequent_support, support, confidence, kulczynski, imbalance_ratio)
+    :type rules_filename: string
+    :param movies_ids: ids of the movies written, with the following format: { "Movie title": movieId }
+    :type movies_ids: dictionary
+    :param output_folder: path of the folder where the import files are written
+    :type output_folder: string
+    :return: number of rows of the file, with the following format: { "recommends.csv": rows }
+    """
+    no_rows = 0
+    with open(os.path.join(output_folder, "recommends.csv"), 'w', newline='', encoding='utf-8') as new_fp:
+        write = csv.writer(new_fp)
+        write.writerow(IMPORT_HEADERS["recommends.csv"])
+        for (antecedent, consequent), confidence in read_recommends_confidences(rules_filename).items():
+            if antecedent in movies_ids and consequent in movies_ids:
+                write.writerow([movies_ids[antecedent], movies_ids[consequent], confidence, "RECOMMENDS"])
+                no_rows += 1
+    new_fp.close()
+
+    return {"recommends.csv": no_rows}
+
+
+def write_import_files(movies_filename, user_ratings_filename, rules_filename, output_folder):
+    """
+    Method that writes, from the cleaned datasets and the association rules, the nodes and relationships csv files of
+    an offline import of the whole database (neo4j-admin database import), which replaces the LOAD CSV queries and the
+    loaders of Neo4jCreationDB when the database is built from scratch
+    :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
+                            the following columns: movieId, title, genres, imdbId, tmdbId, released_date, year, poster,
+                            overview)
+    :type movies_filename: string
+    :param user_ratings_filename: path where the csv file is located (this file must be in csv format and must contain
+                            the following columns: userId, movieTitle, rating)
+    :type user_ratings_filename: string
+    :param rules_filename: csv file path where the association rules are located (this file must be in csv format and
+                           must contain the following columns: id, antecedents, consequents, antecedent_support,
+                           consequent_support, support, confidence, kulczynski, imbalance_ratio)
+    :type rules_filename: string
+    :param output_folder: path of the folder where the import files are written
+    :type output_folder: string
+    :return: number of rows of each file, with the following format: { "file.csv": rows }
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    counts, movies_ids = write_movies_files(movies_filename, output_folder)
+    counts.update(write_users_files(user_ratings_filename, movies_ids, output_folder))
+    counts.update(write_recommends_file(rules_filename, movies_ids, output_folder))
+    for name in NODES_FILES + RELATIONSHIPS_FILES:
+        print(name + ": " + str(counts[name]) + " linhas")
+
+    return counts
+
+
+def get_import_command(output_folder, database="neo4j"):
+    """
+    Method that returns the neo4j-admin command that imports the files written by write_import_files (the database
+    must be stopped and empty, or the option --overwrite-destination must be added)
+    :param output_folder: path of the folder where the import files are located
+    :type output_folder: string
+    :param database: name of the database
+    :type database: string
+    :return: neo4j-admin command
+    """
+    nodes = " ".join("--nodes=" + os.path.join(output_folder, name) for name in NODES_FILES)
+    relationships = " ".join("--relationships=" + os.path.join(output_folder, name) for name in RELATIONSHIPS_FILES)
+
+    return "neo4j-admin database import full " + database + " --id-type=integer --multiline-fields=true " + nodes + \
+           " " + relationships
+
+
+def validate_import_files(output_folder, counts=None):
+    """
+    Method that validates the files written by write_import_files: the headers of each file, the number of columns of
+    each row, the number of rows (if counts is given) and if the relationships only reference ids of nodes that exist
+    :param output_folder: path of the folder where the import files are located
+    :type output_folder: string
+    :param counts: expected number of rows of each file, with the following format: { "file.csv": rows }
+    :type counts: dictionary
+    :return: list of errors found (empty if the files are valid)
+    """
+    errors = []
+    # nodes_ids = { "Label": set of ids }
+    nodes_ids = {}
+    for name in NODES_FILES + RELATIONSHIPS_FILES:
+        path = os.path.join(output_folder, name)
+        if not os.path.isfile(path):
+            errors.append(name + ": ficheiro inexistente")
+            continue
+
+        with open(path, encoding='utf-8') as fp:
+            reader = csv.reader(fp)
+            header = next(reader, None)
+            if header != IMPORT_HEADERS[name]:
+                errors.append(name + ": cabeçalho inválido " + str(header))
+                continue
+            # Id space of the nodes ids or of the start and end ids of the relationships
+            ids_spaces = [(position, column[column.index('(') + 1:-1]) for position, column in enumerate(header) if
+                          ':ID(' in column or ':START_ID(' in column or ':END_ID(' in column]
+            no_rows = 0
+            for line in reader:
+                no_rows += 1
+                if len(line) != len(header):
+                    errors.append(name + ": linha " + str(no_rows) + " com " + str(len(line)) + " colunas")
+                    continue
+                for position, id_space in ids_spaces:
+                    if name in NODES_FILES:
+                        if line[position] in nodes_ids.setdefault(id_space, set()):
+                            errors.append(name + ": linha " + str(no_rows) + " com o id repetido " + line[position])
+                        nodes_ids[id_space].add(line[position])
+                    elif line[position] not in nodes_ids.get(id_space, set()):
+                        errors.append(name + ": linha " + str(no_rows) + " referencia o nó inexistente " + id_space +
+                                      " " + line[position])
+        fp.close()
+
+        if counts is not None and counts.get(name) != no_rows:
+            errors.append(name + ": " + str(no_rows) + " linhas (esperadas " + str(counts.get(name)) + ")")
+
+    return errors
+
+# importCounts = write_import_files('../datasets/movies.csv', '../datasets/userRatings5k.csv',
+#                                   '../rulesCsv/rules5kUsersImp.csv', '../import')
+# print(validate_import_files('../import', importCounts))
+# print(get_import_command('../import'))
+# After the import the indexes are created by ensure_schema(driver) (Neo4jSchema, with the driver of Neo4jCreationDB)
@@ -1,8 +1,11 @@
-import ast
 import csv
+import time
 
 from neo4j import GraphDatabase, basic_auth
 
+from Neo4jBulkImport import read_recommends_confidences
+from Neo4jSchema import ensure_schema
+
 # from CleanAndTransformData import *
 
 database_username = "YOUR_DATABASE_USERNAME"
@@ -33,17 +36,98 @@ def write_association_rules_to_neo4j(query):
     driver.close()
 
 
-query_create_genre_index = """
-CREATE CONSTRAINT ON (g:Genre) ASSERT g.genreId IS UNIQUE;
-"""
+# Number of rows written by each transaction of the batched loaders (each batch is sent as a list parameter of a single
+# UNWIND query)
+BATCH_SIZE = 5000
+# Number of batches written between two progress messages of the batched loaders
+PROGRESS_BATCHES = 20
 
-query_create_movie_index = """
-CREATE CONSTRAINT ON (m:Movie) ASSERT m.movieId IS UNIQUE;
-"""
 
-query_create_user_index = """
-CREATE CONSTRAINT ON (u:User) ASSERT u.userId IS UNIQUE;
-"""
+def iter_batches(rows, batch_size=BATCH_SIZE):
+    """
+    Method that groups the rows of an iterator into lists of batch_size rows, without reading all rows at once
+    :param rows: rows (e.g. read from a csv file)
+    :type rows: iterator
+    :param batch_size: number of rows of each list
+    :type batch_size: integer
+    :return: iterator of lists of rows
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if len(batch) > 0:
+        yield batch
+
+
+def print_throughput(description, no_rows, elapsed):
+    """
+    Method that prints the number of rows written and the throughput (rows per second) of a batched loader
+    :param description: description of the rows
+    :type description: string
+    :param no_rows: number of rows written
+    :type no_rows: integer
+    :param elapsed: seconds spent writing the rows
+    :type elapsed: float
+    """
+    print(description + ": " + str(no_rows) + " linhas em " + str(round(elapsed, 2)) + "s (" + str(
+        round(no_rows / elapsed if elapsed > 0 else 0.0, 1)) + " linhas/s)")
+
+
+def write_batches(query, rows, batch_size=BATCH_SIZE, description="Linhas"):
+    """
+    Method that writes rows to neo4j in batches: each batch is written by a single transaction, where the query
+    receives the rows of the batch as the parameter $rows (e.g. UNWIND $rows AS row ...), and prints the progress
+    (every PROGRESS_BATCHES batches) and the throughput. The rows are only written after the indexes of the database are
+    created (if they don't exist yet) and online (ensure_schema of Neo4jSchema), since the queries of the batches match
+    the nodes by their ids and names
+    :param query: query that writes a batch of rows
+    :type query: string
+    :param rows: rows to be written (dictionaries with the parameters of each row)
+    :type rows: iterator
+    :param batch_size: number of rows written by each transaction
+    :type batch_size: integer
+    :param description: description of the rows (printed with the throughput)
+    :type description: string
+    :return: number of rows written
+    """
+    ensure_schema(driver)
+    start = time.perf_counter()
+    no_rows = 0
+    with driver.session(database="neo4j") as session:
+        for no_batches, batch in enumerate(iter_batches(rows, batch_size), start=1):
+            session.write_transaction(lambda tx: tx.run(query, rows=batch).consume())
+            no_rows += len(batch)
+            if no_batches % PROGRESS_BATCHES == 0:
+                print_throughput(description + " (em curso)", no_rows, time.perf_counter() - start)
+    print_throughput(description, no_rows, time.perf_counter() - start)
+
+    return no_rows
+
+
+def get_movies_ids():
+    """
+    Method that returns the ids of all movies stored in Neo4j, read by a single query. A repeated title keeps the
+    smallest movieId, which is its first movie in movies.csv (ordered by movieId), as in MovieCatalog and in the files
+    of Neo4jBulkImport
+    :return: dictionary with the following format: { "Movie title": movieId }
+    """
+    query = """
+    MATCH (m:Movie)
+    RETURN m.title AS title, m.movieId AS movieId
+    ORDER BY m.movieId
+    """
+    with driver.session(database="neo4j") as session:
+        records = session.read_transaction(lambda tx: tx.run(query).data())
+
+    movies_ids = {}
+    for record in records:
+        movies_ids.setdefault(record["title"], record["movieId"])
+
+    return movies_ids
+
 
 query_create_nodes_genres = """
   LOAD CSV WITH HEADERS FROM 'file:///Path_to_movies_genres.csv' AS row
@@ -83,129 +167,149 @@ LOAD CSV WITH HEADERS FROM 'file:///Path_to_new_movies_data.csv' AS row
 """
 
 
-def create_movies_genres_relationships(movies_filename):
+def read_movies_genres_rows(movies_filename):
     """
-    Method that will write in Neo4j all the relationships between movies and genres (movie-[:IN_GENRE]->genre)
+    Method that reads, line by line, the genres of each movie of a csv file
     :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
                             the following columns: movieId, title, genres, imdbId, tmdbId, released_date, year, poster)
     :type movies_filename: string
+    :return: iterator of dictionaries with the following format: { "movieId": ..., "title": ..., "genre": ... }
+    """
+    with open(movies_filename, encoding='utf-8') as fp:
+        reader = csv.reader(fp)
+        next(reader, None)  # skip the headers
+        MOVIEID, TITLE, GENRES, IMDBID, TMDBID, RELEASEDDATE, YEAR, POSTER = 0, 1, 2, 3, 4, 5, 6, 7
+        for line in reader:
+            for genre in line[GENRES].split('|'):
+                yield {"movieId": int(line[MOVIEID]), "title": line[TITLE], "genre": genre}
+    fp.close()
+
+
+def create_movies_genres_relationships(movies_filename, batch_size=BATCH_SIZE):
+    """
+    Method that will write in Neo4j all the relationships between movies and genres (movie-[:IN_GENRE]->genre), in
+    batches of rows (one transaction for each batch)
+    :param movies_filename: path where the csv file is located (this file must be in csv format and must contain
+                            the following columns: movieId, title, genres, imdbId, tmdbId, released_date, year, poster)
+    :type movies_filename: string
+    :param batch_size: number of (movie, genre) pairs written by each transaction
+    :type batch_size: integer
+    :return: number of (movie, genre) pairs written
     """
     query = """
-    MATCH (m:Movie {movieId: $movieId, title: $movieName})
-    MATCH (g:Genre {genre: $genreName})
+    UNWIND $rows AS row
+    MATCH (m:Movie {movieId: row.movieId, title: row.title})
+    MATCH (g:Genre {genre: row.genre})
     MERGE (m)-[:IN_GENRE]->(g)
     """
-    with driver.session(database="neo4j") as session:
-        with open(movies_filename, encoding='utf-8') as fp:
-            reader = csv.reader(fp)
-            next(reader, None)  # skip the headers
-            MOVIEID, TITLE, GENRES, IMDBID, TMDBID, RELEASEDDATE, YEAR, POSTER = 0, 1, 2, 3, 4, 5, 6, 7
-            for line in reader:
-                genres = line[GENRES].split('|')
-                for genre in genres:
-                    session.write_transaction(
-                        lambda tx: tx.run(query,
-                                          {"movieId": int(line[MOVIEID]), "movieName": line[TITLE],
-                                           "genreName": genre}))
-        driver.close()
-
-
-def create_users_movies_relationships(user_ratings_filename):
-    """
-    Method that will write in Neo4j all the relationships between movies and genres (user-[:WATCHED]->movie)
-    (user-[:RATED {rating}]->movie)
+    no_rows = write_batches(query, read_movies_genres_rows(movies_filename), batch_size, "IN_GENRE")
+    driver.close()
+
+    return no_rows
+
+
+def read_users_movies_rows(user_ratings_filename, movies_ids, missing_titles):
+    """
+    Method that reads, line by line, the ratings of a csv file, replacing the movies titles by their ids
+    :param user_ratings_filename: path where the csv file is located (this file must be in csv format and must contain
+                            the following columns: userId, movieTitle, rating)
+    :type user_ratings_filename: string
+    :param movies_ids: ids of the movies, with the following format: { "Movie title": movieId }
+    :type movies_ids: dictionary
+    :param missing_titles: set where the titles that don't exist in movies_ids are added (their ratings are skipped)
+    :type missing_titles: set
+    :return: iterator of dictionaries with the following format: { "userId": ..., "movieId": ..., "rating": ... }
+    """
+    with open(user_ratings_filename, encoding='utf-8') as fp:
+        reader = csv.reader(fp)
+        next(reader, None)  # skip the headers
+        USERID, MOVIETITLE, RATING = 0, 1, 2
+        for line in reader:
+            movie_id = movies_ids.get(line[MOVIETITLE])
+            if movie_id is None:
+                missing_titles.add(line[MOVIETITLE])
+                continue
+            yield {"userId": int(line[USERID]), "movieId": movie_id, "rating": float(line[RATING])}
+    fp.close()
+
+
+def create_users_movies_relationships(user_ratings_filename, batch_size=BATCH_SIZE):
+    """
+    Method that will write in Neo4j all the relationships between users and movies (user-[:WATCHED]->movie)
+    (user-[:RATED {rating}]->movie), in batches of ratings (one transaction for each batch). The movies titles are
+    replaced by their ids before writing, so that the movies are matched by the constrained movieId
     :param user_ratings_filename: path where the csv file is located (this file must be in csv format and must contain
                             the following columns: userId, movieTitle, rating)
     :type user_ratings_filename: string
+    :param batch_size: number of ratings written by each transaction
+    :type batch_size: integer
+    :return: number of ratings written
     """
     query = """
-    MATCH (u:User {userId: $userId})
-    MATCH (m:Movie {title: $movieName})
+    UNWIND $rows AS row
+    MATCH (u:User {userId: row.userId})
+    MATCH (m:Movie {movieId: row.movieId})
     MERGE (u)-[:WATCHED]->(m)
-    MERGE (u)-[:RATED {rating: $ratingValue}]->(m)
+    MERGE (u)-[r:RATED]->(m)
+    SET r.rating = row.rating
     """
-    with driver.session(database="neo4j") as session:
-        with open(user_ratings_filename, encoding='utf-8') as fp:
-            reader = csv.reader(fp)
-            next(reader, None)  # skip the headers
-            USERID, MOVIETITLE, RATING = 0, 1, 2
-            for line in reader:
-                session.write_transaction(
-                    lambda tx: tx.run(query,
-                                      {"userId": int(line[USERID]), "movieName": line[MOVIETITLE],
-                                       "ratingValue": float(line[RATING])}))
-        driver.close()
-
-
-def create_movie_recommends_movie_relationships(rules_filename):
-    """
-    Method that will write in Neo4j all the relationships between movies (movieA-[:RECOMMENDS]->movieB)
-    Method that reads from a csv file containing association rules and create relationships
-    :param rules_filename: csv file path where all user ratings are is located (this file must be in csv format and must
-                           contain the following columns: id, antecedents, consequents, antecedent_support,
+    missing_titles = set()
+    no_rows = write_batches(query, read_users_movies_rows(user_ratings_filename, get_movies_ids(), missing_titles),
+                            batch_size, "WATCHED/RATED")
+    if len(missing_titles) > 0:
+        print("Filmes inexistentes na base de dados (avaliações ignoradas): " + str(len(missing_titles)))
+    driver.close()
+
+    return no_rows
+
+
+def create_movie_recommends_movie_relationships(rules_filename, batch_size=BATCH_SIZE):
+    """
+    Method that will write in Neo4j all the relationships between movies (movieA-[:RECOMMENDS {confidence}]->movieB)
+    Method that reads from a csv file containing association rules and creates (or updates) the relationships in
+    batches (one transaction for each batch). Each relationship keeps the max confidence of the rules of its pair of
+    movies, including the confidence it already had in Neo4j
+    :param rules_filename: csv file path where the association rules are located (this file must be in csv format and
+                           must contain the following columns: id, antecedents, consequents, antecedent_support,
                            consequent_support, support, confidence, kulczynski, imbalance_ratio)
     :type rules_filename: string
+    :param batch_size: number of relationships written by each transaction
+    :type batch_size: integer
+    :return: number of relationships written
     """
-    query_get_movie_relationship = """
-    MATCH (:Movie {movieId: $movieAntID})-[r:RECOMMENDS]->(:Movie {movieId: $movieConsID})
-    RETURN r.confidence
-    """
-    query_get_movie_id = """
-    MATCH (m:Movie {title: $movieTitle})
-    RETURN m.movieId
-    """
-    query_delete_rule_relationship = """
-    MATCH (:Movie {movieId: $movieAntID})-[r:RECOMMENDS]->(:Movie {movieId: $movieConsID})
-    DELETE r
-    """
-    query_connect_movies = """
-    MATCH (mA:Movie {movieId: $movieAntID})
-    MATCH (mB:Movie {movieId: $movieConsID})
-    MERGE (mA)-[:RECOMMENDS {confidence: $newConfidence}]->(mB)
+    query = """
+    UNWIND $rows AS row
+    MATCH (mA:Movie {movieId: row.antecedentId})
+    MATCH (mB:Movie {movieId: row.consequentId})
+    MERGE (mA)-[r:RECOMMENDS]->(mB)
+    SET r.confidence = CASE WHEN r.confidence IS NULL OR row.confidence > r.confidence THEN row.confidence
+                            ELSE r.confidence END
     """
-    with driver.session(database="neo4j") as session:
-        with open(rules_filename, encoding='utf-8') as fp:
-            reader = csv.reader(fp)
-            next(reader, None)  # skip the headers
-            ID, ANTECEDENTS, CONSEQUENTS, ANTECEDENTSUPPORT, CONSEQUENTSUPPORT, SUPPORT, CONFIDENCE, KULC, IBRATIO = 0, 1, 2, 3, 4, 5, 6, 7, 8
-            for line in reader:
-                rule_antecedent = ast.literal_eval(line[ANTECEDENTS])
-                rule_consequent = ast.literal_eval(line[CONSEQUENTS])
-                for antecedent in rule_antecedent:
-                    antecedent_id = session.read_transaction(lambda tx: tx.run(query_get_movie_id,
-                                                                               {"movieTitle": antecedent}).data()[0][
-                        'm.movieId'])
-                    for consequent in rule_consequent:
-                        consequent_id = session.read_transaction(lambda tx: tx.run(query_get_movie_id,
-                                                                                   {"movieTitle": consequent}).data()[
-                            0]['m.movieId'])
-
-                        relationship_exists = session.read_transaction(lambda tx: tx.run(query_get_movie_relationship,
-                                                                                         {"movieAntID": antecedent_id,
-                                                                                          "movieConsID": consequent_id}).data())
-
-                        if len(relationship_exists) != 0:
-                            # print(relationship_exists[0]['r.confidence'])
-                            if float(line[CONFIDENCE]) > relationship_exists[0]['r.confidence']:
-                                session.write_transaction(lambda tx: tx.run(query_delete_rule_relationship,
-                                                                            {"movieAntID": antecedent_id,
-                                                                             "movieConsID": consequent_id}))
-                                session.write_transaction(lambda tx: tx.run(query_connect_movies,
-                                                                            {"movieAntID": antecedent_id,
-                                                                             "movieConsID": consequent_id,
-                                                                             "newConfidence": float(line[CONFIDENCE])}))
-                        else:
-                            session.write_transaction(lambda tx: tx.run(query_connect_movies,
-                                                                        {"movieAntID": antecedent_id,
-                                                                         "movieConsID": consequent_id,
-                                                                         "newConfidence": float(line[CONFIDENCE])}))
+    movies_ids = get_movies_ids()
+    rows = []
+    missing_titles = set()
+    no_skipped_pairs = 0
+    for (antecedent, consequent), confidence in read_recommends_confidences(rules_filename).items():
+        if antecedent not in movies_ids or consequent not in movies_ids:
+            missing_titles.update(title for title in (antecedent, consequent) if title not in movies_ids)
+            no_skipped_pairs += 1
+            continue
+        rows.append({"antecedentId": movies_ids[antecedent], "consequentId": movies_ids[consequent],
+                     "confidence": confidence})
+
+    no_rows = write_batches(query, rows, batch_size, "RECOMMENDS")
+    if len(missing_titles) > 0:
+        print("Filmes inexistentes na base de dados (regras ignoradas): " + str(len(missing_titles)) + " filmes, " +
+              str(no_skipped_pairs) + " pares de filmes")
     driver.close()
 
-# CREATION OF INDEXES
+    return no_rows
+
+
+# CREATION OF INDEXES (the batched loaders of the relationships also create the missing indexes and wait until they
+# are online, but creating them before the nodes makes the MERGE of the nodes use them too)
 
-# write_to_neo4j(query_create_genre_index)
-# write_to_neo4j(query_create_movie_index)
-# write_to_neo4j(query_create_user_index)
+# ensure_schema(driver)
 
 # CREATION OF NODES (Dont forget to comment dbms.directories.import=import in database's settings!)
 
@@ -221,10 +325,10 @@ def create_movie_recommends_movie_relationships(rules_filename):
 # CREATION OF RELATIONSHIPS
 
 # Movie -[:IN_GENRE]-> Genre
-# create_movies_genres_relationships('../datasets/movies.csv')
+# create_movies_genres_relationships('../datasets/movies.csv', batch_size=5000)
 
 # User -[:WATCHED]-> Movie | User -[:RATED {rating}]-> Movie
-# create_users_movies_relationships('../datasets/userRatings5k.csv')
+# create_users_movies_relationships('../datasets/userRatings5k.csv', batch_size=10000)
 
 # MovieA -[:RECOMMENDS]-> MovieA
-# create_movie_recommends_movie_relationships('../rulesCsv/rules5kUsersImp.csv')
+# create_movie_recommends_movie_relationships('../rulesCsv/rules5kUsersImp.csv', batch_size=5000)
@@ -0,0 +1,125 @@
+import time
+
+# Schema of the database, with the following format: (name, label, property, kind, query that creates it). The
+# queries only create what doesn't exist yet (IF NOT EXISTS), so they can be run again safely. The indexes cover the
+# keys of the lookups of the loaders and of the api: Movie.title (create_users_movies_relationships, search_movies),
+# User.username (find_user) and Genre.genre (create_movies_genres_relationships, get_popular_movies_by_genre)
+SCHEMA_INDEXES = [
+    ("genre_id", "Genre", "genreId", "constraint",
+     "CREATE CONSTRAINT genre_id IF NOT EXISTS FOR (g:Genre) REQUIRE g.genreId IS UNIQUE"),
+    ("movie_id", "Movie", "movieId", "constraint",
+     "CREATE CONSTRAINT movie_id IF NOT EXISTS FOR (m:Movie) REQUIRE m.movieId IS UNIQUE"),
+    ("user_id", "User", "userId", "constraint",
+     "CREATE CONSTRAINT user_id IF NOT EXISTS FOR (u:User) REQUIRE u.userId IS UNIQUE"),
+    ("movie_title", "Movie", "title", "index",
+     "CREATE INDEX movie_title IF NOT EXISTS FOR (m:Movie) ON (m.title)"),
+    ("user_username", "User", "username", "index",
+     "CREATE INDEX user_username IF NOT EXISTS FOR (u:User) ON (u.username)"),
+    ("genre_genre", "Genre", "genre", "index",
+     "CREATE INDEX genre_genre IF NOT EXISTS FOR (g:Genre) ON (g.genre)"),
+    ("movie_title_fulltext", "Movie", "title", "fulltext",
+     "CREATE FULLTEXT INDEX movie_title_fulltext IF NOT EXISTS FOR (m:Movie) ON EACH [m.title]"),
+]
+# Maximum number of seconds waited for the indexes to be online
+SCHEMA_TIMEOUT = 300
+
+
+def create_schema(driver):
+    """
+    Method that creates the constraints and indexes of SCHEMA_INDEXES that don't exist yet (each one in its own
+    transaction, since schema changes can't be mixed with other writes)
+    :param driver: driver of the neo4j database (e.g. the driver of Neo4jCreationDB)
+    """
+    with driver.session(database="neo4j") as session:
+        for name, label, property_name, kind, query in SCHEMA_INDEXES:
+            session.write_transaction(lambda tx: tx.run(query).consume())
+
+
+def get_schema_states(driver):
+    """
+    Method that returns the state of the indexes of SCHEMA_INDEXES. An index is found by its label, property and kind
+    (and not by its name), so that equivalent indexes created before with other names (e.g. the constraints created by
+    older versions of Neo4jCreationDB) are also found. A constraint is found among the uniqueness constraints and its
+    state is the state of the index that backs it, while the other indexes can't be backing a constraint (so a
+    uniqueness constraint isn't taken for a range index of the same property, nor the other way round)
+    :param driver: driver of the neo4j database (e.g. the driver of Neo4jCreationDB)
+    :return: dictionary with the following format: { "index name": state ("ONLINE", "POPULATING", "FAILED") or None if
+    the index doesn't exist }
+    """
+    query_indexes = """
+    SHOW INDEXES YIELD name, state, type, labelsOrTypes, properties, owningConstraint
+    RETURN name, state, type, labelsOrTypes, properties, owningConstraint
+    """
+    query_constraints = """
+    SHOW CONSTRAINTS YIELD name, type, labelsOrTypes, properties
+    RETURN name, type, labelsOrTypes, properties
+    """
+    with driver.session(database="neo4j") as session:
+        indexes = session.read_transaction(lambda tx: tx.run(query_indexes).data())
+        constraints = session.read_transaction(lambda tx: tx.run(query_constraints).data())
+
+    # Uniqueness constraints ("UNIQUENESS" or "NODE_PROPERTY_UNIQUENESS", depending on the version of neo4j) by name
+    unique_constraints = {constraint["name"]: constraint for constraint in constraints if
+                          "UNIQUENESS" in constraint["type"]}
+    states = {}
+    for name, label, property_name, kind, query in SCHEMA_INDEXES:
+        states[name] = None
+        for index in indexes:
+            if index["labelsOrTypes"] != [label] or index["properties"] != [property_name]:
+                continue
+            if kind == "constraint":
+                is_match = index["owningConstraint"] in unique_constraints
+            else:
+                is_match = index["owningConstraint"] is None and (index["type"] == "FULLTEXT") == (kind == "fulltext")
+            if is_match:
+                states[name] = index["state"]
+                if index["state"] == "ONLINE":
+                    break
+
+    return states
+
+
+def wait_schema_online(driver, timeout=SCHEMA_TIMEOUT):
+    """
+    Method that waits until all indexes of SCHEMA_INDEXES are online
+    :param driver: driver of the neo4j database (e.g. the driver of Neo4jCreationDB)
+    :param timeout: maximum number of seconds waited
+    :type timeout: integer
+    :return: state of the indexes, with the following format: { "index name": "ONLINE" }
+    """
+    start = time.perf_counter()
+    while True:
+        states = get_schema_states(driver)
+        failed = [name for name, state in states.items() if state == "FAILED"]
+        if len(failed) > 0:
+            raise RuntimeError("The indexes {} failed to be populated".format(failed))
+        missing = [name for name, state in states.items() if state is None]
+        if len(missing) > 0:
+            raise RuntimeError("The indexes {} don't exist (run ensure_schema first)".format(missing))
+        not_online = [name for name, state in states.items() if state != "ONLINE"]
+        if len(not_online) == 0:
+            return states
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError("The indexes {} weren't online after {} seconds".format(not_online, timeout))
+        time.sleep(1)
+
+
+def ensure_schema(driver, timeout=SCHEMA_TIMEOUT):
+    """
+    Method that creates the constraints and indexes of the database that don't exist yet and waits until all of them
+    are online (it can be run again safely, before the nodes and relationships are loaded or at any time after). The
+    driver isn't closed, since it's the driver of the loaders
+    :param driver: driver of the neo4j database (e.g. the driver of Neo4jCreationDB)
+    :param timeout: maximum number of seconds waited for the indexes to be online
+    :type timeout: integer
+    :return: state of the indexes, with the following format: { "index name": "ONLINE" }
+    """
+    create_schema(driver)
+    states = wait_schema_online(driver, timeout)
+    print("Esquema criado: " + str(len(states)) + " índices online")
+
+    return states
+
+# from Neo4jCreationDB import driver
+# ensure_schema(driver)
+# print(get_schema_states(driver))
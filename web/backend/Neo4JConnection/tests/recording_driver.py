@@ -0,0 +1,103 @@
+from Neo4jSchema import SCHEMA_INDEXES
+
+
+class RecordingResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def data(self):
+        return self.rows
+
+    def consume(self):
+        return None
+
+
+class RecordingDriver:
+    """
+    Driver that records the queries written and answers the read queries (SHOW INDEXES, SHOW CONSTRAINTS and the
+    movies ids of get_movies_ids) with fixed rows, so the loaders can be run without a neo4j database
+    """
+
+    def __init__(self, indexes, constraints, movies=()):
+        self.indexes = indexes
+        self.constraints = constraints
+        self.movies = list(movies)
+        # queries = [(query, parameters), ...] (the queries written, in order)
+        self.queries = []
+        self.no_transactions = 0
+        self.no_closes = 0
+
+    @property
+    def batches(self):
+        """
+        Method that returns the rows sent by each query with the parameter $rows (one list for each transaction)
+        """
+        return [parameters["rows"] for query, parameters in self.queries if "rows" in parameters]
+
+    def session(self, database):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, query, **parameters):
+        if "SHOW INDEXES" in query:
+            return RecordingResult(self.indexes)
+        if "SHOW CONSTRAINTS" in query:
+            return RecordingResult(self.constraints)
+        for name, label, property_name, kind, schema_query in SCHEMA_INDEXES:
+            # The indexes created are online at once
+            if query == schema_query and name not in [index["name"] for index in self.indexes]:
+                index, constraint = get_schema_rows(name, label, property_name, kind)
+                self.indexes.append(index)
+                if constraint is not None:
+                    self.constraints.append(constraint)
+        if "MATCH (m:Movie)" in query and "RETURN" in query:
+            return RecordingResult([{"title": title, "movieId": movie_id} for title, movie_id in self.movies])
+        # The rows are copied, since the loaders may reuse their lists
+        self.queries.append((query, {name: list(value) if isinstance(value, list) else value for name, value in
+                                     parameters.items()}))
+        return RecordingResult([])
+
+    def read_transaction(self, work):
+        return work(self)
+
+    def write_transaction(self, work):
+        self.no_transactions += 1
+        return work(self)
+
+    def close(self):
+        self.no_closes += 1
+
+
+def get_schema_rows(name, label, property_name, kind):
+    """
+    Method that returns the rows of SHOW INDEXES and SHOW CONSTRAINTS (None if it isn't a constraint) of an online index
+    of SCHEMA_INDEXES
+    """
+    index = {"name": name, "state": "ONLINE", "type": "FULLTEXT" if kind == "fulltext" else "RANGE",
+             "labelsOrTypes": [label], "properties": [property_name],
+             "owningConstraint": name if kind == "constraint" else None}
+    if kind != "constraint":
+        return index, None
+
+    return index, {"name": name, "type": "UNIQUENESS", "labelsOrTypes": [label], "properties": [property_name]}
+
+
+def get_online_schema():
+    """
+    Method that returns the rows of SHOW INDEXES and SHOW CONSTRAINTS of a database with all indexes of SCHEMA_INDEXES
+    online
+    """
+    indexes = []
+    constraints = []
+    for name, label, property_name, kind, query in SCHEMA_INDEXES:
+        index, constraint = get_schema_rows(name, label, property_name, kind)
+        indexes.append(index)
+        if constraint is not None:
+            constraints.append(constraint)
+
+    return indexes, constraints
@@ -0,0 +1,92 @@
+import csv
+import os
+
+import pytest
+
+from Neo4jBulkImport import IMPORT_HEADERS, NODES_FILES, RELATIONSHIPS_FILES, validate_import_files, write_import_files
+
+MOVIES_ROWS = [
+    ["movieId", "title", "genres", "imdbId", "tmdbId", "released_date", "year", "poster", "overview"],
+    ["1", "Toy Story (1995)", "Animation|Comedy", "114709", "862", "1995-10-30", "1995", "/toy.jpg", "Toys."],
+    ["2", "Heat (1995)", "Action|Crime", "113277", "949", "1995-12-15", "1995", "/heat.jpg", "A heist, \"again\"."],
+    # Movie without overview (isn't written, but its genre is)
+    ["3", "No Overview (2000)", "Documentary", "1", "2", "2000-01-01", "2000", "", ""],
+    # Repeated movieId (only the first one is written)
+    ["2", "Heat (1995)", "Action|Crime", "113277", "949", "1995-12-15", "1995", "/heat.jpg", "A heist."],
+    ["4", "Matrix, The (1999)", "Action|Sci-Fi", "133093", "603", "1999-03-30", "1999", "/matrix.jpg",
+     "Multiline\noverview."],
+]
+RATINGS_ROWS = [
+    ["userId", "movieTitle", "rating"],
+    ["10", "Toy Story (1995)", "4.0"],
+    ["10", "Heat (1995)", "3.5"],
+    # Repeated rating and a second rating of the same movie (a single WATCHED and two RATED relationships)
+    ["10", "Heat (1995)", "3.5"],
+    ["10", "Heat (1995)", "2.0"],
+    ["20", "Matrix, The (1999)", "5.0"],
+    # Movie that isn't written
+    ["20", "No Overview (2000)", "1.0"],
+    ["30", "Unknown Movie (2010)", "3.0"],
+]
+RULES_ROWS = [
+    ["id", "antecedents", "consequents", "antecedent_support", "consequent_support", "support", "confidence",
+     "kulczynski", "imbalance_ratio"],
+    ["1", "['Toy Story (1995)', 'Heat (1995)']", "['Matrix, The (1999)']", "0.3", "0.4", "0.2", "0.66", "0.6", "0.1"],
+    # Pair of a rule with a greater confidence (only its max confidence is kept)
+    ["2", "['Toy Story (1995)']", "['Matrix, The (1999)']", "0.5", "0.4", "0.4", "0.8", "0.9", "0.2"],
+    # Pair with a movie that isn't written
+    ["3", "['No Overview (2000)']", "['Heat (1995)']", "0.1", "0.3", "0.1", "1.0", "0.7", "0.6"],
+]
+
+
+def write_rows(filename, rows):
+    with open(filename, 'w', newline='', encoding='utf-8') as fp:
+        csv.writer(fp).writerows(rows)
+    fp.close()
+
+
+def read_rows(filename):
+    with open(filename, encoding='utf-8') as fp:
+        rows = list(csv.reader(fp))
+    fp.close()
+
+    return rows
+
+
+@pytest.fixture
+def import_folder(tmp_path):
+    write_rows(str(tmp_path / "movies.csv"), MOVIES_ROWS)
+    write_rows(str(tmp_path / "userRatings.csv"), RATINGS_ROWS)
+    write_rows(str(tmp_path / "rules.csv"), RULES_ROWS)
+    output_folder = str(tmp_path / "import")
+    counts = write_import_files(str(tmp_path / "movies.csv"), str(tmp_path / "userRatings.csv"),
+                                str(tmp_path / "rules.csv"), output_folder)
+
+    return output_folder, counts
+
+
+def test_write_import_files(import_folder):
+    output_folder, counts = import_folder
+
+    assert counts == {"genres.csv": 6, "movies.csv": 3, "in_genre.csv": 6, "users.csv": 3, "watched.csv": 3,
+                      "rated.csv": 4, "recommends.csv": 2}
+    for name in NODES_FILES + RELATIONSHIPS_FILES:
+        rows = read_rows(os.path.join(output_folder, name))
+        assert rows[0] == IMPORT_HEADERS[name]
+        assert len(rows) - 1 == counts[name]
+    assert read_rows(os.path.join(output_folder, "movies.csv"))[3][7] == "Multiline\noverview."
+    assert read_rows(os.path.join(output_folder, "recommends.csv"))[1:] == [["1", "4", "0.8", "RECOMMENDS"],
+                                                                            ["2", "4", "0.66", "RECOMMENDS"]]
+    assert validate_import_files(output_folder, counts) == []
+
+
+def test_validate_import_files_finds_errors(import_folder):
+    output_folder, counts = import_folder
+    rated = read_rows(os.path.join(output_folder, "rated.csv"))
+    write_rows(os.path.join(output_folder, "rated.csv"), rated + [["99", "1", "4.0", "RATED"]])
+    os.remove(os.path.join(output_folder, "recommends.csv"))
+
+    errors = validate_import_files(output_folder, counts)
+
+    assert errors == ["rated.csv: linha 5 referencia o nó inexistente User 99", "rated.csv: 5 linhas (esperadas 4)",
+                      "recommends.csv: ficheiro inexistente"]
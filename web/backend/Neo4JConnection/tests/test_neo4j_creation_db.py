@@ -0,0 +1,158 @@
+import csv
+
+import pytest
+
+import Neo4jCreationDB
+from Neo4jBulkImport import read_recommends_confidences
+from Neo4jCreationDB import (create_movie_recommends_movie_relationships, create_movies_genres_relationships,
+                             create_users_movies_relationships, get_movies_ids, iter_batches, write_batches)
+from Neo4jSchema import SCHEMA_INDEXES
+
+from recording_driver import RecordingDriver, get_online_schema
+
+MOVIES_ROWS = [
+    ["movieId", "title", "genres", "imdbId", "tmdbId", "released_date", "year", "poster"],
+    ["1", "Toy Story (1995)", "Animation|Children|Comedy", "114709", "862", "1995-10-30", "1995", "/toy.jpg"],
+    ["2", "Heat (1995)", "Action|Crime|Thriller", "113277", "949", "1995-12-15", "1995", "/heat.jpg"],
+    ["3", "Matrix, The (1999)", "Action|Sci-Fi", "133093", "603", "1999-03-30", "1999", "/matrix.jpg"],
+]
+# Movies stored in Neo4j, ordered by movieId (as returned by the query of get_movies_ids), with a repeated title
+MOVIES_IDS = [("Toy Story (1995)", 1), ("Heat (1995)", 2), ("Matrix, The (1999)", 3), ("Heat (1995)", 4)]
+RATINGS_ROWS = [
+    ["userId", "movieTitle", "rating"],
+    ["1", "Toy Story (1995)", "4.0"],
+    ["1", "Unknown Movie (2010)", "3.0"],
+    ["1", "Heat (1995)", "3.5"],
+    ["2", "Matrix, The (1999)", "5.0"],
+    ["2", "Unknown Movie (2010)", "2.0"],
+    ["3", "Other Unknown Movie (2011)", "1.0"],
+    ["3", "Heat (1995)", "2.5"],
+]
+RULES_ROWS = [
+    ["id", "antecedents", "consequents", "antecedent_support", "consequent_support", "support", "confidence",
+     "kulczynski", "imbalance_ratio"],
+    ["1", "['Toy Story (1995)', 'Heat (1995)']", "['Matrix, The (1999)']", "0.3", "0.4", "0.2", "0.66", "0.6", "0.1"],
+    # Pairs of the first rule with a greater and a lower confidence (each pair keeps its max confidence)
+    ["2", "['Toy Story (1995)']", "['Matrix, The (1999)']", "0.5", "0.4", "0.4", "0.8", "0.9", "0.2"],
+    ["3", "['Heat (1995)']", "['Matrix, The (1999)']", "0.5", "0.4", "0.3", "0.6", "0.9", "0.2"],
+    ["4", "['Matrix, The (1999)']", "['Toy Story (1995)']", "0.4", "0.5", "0.4", "0.7", "0.9", "0.2"],
+    # Pairs with titles that don't exist in the database
+    ["5", "['Unknown Movie (2010)', 'Heat (1995)']", "['Toy Story (1995)']", "0.1", "0.5", "0.1", "0.9", "0.6",
+     "0.5"],
+    ["6", "['Matrix, The (1999)']", "['Other Unknown Movie (2011)']", "0.4", "0.1", "0.1", "0.25", "0.6", "0.5"],
+    ["7", "['Unknown Movie (2010)']", "['Matrix, The (1999)']", "0.1", "0.4", "0.1", "1.0", "0.6", "0.5"],
+]
+
+
+@pytest.fixture
+def loader_driver(monkeypatch):
+    """
+    Recording driver used by the loaders of Neo4jCreationDB, with all indexes online
+    """
+    driver = RecordingDriver(*get_online_schema(), movies=MOVIES_IDS)
+    monkeypatch.setattr(Neo4jCreationDB, "driver", driver)
+
+    return driver
+
+
+def write_rows(filename, rows):
+    with open(filename, 'w', newline='', encoding='utf-8') as fp:
+        csv.writer(fp).writerows(rows)
+    fp.close()
+
+
+@pytest.mark.parametrize("no_rows, batch_size, sizes", [(0, 3, []), (6, 3, [3, 3]), (7, 3, [3, 3, 1]),
+                                                        (2, 5, [2])])
+def test_iter_batches(no_rows, batch_size, sizes):
+    batches = list(iter_batches(iter(range(no_rows)), batch_size))
+
+    assert [len(batch) for batch in batches] == sizes
+    assert [row for batch in batches for row in batch] == list(range(no_rows))
+
+
+def test_write_batches_sends_one_transaction_per_batch(loader_driver):
+    rows = [{"id": row} for row in range(7)]
+
+    assert write_batches("UNWIND $rows AS row CREATE (:Node {id: row.id})", iter(rows), 3) == 7
+    assert loader_driver.batches == [rows[:3], rows[3:6], rows[6:]]
+    # One transaction for each index of the schema (created if it doesn't exist) and one for each batch
+    assert loader_driver.no_transactions == len(SCHEMA_INDEXES) + 3
+
+
+def test_write_batches_without_rows(loader_driver):
+    assert write_batches("UNWIND $rows AS row CREATE (:Node {id: row.id})", iter([]), 3) == 0
+    assert loader_driver.batches == []
+
+
+def test_create_movies_genres_relationships(tmp_path, loader_driver):
+    movies_filename = str(tmp_path / "movies.csv")
+    write_rows(movies_filename, MOVIES_ROWS)
+
+    assert create_movies_genres_relationships(movies_filename, batch_size=3) == 8
+    assert loader_driver.batches == [
+        [{"movieId": 1, "title": "Toy Story (1995)", "genre": "Animation"},
+         {"movieId": 1, "title": "Toy Story (1995)", "genre": "Children"},
+         {"movieId": 1, "title": "Toy Story (1995)", "genre": "Comedy"}],
+        [{"movieId": 2, "title": "Heat (1995)", "genre": "Action"},
+         {"movieId": 2, "title": "Heat (1995)", "genre": "Crime"},
+         {"movieId": 2, "title": "Heat (1995)", "genre": "Thriller"}],
+        [{"movieId": 3, "title": "Matrix, The (1999)", "genre": "Action"},
+         {"movieId": 3, "title": "Matrix, The (1999)", "genre": "Sci-Fi"}]]
+    assert all("MERGE (m)-[:IN_GENRE]->(g)" in query for query, parameters in loader_driver.queries if
+               "rows" in parameters)
+
+
+def test_get_movies_ids_keeps_the_first_repeated_title(loader_driver):
+    assert get_movies_ids() == {"Toy Story (1995)": 1, "Heat (1995)": 2, "Matrix, The (1999)": 3}
+
+
+def test_create_users_movies_relationships(tmp_path, loader_driver, capsys):
+    ratings_filename = str(tmp_path / "userRatings.csv")
+    write_rows(ratings_filename, RATINGS_ROWS)
+
+    assert create_users_movies_relationships(ratings_filename, batch_size=2) == 4
+    # The ratings of the missing titles are skipped and the repeated title gets the id of its first movie
+    assert loader_driver.batches == [[{"userId": 1, "movieId": 1, "rating": 4.0},
+                                      {"userId": 1, "movieId": 2, "rating": 3.5}],
+                                     [{"userId": 2, "movieId": 3, "rating": 5.0},
+                                      {"userId": 3, "movieId": 2, "rating": 2.5}]]
+    assert "(avaliações ignoradas): 2" in capsys.readouterr().out
+    # A single RATED relationship for each user and movie, whose rating is replaced
+    query = loader_driver.queries[-1][0]
+    assert "MERGE (u)-[r:RATED]->(m)" in query and "SET r.rating = row.rating" in query
+
+
+def test_read_recommends_confidences_keeps_the_max_confidence(tmp_path):
+    rules_filename = str(tmp_path / "rules.csv")
+    write_rows(rules_filename, RULES_ROWS)
+
+    assert read_recommends_confidences(rules_filename) == {
+        ("Toy Story (1995)", "Matrix, The (1999)"): 0.8, ("Heat (1995)", "Matrix, The (1999)"): 0.66,
+        ("Matrix, The (1999)", "Toy Story (1995)"): 0.7, ("Unknown Movie (2010)", "Toy Story (1995)"): 0.9,
+        ("Heat (1995)", "Toy Story (1995)"): 0.9, ("Matrix, The (1999)", "Other Unknown Movie (2011)"): 0.25,
+        ("Unknown Movie (2010)", "Matrix, The (1999)"): 1.0}
+
+
+def test_create_movie_recommends_movie_relationships(tmp_path, loader_driver, capsys):
+    rules_filename = str(tmp_path / "rules.csv")
+    write_rows(rules_filename, RULES_ROWS)
+
+    assert create_movie_recommends_movie_relationships(rules_filename, batch_size=2) == 4
+    # The pairs with missing titles are skipped (one row for each pair, with its max confidence)
+    assert loader_driver.batches == [[{"antecedentId": 1, "consequentId": 3, "confidence": 0.8},
+                                      {"antecedentId": 2, "consequentId": 3, "confidence": 0.66}],
+                                     [{"antecedentId": 3, "consequentId": 1, "confidence": 0.7},
+                                      {"antecedentId": 2, "consequentId": 1, "confidence": 0.9}]]
+    assert "(regras ignoradas): 2 filmes, 3 pares de filmes" in capsys.readouterr().out
+    assert "MERGE (mA)-[r:RECOMMENDS]->(mB)" in loader_driver.queries[-1][0]
+
+
+def test_write_batches_creates_the_schema_of_a_fresh_database(monkeypatch):
+    driver = RecordingDriver([], [])
+    monkeypatch.setattr(Neo4jCreationDB, "driver", driver)
+    query = "UNWIND $rows AS row CREATE (:Node {id: row.id})"
+
+    assert write_batches(query, iter([{"id": 1}]), 3) == 1
+    # The missing indexes are created before the first batch
+    schema_queries = [schema_query for name, label, property_name, kind, schema_query in SCHEMA_INDEXES]
+    assert [written_query for written_query, parameters in driver.queries] == schema_queries + [query]
@@ -0,0 +1,82 @@
+import pytest
+
+from Neo4jSchema import SCHEMA_INDEXES, create_schema, ensure_schema, get_schema_states, wait_schema_online
+
+from recording_driver import RecordingDriver
+
+
+def get_index(name, label, property_name, index_type="RANGE", state="ONLINE", owning_constraint=None):
+    return {"name": name, "state": state, "type": index_type, "labelsOrTypes": [label],
+            "properties": [property_name], "owningConstraint": owning_constraint}
+
+
+def get_constraint(name, label, property_name, constraint_type="UNIQUENESS"):
+    return {"name": name, "type": constraint_type, "labelsOrTypes": [label], "properties": [property_name]}
+
+
+def get_schema_driver():
+    # Every index of the schema, with the constraints and indexes created by older versions with other names
+    indexes = [get_index("constraint_genre", "Genre", "genreId", owning_constraint="constraint_genre"),
+               get_index("movie_id", "Movie", "movieId", owning_constraint="movie_id"),
+               get_index("user_id", "User", "userId", state="POPULATING", owning_constraint="user_id"),
+               get_index("movie_title", "Movie", "title"),
+               get_index("index_username", "User", "username"),
+               get_index("genre_genre", "Genre", "genre"),
+               get_index("movie_title_fulltext", "Movie", "title", index_type="FULLTEXT")]
+    constraints = [get_constraint("constraint_genre", "Genre", "genreId"),
+                   get_constraint("movie_id", "Movie", "movieId", "NODE_PROPERTY_UNIQUENESS"),
+                   get_constraint("user_id", "User", "userId")]
+
+    return RecordingDriver(indexes, constraints)
+
+
+def test_get_schema_states():
+    states = get_schema_states(get_schema_driver())
+
+    assert states == {"genre_id": "ONLINE", "movie_id": "ONLINE", "user_id": "POPULATING", "movie_title": "ONLINE",
+                      "user_username": "ONLINE", "genre_genre": "ONLINE", "movie_title_fulltext": "ONLINE"}
+
+
+def test_range_index_isnt_taken_for_a_constraint():
+    driver = RecordingDriver([get_index("user_id_index", "User", "userId"),
+                              get_index("username_unique", "User", "username", owning_constraint="username_unique")],
+                             [get_constraint("username_unique", "User", "username")])
+
+    states = get_schema_states(driver)
+
+    # The range index doesn't make userId unique and the index of the constraint isn't the username index
+    assert states["user_id"] is None
+    assert states["user_username"] is None
+
+
+def test_constraint_needs_a_uniqueness_constraint():
+    driver = RecordingDriver([get_index("user_id", "User", "userId", owning_constraint="user_id")],
+                             [get_constraint("user_id", "User", "userId", "NODE_PROPERTY_EXISTENCE")])
+
+    assert get_schema_states(driver)["user_id"] is None
+
+
+def test_wait_schema_online():
+    driver = get_schema_driver()
+    with pytest.raises(RuntimeError):
+        wait_schema_online(driver, timeout=0)
+
+    driver.indexes[2]["state"] = "ONLINE"
+    assert set(wait_schema_online(driver, timeout=0).values()) == {"ONLINE"}
+
+    driver.indexes[2]["state"] = "FAILED"
+    with pytest.raises(RuntimeError, match="failed"):
+        wait_schema_online(driver, timeout=0)
+
+    with pytest.raises(RuntimeError, match="don't exist"):
+        wait_schema_online(RecordingDriver([], []), timeout=0)
+
+
+def test_create_and_ensure_schema():
+    driver = get_schema_driver()
+    driver.indexes[2]["state"] = "ONLINE"
+    create_schema(driver)
+
+    assert [query for query, parameters in driver.queries] == [query for name, label, property_name, kind, query in
+                                                               SCHEMA_INDEXES]
+    assert len(ensure_schema(driver, timeout=0)) == len(SCHEMA_INDEXES)
@@ -5,6 +5,82 @@ driver = GraphDatabase.driver(
     "bolt://localhost:7687",
     auth=basic_auth("neo4j", "pf2021"))
 
+# Functions called after a relationship between a user and a movie is created or deleted (e.g. to refresh the
+# "RECOMMENDS" relationships with an incremental miner), with the following parameters:
+# (user_id, movie_id, relationship ("RATED" or "WATCHED"), rating_value (None if it's unknown), is_added)
+interaction_hooks = []
+
+
+def register_interaction_hook(hook):
+    """
+    Method that registers a function to be called after a relationship between a user and a movie is created or deleted
+    :param hook: function with the following parameters: (user_id, movie_id, relationship, rating_value, is_added)
+    :type hook: function
+    """
+    interaction_hooks.append(hook)
+
+
+def notify_interaction(user_id, movie_id, relationship, rating_value, is_added):
+    """
+    Method that calls all registered functions with a relationship between a user and a movie created or deleted
+    :param user_id: user's id
+    :type user_id: integer
+    :param movie_id: movie's id
+    :type movie_id: integer
+    :param relationship: type of relationship ("RATED" or "WATCHED")
+    :type relationship: string
+    :param rating_value: user's rating value given to the movie (None for "WATCHED" relationships or if it's unknown)
+    :type rating_value: float
+    :param is_added: if the relationship was created (True) or deleted (False)
+    :type is_added: boolean
+    """
+    for hook in interaction_hooks:
+        hook(user_id, movie_id, relationship, rating_value, is_added)
+
+
+def refresh_recommends_relationships(recommends_changes):
+    """
+    Method that, given the changes of the "RECOMMENDS" relationships (e.g. returned by an incremental miner), will
+    create or update the relationships whose confidence has changed and delete the relationships without any rule
+    :param recommends_changes: dictionary with the following format:
+                               { (antecedent movie id, consequent movie id): confidence or None to delete it }
+    :type recommends_changes: dictionary
+    """
+    query_set_recommends = """
+                    UNWIND $recommends AS rec
+                    MATCH (mA:Movie {movieId: rec.movieAntID})
+                    MATCH (mB:Movie {movieId: rec.movieConsID})
+                    MERGE (mA)-[r:RECOMMENDS]->(mB)
+                    SET r.confidence = rec.confidence
+                    """
+    query_delete_recommends = """
+                    UNWIND $recommends AS rec
+                    MATCH (:Movie {movieId: rec.movieAntID})-[r:RECOMMENDS]->(:Movie {movieId: rec.movieConsID})
+                    DELETE r
+                    """
+    set_recommends = [{'movieAntID': pair[0], 'movieConsID': pair[1], 'confidence': confidence} for pair, confidence in
+                      recommends_changes.items() if confidence is not None]
+    delete_recommends = [{'movieAntID': pair[0], 'movieConsID': pair[1]} for pair, confidence in
+                         recommends_changes.items() if confidence is None]
+    with driver.session(database="neo4j") as session:
+        if len(set_recommends) > 0:
+            session.write_transaction(lambda tx: tx.run(query_set_recommends, recommends=set_recommends).data())
+        if len(delete_recommends) > 0:
+            session.write_transaction(lambda tx: tx.run(query_delete_recommends, recommends=delete_recommends).data())
+    driver.close()
+
+
+# The "RECOMMENDS" relationships can be refreshed after each new rating with the incremental miner of AlgoritmoML:
+# import sys
+# sys.path.append('../../AlgoritmoML')
+# from IncrementalMiner import build_incremental_miner
+# miner = build_incremental_miner(filename='../../AlgoritmoML/datasets/userRatings5k.csv', is_implicit=True,
+#                                 movies_filename='../../AlgoritmoML/datasets/movies.csv', min_support=0.1,
+#                                 rule_metric="confidence", min_rule_metric_value=0.6, min_kulc_value=0.6,
+#                                 min_imbalance_ratio_value=0.3)
+# register_interaction_hook(lambda *interaction: refresh_recommends_relationships(
+#     miner.handle_interaction(*interaction)['recommends']))
+
 
 def find_user(username):
     """
@@ -249,7 +325,8 @@ def create_user_rated_movie(user_id, rating_value, movie_id):
     query_user_rated_movie = """
                     MATCH (u:User {userId: $userID})
                     MATCH (m:Movie {movieId: $movieID})
-                    MERGE (u)-[:RATED {rating:$ratingValue} ]->(m)
+                    MERGE (u)-[r:RATED]->(m)
+                    SET r.rating = $ratingValue
                     """
 
     with driver.session(database="neo4j") as session:
@@ -257,6 +334,7 @@ def create_user_rated_movie(user_id, rating_value, movie_id):
             lambda tx: tx.run(query_user_rated_movie, userID=user_id, movieID=movie_id,
                               ratingValue=rating_value).data())
     driver.close()
+    notify_interaction(user_id, movie_id, "RATED", rating_value, True)
     create_user_watched_movie(user_id, movie_id)
 
 
@@ -281,6 +359,7 @@ def create_user_watched_movie(user_id, movie_id):
         session.write_transaction(
             lambda tx: tx.run(query_user_watched_movie, userID=user_id, movieID=movie_id).data())
     driver.close()
+    notify_interaction(user_id, movie_id, "WATCHED", None, True)
 
 
 def remove_user_relationship_rated_movie(user_id, movie_id):
@@ -300,6 +379,7 @@ def remove_user_relationship_rated_movie(user_id, movie_id):
         session.write_transaction(
             lambda tx: tx.run(query_delete_relationship, userID=user_id, movieID=movie_id).data())
     driver.close()
+    notify_interaction(user_id, movie_id, "RATED", None, False)
 
 
 # create_user_watched_movie(5001, 2)